@@ -0,0 +1,29 @@
+# Scripted playthroughs of the bundled game. Each is a list of input lines;
+# prompts the engine asks are answered from `answers`, then with "exit".
+
+EXPLORE = {
+    "commands": [
+        "look", "take space map", "take bent wire", "inventory", "look at robot",
+        "talk to robot", "open locker", "lockpick locker", "open locker", "take apple",
+        "take item one", "take item two", "combine item one with item two",
+        "take broken tool", "take screwdriver", "repair broken tool",
+        "take storage room key", "give broken tool to robot", "stats", "exit", "look",
+        "hint", "help", "style retro", "look", "look at robot", "look at locker", "look at apple",
+        "fight bugrat", "give wire to robot", "read log", "take ship log", "read log",
+        "use apple", "equip crowbar", "xyzzy", "take unicorn",
+    ],
+    "answers": ["1", "1", "1"],
+}
+
+CRAFTING = {
+    "commands": [
+        "take energy cells", "take broken communicator", "take fission relay",
+        "take screwdriver", "combine relay with screwdriver", "take broken chip",
+        "take broken tool", "inventory", "give energy cells to robot",
+        "give communicator to robot", "inventory", "repair chip", "repair tool",
+        "look", "stats",
+    ],
+    "answers": [],
+}
+
+PLAYTHROUGHS = {"explore": EXPLORE, "crafting": CRAFTING}
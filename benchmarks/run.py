@@ -0,0 +1,245 @@
+"""End-to-end and micro benchmarks for the engine.
+
+Run from the repository root:
+
+    python -m benchmarks.run                  # run and compare with the baseline
+    python -m benchmarks.run --save-baseline  # run and store the results as the baseline
+    python -m benchmarks.run --scales 1 10    # only some world sizes
+
+Playthroughs are driven through GameEngine.process_command with output sent
+to a NullSink, so they measure the engine rather than the terminal.
+
+Timings only compare on the machine that made them, so the baseline is not
+kept in git: save one before a change and compare after it.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.playthroughs import PLAYTHROUGHS
+from benchmarks.worlds import CONFIG_FILE, load_config, scaled_world
+from engine.game_engine import GameEngine
+from engine.output import NullSink, use_sink
+from engine.parser import Parser
+from engine.prompt import AWAITING_CHOICE
+from engine.save_manager import SaveManager
+from engine.style_manager import StyleManager
+from engine.text_styler import TextStyler
+from engine.typewriter import set_no_delay
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), "baseline.json")
+MAX_ANSWERS = 50
+PARAGRAPH = ("The broken screen on the wall shows a holographic map of some star system. "
+             "A distant hum of some device fills the utility room of the decrepit spaceship.")
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def new_engine(world, save_dir, seed=1):
+    engine = GameEngine(CONFIG_FILE, None, Parser(), world=world, seed=seed)
+    engine.autosave_enabled = False
+    engine.saves = SaveManager(save_dir, "benchmark")
+    engine.save_journal = engine.saves.journal
+    return engine
+
+
+def play(engine, playthrough, timings):
+    """Run one playthrough, adding each command's latency in seconds to timings by action."""
+    # Prompts take the answers in order across the whole playthrough
+    answers = iter(playthrough["answers"])
+    for command in playthrough["commands"]:
+        action = engine.parser.parse_command(command.lower()).get("action", command)
+        start = time.perf_counter()
+        result = engine.process_command(command)
+        timings.setdefault(action, []).append(time.perf_counter() - start)
+        for _ in range(MAX_ANSWERS):
+            if result != AWAITING_CHOICE:
+                break
+            start = time.perf_counter()
+            result = engine.process_command(next(answers, "exit"))
+            timings.setdefault("answer", []).append(time.perf_counter() - start)
+
+
+def bench_playthroughs(world, save_dir, repeat):
+    timings = {}
+    for _ in range(repeat):
+        for playthrough in PLAYTHROUGHS.values():
+            play(new_engine(world, save_dir), playthrough, timings)
+    samples = [sample for action_samples in timings.values() for sample in action_samples]
+    return {
+        "commands_per_second": len(samples) / sum(samples),
+        "actions": {
+            action: {"p50_us": percentile(action_samples, 0.5) * 1e6,
+                     "p99_us": percentile(action_samples, 0.99) * 1e6,
+                     "count": len(action_samples)}
+            for action, action_samples in sorted(timings.items())
+        },
+    }
+
+
+def peak_memory(func, *args):
+    """Peak bytes allocated while calling func."""
+    tracemalloc.start()
+    try:
+        func(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def play_session(world, save_dir):
+    engine = new_engine(world, save_dir)
+    for playthrough in PLAYTHROUGHS.values():
+        play(engine, playthrough, {})
+
+
+def time_per_call(func, args_list, repeat):
+    """Mean microseconds per call of func over args_list, best of several rounds."""
+    best = None
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for args in args_list:
+                func(*args)
+        elapsed = (time.perf_counter() - start) / (repeat * len(args_list))
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1e6
+
+
+def bench_micro(world, save_dir, repeat):
+    commands = [command for playthrough in PLAYTHROUGHS.values() for command in playthrough["commands"]]
+    parser = Parser()
+    names = [item.get("name", item_id) for item_id, item in list(world.items.items())[:200]]
+    styler = TextStyler()
+    bundle = StyleManager().get_style(load_config()["style_config"])
+    framed = next(style for style in bundle.styles.values() if style.frame_chars)
+    engine = new_engine(world, save_dir)
+    with use_sink(NullSink()):
+        for playthrough in PLAYTHROUGHS.values():
+            play(engine, playthrough, {})
+
+    def save_and_load():
+        engine.saves.save("bench", engine.get_game_state(), engine.world_state.entries())
+        engine.saves.load("bench")
+
+    return {
+        "parse_command_us": time_per_call(parser.parse_command, [(c.lower(),) for c in commands], repeat),
+        "parse_uncached_us": time_per_call(parser.resolve, [(" ".join(c.lower().split()),) for c in commands], repeat),
+        "resolve_name_us": time_per_call(world.item_names.resolve, [(name.lower(),) for name in names], repeat),
+        "create_frame_us": time_per_call(styler.create_frame, [(PARAGRAPH, framed.config, framed.frame_chars)], repeat),
+        "save_load_us": time_per_call(save_and_load, [()], max(1, repeat // 10)),
+        "journal_record_us": time_per_call(
+            lambda: engine.save_journal.record(engine.get_game_state(), engine.world_state), [()], repeat),
+    }
+
+
+def run(scales, repeat):
+    set_no_delay()
+    config = load_config()
+    results = {}
+    with tempfile.TemporaryDirectory() as save_dir, use_sink(NullSink()):
+        for scale in scales:
+            start = time.perf_counter()
+            world = scaled_world(config, scale)
+            load_seconds = time.perf_counter() - start
+            results[f"x{scale}"] = {
+                "entities": len(world.scenes) + len(world.items) + len(world.characters),
+                "world_build_ms": load_seconds * 1e3,
+                "world_memory_kb": peak_memory(scaled_world, config, scale) / 1024,
+                "session_memory_kb": peak_memory(play_session, world, save_dir) / 1024,
+                "playthroughs": bench_playthroughs(world, save_dir, repeat),
+                "micro": bench_micro(world, save_dir, repeat),
+            }
+    return results
+
+
+def flatten(results, prefix=""):
+    """Yield (name, value) for every figure compared with the baseline.
+
+    p99 latencies are left out; with a few samples per action they are
+    too noisy to flag regressions on.
+    """
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            yield from flatten(value, name + ".")
+        elif key.endswith(("_us", "_ms", "_kb", "_per_second")) and not key.startswith("p99"):
+            yield name, value
+
+
+def compare(results, baseline, threshold):
+    """Return the figures that got worse than the baseline by more than threshold."""
+    old = dict(flatten(baseline))
+    regressions = []
+    for name, value in flatten(results):
+        if name not in old or old[name] <= 0:
+            continue
+        if name.endswith("_per_second"):
+            worse = value < old[name] / (1 + threshold)
+        else:
+            worse = value > old[name] * (1 + threshold)
+        if worse:
+            regressions.append((name, old[name], value))
+    return regressions
+
+
+def report(results):
+    for scale, result in results.items():
+        playthroughs = result["playthroughs"]
+        print(f"\n== World {scale}: {result['entities']} entities, built in {result['world_build_ms']:.1f} ms "
+              f"using {result['world_memory_kb']:.0f} KiB; a session peaks at {result['session_memory_kb']:.0f} KiB")
+        print(f"{playthroughs['commands_per_second']:.0f} commands/s")
+        print(f"  {'action':<24}{'count':>7}{'p50 us':>10}{'p99 us':>10}")
+        for action, stats in playthroughs["actions"].items():
+            print(f"  {action:<24}{stats['count']:>7}{stats['p50_us']:>10.1f}{stats['p99_us']:>10.1f}")
+        for name, value in result["micro"].items():
+            print(f"  {name:<24}{value:>17.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the CLIo engine")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100],
+                        help="World sizes to run, as multiples of the bundled content")
+    parser.add_argument("--repeat", type=int, default=20, help="Times to repeat each playthrough")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="Baseline results file")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Fraction slower than the baseline that counts as a regression")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    results = run(args.scales, args.repeat)
+    report(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print("\nNo baseline to compare with; run with --save-baseline to store one")
+        return 0
+
+    with open(args.baseline, "r") as f:
+        regressions = compare(results, json.load(f), args.threshold)
+    if not regressions:
+        print("\nNo regressions against the baseline")
+        return 0
+    print(f"\n{len(regressions)} regressions against the baseline:")
+    for name, old, new in regressions:
+        print(f"  {name}: {old:.2f} -> {new:.2f} ({(new / old - 1) * 100:+.0f}%)")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,33 @@
+import json
+
+from engine.world import World
+from utils.world_generator import WorldGenerator
+
+CONFIG_FILE = "game_files/config.json"
+
+
+def load_config(config_file=CONFIG_FILE):
+    with open(config_file, "r") as f:
+        return json.load(f)
+
+
+def load_content(config):
+    return [World.load_data(config[key]) for key in World.CONTENT_FILE_KEYS]
+
+
+def scaled_world(config, factor, seed=0):
+    """Build a World `factor` times the size of the configured content.
+
+    The configured content is kept as it is, so the config's initial scene
+    and the playthrough scripts still work; the rest is a generated world
+    with as many scenes, items and characters per copy of the original,
+    with ids that cannot clash with it.
+    """
+    scenes, items, characters, story_texts = load_content(config)
+    if factor > 1:
+        extra = factor - 1
+        generator = WorldGenerator(len(scenes) * extra, len(items) * extra, len(characters) * extra, seed)
+        scenes.extend(generator.scenes())
+        items.update(generator.items())
+        characters.update(generator.characters())
+    return World(scenes, items, characters, story_texts)
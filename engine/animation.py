@@ -0,0 +1,140 @@
+import atexit
+import heapq
+import itertools
+import threading
+import time
+from typing import List, Tuple
+
+from engine.typewriter import no_delay
+
+# A frame is the text to write and the seconds to wait before the next one
+Frame = Tuple[str, float]
+
+
+class Animation:
+    """Frames of one effect still to be written to a stream.
+
+    Frames are written under the animation's own lock, so fast-forwarding
+    from another thread never splits a frame.
+    """
+
+    def __init__(self, frames: List[Frame], stream):
+        self.frames = list(frames)
+        self.stream = stream
+        self.position = 0
+        self.lock = threading.Lock()
+
+    @property
+    def done(self) -> bool:
+        return self.position >= len(self.frames)
+
+    def step(self) -> float:
+        """Write the next frame and return the delay before the one after it."""
+        with self.lock:
+            if self.done:
+                return 0
+            text, delay = self.frames[self.position]
+            self.position += 1
+            self.stream.write(text)
+            self.stream.flush()
+            return delay
+
+    def finish(self):
+        """Write every remaining frame at once, leaving the final state on screen."""
+        with self.lock:
+            remaining = "".join(text for text, _ in self.frames[self.position:])
+            self.position = len(self.frames)
+            if remaining:
+                self.stream.write(remaining)
+                self.stream.flush()
+
+
+class AnimationScheduler:
+    """Plays text effects on a render thread so they never block commands.
+
+    Animations on different streams interleave frame by frame. Starting an
+    animation, or writing new output, on a stream fast-forwards whatever is
+    still playing there.
+
+    Frames are written without holding the scheduler lock, so a slow
+    stream never holds up the commands that start or cancel animations.
+    """
+
+    def __init__(self):
+        self._queue = []
+        self._playing = None
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def play(self, frames: List[Frame], stream) -> Animation:
+        animation = Animation(frames, stream)
+        self.cancel(stream)
+        if no_delay():
+            animation.finish()
+            return animation
+
+        with self._condition:
+            heapq.heappush(self._queue, (time.monotonic(), next(self._counter), animation))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="clio-animations", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+        return animation
+
+    def cancel(self, stream=None):
+        """Fast-forward the animations in flight on a stream, or on all streams."""
+        with self._condition:
+            for animation in self._animations():
+                if stream is None or animation.stream is stream:
+                    animation.finish()
+            self._queue = [entry for entry in self._queue if not entry[2].done]
+            heapq.heapify(self._queue)
+            self._condition.notify_all()
+
+    def busy(self, stream=None) -> bool:
+        with self._condition:
+            return any(stream is None or animation.stream is stream for animation in self._animations())
+
+    def wait(self):
+        """Block until every animation has played out."""
+        with self._condition:
+            while self._queue or self._playing:
+                self._condition.wait()
+
+    def _animations(self):
+        """The animations in flight, including one having a frame written."""
+        animations = [animation for _, _, animation in self._queue]
+        if self._playing is not None and not self._playing.done:
+            animations.append(self._playing)
+        return animations
+
+    def _next_due(self):
+        """Wait for the next animation to be due and take it off the queue."""
+        while True:
+            if not self._queue:
+                self._condition.wait()
+                continue
+            due, _, animation = self._queue[0]
+            now = time.monotonic()
+            if due > now:
+                self._condition.wait(due - now)
+                continue
+            heapq.heappop(self._queue)
+            return animation, now
+
+    def _run(self):
+        while True:
+            with self._condition:
+                animation, now = self._next_due()
+                self._playing = animation
+            delay = animation.step()
+            with self._condition:
+                self._playing = None
+                if not animation.done:
+                    heapq.heappush(self._queue, (now + delay, next(self._counter), animation))
+                self._condition.notify_all()
+
+animations = AnimationScheduler()
+# Never leave the terminal mid effect, such as with the screen still inverted
+atexit.register(animations.cancel)
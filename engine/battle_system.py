@@ -6,32 +6,43 @@ from engine.style.config import StyleConfig
 from engine.message_handler import message_handler
 
 class BattleSystem:
-    def __init__(self, player_stats, enemy_stats):
+    def __init__(self, player_stats, enemy_stats, rng=None):
         self.player_stats = player_stats
+        self.rng = rng or random.Random()
         self.enemy_stats = enemy_stats
         self.player_critical_hit_chance = player_stats.get("critical_hit_chance", 0)
         self.enemy_critical_hit_chance = enemy_stats.get("critical_hit_chance", 0)
 
     def start_battle(self):
         message_handler.print_message("A battle has started!", "combat")
-        self.engage_battle()
 
-    def engage_battle(self):
-        while self.player_stats["health"] > 0 and self.enemy_stats["health"] > 0:
-            self.player_turn()
-            if self.enemy_stats["health"] > 0:
-                self.enemy_turn()
+    def is_over(self):
+        return self.player_stats["health"] <= 0 or self.enemy_stats["health"] <= 0
 
+    def take_turn(self, action):
+        """Play one round with the player's chosen action.
+
+        Returns:
+            bool: False if the action was invalid and no round was played
+        """
+        if not self.player_turn(action):
+            return False
+        if self.enemy_stats["health"] > 0:
+            self.enemy_turn()
+        if self.is_over():
+            self.end_battle()
+        return True
+
+    def end_battle(self):
         if self.player_stats["health"] <= 0:
             message_handler.print_message("You have been defeated.")
         else:
             message_handler.print_message("You have defeated the enemy!")
 
-    def player_turn(self):
-        action = input("Do you want to attack or defend? ").lower()
+    def player_turn(self, action):
         if action == "attack":
-            damage = random.randint(10, 20) + self.player_stats["attack"]
-            if random.random() < self.player_critical_hit_chance:
+            damage = self.rng.randint(10, 20) + self.player_stats["attack"]
+            if self.rng.random() < self.player_critical_hit_chance:
                 damage *= 2
                 message_handler.print_message("Critical hit!")
             self.enemy_stats["health"] -= damage
@@ -41,11 +52,12 @@ class BattleSystem:
             message_handler.print_message("You defend and increase your defense.")
         else:
             message_handler.print_message("Invalid action. Try again.")
-            self.player_turn()
+            return False
+        return True
 
     def enemy_turn(self):
-        damage = random.randint(5, 15) - self.player_stats["defense"]
-        if random.random() < self.enemy_critical_hit_chance:
+        damage = self.rng.randint(5, 15) - self.player_stats["defense"]
+        if self.rng.random() < self.enemy_critical_hit_chance:
             damage *= 2
             message_handler.print_message("Enemy critical hit!")
         if damage > 0:
@@ -0,0 +1,240 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import zlib
+from collections.abc import Mapping, Sequence
+from engine.residency import ResidencyManager
+
+PACK_MAGIC = b"CLIOPACK"
+PACK_VERSION = 4
+
+# Name index sections stored in a pack, by World attribute
+NAME_INDEXES = ("item_names", "character_names")
+
+# Name index entries per bucket; a bucket is decoded whole
+NAME_BUCKET_SIZE = 64
+
+# magic, version, header length, header crc32, body sha256
+_PREAMBLE = struct.Struct("<8sIII32s")
+
+
+def _encode(value):
+    return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+def build_pack(world, filename):
+    """Compile a World into a binary content pack.
+
+    The pack holds a JSON header with the offset of every entity and the
+    World's precomputed indexes, followed by the entities themselves, each
+    encoded on its own so it can be decoded on first access. The name
+    indexes are stored the same way: their entries in hashed buckets and
+    each of their postings on its own.
+
+    The pack is written to a temporary file and moved into place, so
+    servers that have the old pack mapped keep reading it unchanged.
+    """
+    body = bytearray()
+
+    def add(value):
+        data = _encode(value)
+        entry = [len(body), len(data)]
+        body.extend(data)
+        return entry
+
+    header = {
+        "scenes": [add(scene) for scene in world.scenes],
+        "items": {item_id: add(item) for item_id, item in world.items.items()},
+        "characters": {char_id: add(char) for char_id, char in world.characters.items()},
+        "story_texts": add(world.story_texts),
+        "indexes": world.indexes,
+        "names": {name: add_names(add, getattr(world, name).export()) for name in NAME_INDEXES},
+        "content_hash": world.content_hash,
+    }
+    header_data = _encode(header)
+    preamble = _PREAMBLE.pack(PACK_MAGIC, PACK_VERSION, len(header_data),
+                              zlib.crc32(header_data), hashlib.sha256(body).digest())
+    temp_file = filename + ".tmp"
+    with open(temp_file, "wb") as f:
+        f.write(preamble)
+        f.write(header_data)
+        f.write(body)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_file, filename)
+
+
+def name_bucket(key, count):
+    return zlib.crc32(key.encode("utf-8")) % count
+
+
+def add_names(add, exported):
+    """Add an exported NameIndex to a pack body and return its header section."""
+    entries = exported["entries"]
+    entry_buckets = [{} for _ in range(max(1, len(entries) // NAME_BUCKET_SIZE))]
+    for order, (entity_id, norm, norm_id) in enumerate(entries):
+        entry_buckets[name_bucket(entity_id, len(entry_buckets))][entity_id] = [norm, norm_id, order]
+    buckets = [{kind: {} for kind in PackedNameIndex.BUCKETED} for _ in entry_buckets]
+    for kind in PackedNameIndex.BUCKETED:
+        for key, ids in exported[kind].items():
+            buckets[name_bucket(key, len(buckets))][kind][key] = ids
+    return {
+        "count": len(entries),
+        "entry_buckets": [add(bucket) for bucket in entry_buckets],
+        "buckets": [add(bucket) for bucket in buckets],
+        "word_list": add(sorted(exported["words"])),
+        "ngrams": {gram: add(ids) for gram, ids in exported["ngrams"].items()},
+    }
+
+
+class ContentPack:
+    """A content pack opened with mmap.
+
+    Only the header is read up front; entities are decoded from the
+    mapped file when first accessed and kept by the residency manager.
+    """
+
+    def __init__(self, filename, residency=None, verify=False):
+        self.filename = filename
+        self.residency = residency or ResidencyManager()
+        with open(filename, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self.data) < _PREAMBLE.size:
+            raise ValueError(f"{filename} is not a content pack")
+        magic, version, header_length, header_crc, self.body_digest = _PREAMBLE.unpack_from(self.data)
+        if magic != PACK_MAGIC:
+            raise ValueError(f"{filename} is not a content pack")
+        if version != PACK_VERSION:
+            raise ValueError(f"{filename} is pack version {version}, expected {PACK_VERSION}; rebuild it")
+
+        header_data = self.data[_PREAMBLE.size:_PREAMBLE.size + header_length]
+        if zlib.crc32(header_data) != header_crc:
+            raise ValueError(f"{filename} has a corrupt header; rebuild it")
+        self.header = json.loads(header_data)
+        self.body_offset = _PREAMBLE.size + header_length
+        if verify and not self.verify():
+            raise ValueError(f"{filename} has corrupt content; rebuild it")
+
+    def decode(self, entry):
+        offset, length = entry
+        start = self.body_offset + offset
+        return json.loads(self.data[start:start + length])
+
+    def verify(self):
+        """Check the entity data against the checksum recorded at build time."""
+        return hashlib.sha256(self.data[self.body_offset:]).digest() == self.body_digest
+
+    @property
+    def indexes(self):
+        return self.header["indexes"]
+
+    def names(self, name):
+        """Return the name index stored under a name such as "item_names"."""
+        return PackedNameIndex(self, name, self.header["names"][name])
+
+    def load(self, kind, key, entry):
+        return self.residency.get((kind, key), entry[1], lambda: self.decode(entry))
+
+    def scenes(self):
+        return PackedList(self, "scenes", self.header["scenes"])
+
+    def items(self):
+        return PackedDict(self, "items", self.header["items"])
+
+    def characters(self):
+        return PackedDict(self, "characters", self.header["characters"])
+
+    def story_texts(self):
+        return self.decode(self.header["story_texts"])
+
+
+class PackedDict(Mapping):
+    """Read-only dict of entities paged in from a pack when accessed."""
+
+    def __init__(self, pack, kind, entries):
+        self.pack = pack
+        self.kind = kind
+        self.entries = entries
+
+    def __getitem__(self, key):
+        return self.pack.load(self.kind, key, self.entries[key])
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class PackedList(Sequence):
+    """Read-only list of entities paged in from a pack when accessed."""
+
+    def __init__(self, pack, kind, entries):
+        self.pack = pack
+        self.kind = kind
+        self.entries = entries
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        index = range(len(self.entries))[index]
+        return self.pack.load(self.kind, index, self.entries[index])
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class PackedNameIndex:
+    """The lookups of a NameIndex stored in a pack, decoded as they are used.
+
+    Serves as the `base` of a NameIndex. Entries are found through the
+    hashed bucket of their id, and exact names, last words and words
+    through that of the name. Trigram
+    postings have their own offsets in the header, and the sorted word
+    list for prefix lookups is decoded on the first one.
+    """
+
+    # Postings kept in the name buckets
+    BUCKETED = ("exact", "last_words", "words")
+
+    def __init__(self, pack, name, section):
+        self.pack = pack
+        self.name = name
+        self.count = section["count"]
+        self.entry_buckets = section["entry_buckets"]
+        self.buckets = section["buckets"]
+        self.word_list = section["word_list"]
+        self.ngrams = section["ngrams"]
+        self._sorted_words = None
+
+    def __len__(self):
+        return self.count
+
+    def entry(self, entity_id):
+        index = name_bucket(entity_id, len(self.entry_buckets))
+        bucket = self.pack.load(self.name + ".entries", index, self.entry_buckets[index])
+        entry = bucket.get(entity_id)
+        return tuple(entry) if entry is not None else None
+
+    def lookup(self, kind, key):
+        if kind != "ngrams":
+            index = name_bucket(key, len(self.buckets))
+            return self.pack.load(self.name, index, self.buckets[index])[kind].get(key, ())
+        entry = self.ngrams.get(key)
+        if entry is None:
+            return ()
+        return self.pack.load(self.name + ".ngrams", key, entry)
+
+    def gram_terms(self):
+        return self.ngrams.keys()
+
+    def sorted_words(self):
+        if self._sorted_words is None:
+            self._sorted_words = self.pack.decode(self.word_list)
+        return self._sorted_words
@@ -0,0 +1,328 @@
+import json
+import sqlite3
+import threading
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scenes (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    name TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS exits (
+    scene_id TEXT NOT NULL REFERENCES scenes(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    target_scene_id TEXT,
+    door_name TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (scene_id, position)
+);
+CREATE TABLE IF NOT EXISTS items (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    name TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS characters (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    name TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS story_texts (
+    key TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS refs (
+    source_kind TEXT NOT NULL,
+    source_id TEXT NOT NULL,
+    relation TEXT NOT NULL,
+    target_kind TEXT NOT NULL,
+    target_id TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scenes_name ON scenes(name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS items_name ON items(name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS characters_name ON characters(name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS exits_target ON exits(target_scene_id);
+CREATE INDEX IF NOT EXISTS refs_target ON refs(target_kind, target_id);
+CREATE INDEX IF NOT EXISTS refs_source ON refs(source_kind, source_id);
+"""
+
+# Entity tables keyed by id, by editor data type
+ENTITY_TABLES = {"items": "items", "characters": "characters"}
+
+# Data types stored, in the order load() returns them
+DATA_TYPES = ("scenes", "items", "characters", "story_texts")
+
+
+def _dump(value):
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _scene_body(scene):
+    # Exits live in their own table; an empty placeholder keeps the key's place
+    return {key: [] if key == "exits" else value for key, value in scene.items()}
+
+
+def entity_references(kind, entity_id, entity):
+    """Yield (relation, target kind, target id) for the ids an entity refers to."""
+    if kind == "scenes":
+        for item_id in entity.get("items", []):
+            yield "item", "items", item_id
+        for item_id in entity.get("passive_items", []):
+            yield "passive item", "items", item_id
+        for char_id in entity.get("characters", []):
+            yield "character", "characters", char_id
+        for exit in entity.get("exits", []):
+            if exit.get("scene_id"):
+                yield "exit", "scenes", exit["scene_id"]
+            if exit.get("required_item") and exit["required_item"] != "passcode":
+                yield "exit requirement", "items", exit["required_item"]
+            for char_id in exit.get("dialogue_requirements", []):
+                yield "exit requirement", "characters", char_id
+    elif kind == "items":
+        for item_id in entity.get("components", []):
+            yield "component", "items", item_id
+        for item_id in entity.get("contents", []):
+            yield "contents", "items", item_id
+        for key in ("unlock_required_item", "repair_item"):
+            if isinstance(entity.get(key), str) and entity[key] != "passcode":
+                yield "requirement", "items", entity[key]
+        craft_data = entity.get("npc_craftable")
+        if craft_data:
+            yield "crafter", "characters", craft_data.get("crafter")
+            for item_id in craft_data.get("required_items", []):
+                yield "crafting ingredient", "items", item_id
+    elif kind == "characters":
+        for item_id in entity.get("inventory", []):
+            yield "inventory", "items", item_id
+        for item_id in entity.get("crafting_requirements", []):
+            yield "crafting", "items", item_id
+        if entity.get("initial_scene"):
+            yield "initial scene", "scenes", entity["initial_scene"]
+
+
+class ContentStore:
+    """Game content kept in SQLite, shared by the engine and the entity editor.
+
+    Each scene, exit, item, character and story text is a row holding its
+    JSON, so saving an edit only rewrites the rows that changed. Names and
+    cross-references are indexed, so reference lookups are SQL queries
+    rather than scans. The JSON file layout can be imported and exported.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(filename, check_same_thread=False)
+        self.db.execute("PRAGMA foreign_keys = ON")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def backup(self, filename):
+        """Copy the database to filename, consistently even while in use."""
+        target = sqlite3.connect(filename)
+        try:
+            with self.lock:
+                self.db.backup(target)
+        finally:
+            target.close()
+
+    # Import and export
+
+    def import_data(self, scenes, items, characters, story_texts):
+        """Replace the stored content with data in the JSON file layout."""
+        with self.lock, self.db:
+            for table in ("refs", "exits", "scenes", "items", "characters", "story_texts"):
+                self.db.execute(f"DELETE FROM {table}")
+            for position, scene in enumerate(scenes):
+                self._write_scene(scene, position)
+            for position, (item_id, item) in enumerate(items.items()):
+                self._write_entity("items", item_id, item, position)
+            for position, (char_id, char) in enumerate(characters.items()):
+                self._write_entity("characters", char_id, char, position)
+            for position, (key, value) in enumerate(story_texts.items()):
+                self.db.execute("INSERT INTO story_texts VALUES (?, ?, ?)", (key, position, _dump(value)))
+
+    def import_files(self, config):
+        """Import the JSON content files named in a game config."""
+        data = []
+        for key in ("scenes_file", "items_file", "characters_file", "story_texts_file"):
+            with open(config[key], "r", encoding="utf-8") as f:
+                data.append(json.load(f))
+        self.import_data(*data)
+
+    def export_files(self, config):
+        """Write the stored content back to the JSON files named in a game config."""
+        for key, data in zip(("scenes_file", "items_file", "characters_file", "story_texts_file"), self.load()):
+            with open(config[key], "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=4, ensure_ascii=False)
+
+    # Reading
+
+    def load(self):
+        """Return (scenes, items, characters, story_texts) in the JSON file layout."""
+        with self.lock:
+            return self.scenes(), self.entities("items"), self.entities("characters"), self.story_texts()
+
+    def scenes(self):
+        exits = {}
+        for scene_id, data in self.db.execute("SELECT scene_id, data FROM exits ORDER BY scene_id, position"):
+            exits.setdefault(scene_id, []).append(json.loads(data))
+        scenes = []
+        for scene_id, data in self.db.execute("SELECT id, data FROM scenes ORDER BY position"):
+            scene = json.loads(data)
+            if "exits" in scene:
+                scene["exits"] = exits.get(scene_id, [])
+            scenes.append(scene)
+        return scenes
+
+    def entities(self, table):
+        return {entity_id: json.loads(data) for entity_id, data in
+                self.db.execute(f"SELECT id, data FROM {ENTITY_TABLES[table]} ORDER BY position")}
+
+    def story_texts(self):
+        return {key: json.loads(data) for key, data in
+                self.db.execute("SELECT key, data FROM story_texts ORDER BY position")}
+
+    def find_by_name(self, table, name):
+        """Return the ids of entities with the given name, ignoring case."""
+        table = "scenes" if table == "scenes" else ENTITY_TABLES[table]
+        return [row[0] for row in self.db.execute(
+            f"SELECT id FROM {table} WHERE name = ? COLLATE NOCASE ORDER BY position", (name,))]
+
+    def references_to(self, kind, entity_id):
+        """Return the entities that refer to an entity.
+
+        Returns:
+            list: (source kind, source id, source name, relation) tuples
+        """
+        query = """
+            SELECT refs.source_kind, refs.source_id,
+                   COALESCE(scenes.name, items.name, characters.name, refs.source_id),
+                   refs.relation
+            FROM refs
+            LEFT JOIN scenes ON refs.source_kind = 'scenes' AND scenes.id = refs.source_id
+            LEFT JOIN items ON refs.source_kind = 'items' AND items.id = refs.source_id
+            LEFT JOIN characters ON refs.source_kind = 'characters' AND characters.id = refs.source_id
+            WHERE refs.target_kind = ? AND refs.target_id = ?
+            ORDER BY refs.rowid
+        """
+        with self.lock:
+            return list(self.db.execute(query, (kind, entity_id)))
+
+    # Row updates
+
+    def sync(self, data_type, data):
+        """Bring one data type in line with the editor's copy, rewriting only changed rows.
+
+        Returns:
+            int: Number of rows inserted, updated or deleted
+        """
+        with self.lock, self.db:
+            if data_type == "scenes":
+                return self._sync_scenes(data)
+            if data_type == "story_texts":
+                return self._sync_story_texts(data)
+            if data_type not in ENTITY_TABLES:
+                raise ValueError(f"The content database holds no {data_type}")
+            return self._sync_entities(data_type, data)
+
+    def put_entity(self, table, entity_id, entity):
+        with self.lock, self.db:
+            position = self.db.execute(f"SELECT position FROM {ENTITY_TABLES[table]} WHERE id = ?",
+                                       (entity_id,)).fetchone()
+            if position is None:
+                position = self.db.execute(
+                    f"SELECT COALESCE(MAX(position) + 1, 0) FROM {ENTITY_TABLES[table]}").fetchone()
+            self._write_entity(table, entity_id, entity, position[0])
+
+    def delete_entity(self, table, entity_id):
+        with self.lock, self.db:
+            self._delete_entity(table, entity_id)
+
+    def _sync_entities(self, table, data):
+        stored = dict(self.db.execute(f"SELECT id, data FROM {ENTITY_TABLES[table]}"))
+        positions = dict(self.db.execute(f"SELECT id, position FROM {ENTITY_TABLES[table]}"))
+        changed = 0
+        for position, (entity_id, entity) in enumerate(data.items()):
+            if stored.get(entity_id) != _dump(entity):
+                self._write_entity(table, entity_id, entity, position)
+                changed += 1
+            elif positions[entity_id] != position:
+                self.db.execute(f"UPDATE {ENTITY_TABLES[table]} SET position = ? WHERE id = ?",
+                                (position, entity_id))
+                changed += 1
+        for entity_id in stored.keys() - data.keys():
+            self._delete_entity(table, entity_id)
+            changed += 1
+        return changed
+
+    def _sync_scenes(self, scenes):
+        stored = {}
+        for scene_id, position, data in self.db.execute("SELECT id, position, data FROM scenes"):
+            stored[scene_id] = (position, data)
+        exits = {}
+        for scene_id, data in self.db.execute("SELECT scene_id, data FROM exits ORDER BY scene_id, position"):
+            exits.setdefault(scene_id, []).append(json.loads(data))
+
+        changed = 0
+        seen = set()
+        for position, scene in enumerate(scenes):
+            seen.add(scene["id"])
+            body = _scene_body(scene)
+            old_position, old_body = stored.get(scene["id"], (None, None))
+            if old_body != _dump(body) or exits.get(scene["id"], []) != scene.get("exits", []):
+                self._write_scene(scene, position)
+                changed += 1
+            elif old_position != position:
+                self.db.execute("UPDATE scenes SET position = ? WHERE id = ?", (position, scene["id"]))
+                changed += 1
+        for scene_id in stored.keys() - seen:
+            self._delete_entity("scenes", scene_id)
+            changed += 1
+        return changed
+
+    def _sync_story_texts(self, story_texts):
+        stored = {key: (position, data) for key, position, data in
+                  self.db.execute("SELECT key, position, data FROM story_texts")}
+        changed = 0
+        for position, (key, value) in enumerate(story_texts.items()):
+            if stored.get(key) != (position, _dump(value)):
+                self.db.execute("INSERT OR REPLACE INTO story_texts VALUES (?, ?, ?)", (key, position, _dump(value)))
+                changed += 1
+        for key in stored.keys() - story_texts.keys():
+            self.db.execute("DELETE FROM story_texts WHERE key = ?", (key,))
+            changed += 1
+        return changed
+
+    def _write_scene(self, scene, position):
+        body = _scene_body(scene)
+        self.db.execute("INSERT OR REPLACE INTO scenes VALUES (?, ?, ?, ?)",
+                        (scene["id"], position, scene.get("name"), _dump(body)))
+        self.db.execute("DELETE FROM exits WHERE scene_id = ?", (scene["id"],))
+        for exit_position, exit in enumerate(scene.get("exits", [])):
+            self.db.execute("INSERT INTO exits VALUES (?, ?, ?, ?, ?)",
+                            (scene["id"], exit_position, exit.get("scene_id"), exit.get("door_name"), _dump(exit)))
+        self._write_references("scenes", scene["id"], scene)
+
+    def _write_entity(self, table, entity_id, entity, position):
+        self.db.execute(f"INSERT OR REPLACE INTO {ENTITY_TABLES[table]} VALUES (?, ?, ?, ?)",
+                        (entity_id, position, entity.get("name"), _dump(entity)))
+        self._write_references(table, entity_id, entity)
+
+    def _delete_entity(self, table, entity_id):
+        table = "scenes" if table == "scenes" else ENTITY_TABLES[table]
+        self.db.execute(f"DELETE FROM {table} WHERE id = ?", (entity_id,))
+        self.db.execute("DELETE FROM refs WHERE source_kind = ? AND source_id = ?", (table, entity_id))
+
+    def _write_references(self, kind, entity_id, entity):
+        self.db.execute("DELETE FROM refs WHERE source_kind = ? AND source_id = ?", (kind, entity_id))
+        self.db.executemany("INSERT INTO refs VALUES (?, ?, ?, ?, ?)", [
+            (kind, entity_id, relation, target_kind, target_id)
+            for relation, target_kind, target_id in entity_references(kind, entity_id, entity)
+            if target_id
+        ])
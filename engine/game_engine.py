@@ -1,59 +1,77 @@
 import json
 import os
+from collections import ChainMap
+from collections.abc import Mapping
 import re
 import random
 import time
 import shutil
 import textwrap
+from functools import partial
 from engine.parser import Parser
 from engine.inventory import Inventory
 from engine.battle_system import BattleSystem
 from engine.media_player import MediaPlayer
 from engine.save_load import SaveLoad
+from engine.save_manager import SaveManager, save_writer
 from engine.text_styler import TextStyler
-from engine.style.config import StyleConfig
+from engine.style_manager import StyleManager
 from engine.message_handler import message_handler
+from engine.metrics import CommandTimer, get_metrics, PARSE, HANDLER, POST
+from engine.movement_scheduler import MovementScheduler
+from engine.pathfinding import Pathfinder
+from engine.prompt import Prompt, AWAITING_CHOICE
+from engine.triggers import TriggerEngine
+from engine.world import World, WorldState
 
 class GameEngine:
-    def __init__(self, config_file, media_player, parser):
+    def __init__(self, config_file, media_player, parser, world=None, player=None, seed=None):
         self.config = self.load_config(config_file)
+
+        # All chance in a session comes from this generator, so a seed replays it exactly
+        self.seed = seed if seed is not None else self.config.get("seed", random.randrange(2 ** 32))
+        self.rng = random.Random(self.seed)
+        # Set by SessionRecorder while the session is recorded
+        self.recorder = None
         
         # Initialize text styling singleton
         self.text_styler = TextStyler()
         self.message_handler = message_handler
         
-        # Load and apply style config with proper path
-        style_name = self.config.get("style_config", "default")
-        style_config = StyleConfig.load(style_name)
-        
-        # Process the style configuration
-        self.text_styler.process_config(style_config)
-        
-        # Apply the style configuration to message handler
-        self.message_handler.text_styler.process_config(style_config)
+        # Style bundles are compiled once and shared; this session points at one
+        self.style_manager = StyleManager()
+        self.style_bundle = self.style_manager.get_style(self.config.get("style_config", "default"))
+        self.text_styler.use_bundle(self.style_bundle)
         
-        # Load game data
-        self.scenes = self.load_data(self.config["scenes_file"]) 
-        self.items = self.load_data(self.config["items_file"])
-        self.characters = self.load_data(self.config["characters_file"])
-        self.story_texts = self.load_data(self.config["story_texts_file"])
-        self.current_scene = next(scene for scene in self.scenes if scene["id"] == self.config["initial_scene"])
-
+        # Load game data, shared with every other session on the same content
+        self.world = world or World.load(self.config)
+        self.world_state = WorldState(self.world)
+        self.scenes = self.world_state.scenes
+        self.items = self.world_state.items
+        self.characters = self.world_state.characters
+        self.story_texts = self.world.story_texts
+        self.character_locations = ChainMap({}, self.world.character_locations)
+        self.current_scene = self.get_scene(self.config["initial_scene"])
+
+        # Shared indexes for player commands
+        self.item_names = self.world.item_names
+        self.character_names = self.world.character_names
+        self.recipes = self.world.recipes
 
         # Initialize game state
-        self.inventory = Inventory()
+        self.triggers = TriggerEngine(self.fire_trigger, self.world.triggers)
+        self.inventory = Inventory(self.item_names, self.recipes, self.triggers)
         self.character_crafting_inventories = {}
         self.player_stats = self.config["player_stats"].copy()
         self.story_progress = {}
+        self.load_triggers()
         self.hints_used = 0
         self.max_hints = self.config["max_hints"]
 
         # Add missing stats from items
-        for item_id, item in self.items.items():
-            if "effect" in item:
-                for stat in item["effect"]:
-                    if stat not in self.player_stats:
-                        self.player_stats[stat] = 0
+        for stat in self.world.stat_keys:
+            if stat not in self.player_stats:
+                self.player_stats[stat] = 0
 
         # Initialize messages
         self.item_not_found_messages = [
@@ -78,35 +96,107 @@ class GameEngine:
         # Setup components
         self.media_player = media_player
         self.parser = parser
+        self.parser.add_verbs(self.config.get("verbs", {}))
+
+        # Prompt state for handlers that need the player's next line
+        self.pending_prompt = None
+        self.quit_requested = False
 
         # Initialize character movement
-        self.commands_since_last_move = 0
+        self.movement_scheduler = MovementScheduler()
         self.characters_last_move = {}
+        # Routes over this session's open exits, for followers, patrols and travel
+        self.pathfinder = Pathfinder(self.world_state)
+        # Index of the patrol waypoint each patrolling character is heading for
+        self.patrol_targets = {}
         self.initialize_movable_characters()
 
+        # Named save slots plus an autosave journal, kept apart for each player
+        # Sessions started for a named player, as the server does, share the
+        # save directory with others and only ever read their own saves
+        self.single_player = player is None
+        self.saves = SaveManager(self.config.get("save_dir", "saves"),
+                                 player or self.config.get("player", "default"),
+                                 self.config.get("snapshot_interval", 100))
+        self.save_journal = self.saves.journal
+        self.autosave_enabled = self.config.get("autosave", False)
+
+        # Command latency by action; None unless the config turns metrics on
+        self.metrics = get_metrics(self.config)
+        self.timer = CommandTimer(self.metrics) if self.metrics else None
+        self.command_action = None
+
+        self.update_residency()
+        if self.autosave_enabled:
+            self.save_journal.start(self.get_game_state(), self.world_state)
         message_handler.print_message("Game initialized", "system")
 
+    def update_residency(self):
+        """Keep the player's neighborhood of a paged world in memory, and make the maze around them."""
+        if self.world.maze:
+            self.world.maze.reveal(self.current_scene["id"])
+        residency = self.world.residency
+        if residency is None:
+            return
+        keys = self.world.neighborhood(self.current_scene["id"], residency.radius, self.get_scene)
+        keys.update(("items", item_id) for item_id in self.inventory.items)
+        residency.pin(self, keys)
+
+    def get_scene(self, scene_id):
+        """Return the scene with the given id, or None."""
+        return self.world_state.get_scene(scene_id)
+
+    def get_character_scene(self, char_id):
+        """Return the scene a character is currently in, or None."""
+        scene_id = self.character_locations.get(char_id)
+        if scene_id is None:
+            return None
+        return self.get_scene(scene_id)
+
+    def remove_character_from_scene(self, char_id):
+        """Take a character out of its current scene and return that scene."""
+        scene = self.get_character_scene(char_id)
+        if scene is None:
+            return None
+        if char_id in scene.get("characters", []):
+            scene["characters"].remove(char_id)
+        # None masks the shared location without copying the index
+        self.character_locations[char_id] = None
+        return scene
+
+    def place_character(self, char_id, scene_id):
+        """Move a character into a scene, keeping the location index in sync.
+
+        Returns:
+            bool: True if the character was not already in that scene
+        """
+        scene = self.get_scene(scene_id)
+        if scene is None:
+            return False
+        if self.character_locations.get(char_id) == scene_id:
+            return False
+        self.remove_character_from_scene(char_id)
+        if "characters" not in scene:
+            scene["characters"] = []
+        if char_id not in scene["characters"]:
+            scene["characters"].append(char_id)
+        self.character_locations[char_id] = scene_id
+        return True
+
     def initialize_movable_characters(self):
         """Initialize tracking for characters that can move between scenes"""
-        for char_id, char in self.characters.items():
-            if char.get("movable", False):
-                self.characters_last_move[char_id] = 0
-                # Set initial scene for movable characters
-                initial_scene = char.get("initial_scene", "scene1")
-                # Find the scene and add the character if not already there
-                for scene in self.scenes:
-                    if scene["id"] == initial_scene:
-                        if "characters" not in scene:
-                            scene["characters"] = []
-                        if char_id not in scene["characters"]:
-                            scene["characters"].append(char_id)
+        # The world has already placed movable characters in their initial scene,
+        # and indexed what scheduling them needs, so no character is decoded here
+        for char_id, movement in self.world.movable_characters.items():
+            self.characters_last_move[char_id] = 0
+            self.movement_scheduler.add_character(char_id, movement)
 
     def clear_screen(self):
         os.system('cls' if os.name == 'nt' else 'clear')
 
     def display_styled_text(self, text_obj, default_style="default"):
         """Display text with implicit or explicit styling."""
-        if isinstance(text_obj, dict):
+        if isinstance(text_obj, Mapping):
             text = text_obj.get("text", "")
             style = text_obj.get("style", default_style)
         else:
@@ -158,46 +248,103 @@ class GameEngine:
         self.text_styler.print_text(message, style_name="combat")
 
     def change_style_config(self, style_name):
-        self.style_config = StyleConfig.load(f"engine/style_configs/{style_name}.json")
-        self.text_styler.update_config(self.style_config)
+        self.style_bundle = self.style_manager.get_style(style_name)
+        self.text_styler.use_bundle(self.style_bundle)
+
+    def ask(self, message, handler):
+        """Wait for the player's next line and pass it to handler."""
+        self.pending_prompt = Prompt(message, handler)
+
+    def prompt_text(self):
+        """Text to show when reading the next line of input."""
+        return self.pending_prompt.message if self.pending_prompt else ">> "
 
     def process_command(self, command):
-        if not command.strip():
-            return
-        if command == "quit":
-            confirm = input("Are you sure you want to quit your adventure? (yes/no): ").lower()
-            if confirm == "yes":
-                message_handler.print_message("Thank you for playing! Goodbye!", "system")
-                exit()
+        """Handle one line of player input.
+
+        The line answers the pending prompt if there is one, otherwise it is
+        parsed as a command. Post-command systems run once the command and
+        any prompts it asked are finished. Output is buffered by the current
+        sink and flushed when the line has been handled.
+
+        Returns:
+            str or None: AWAITING_CHOICE while a prompt waits for the next line
+        """
+        if self.recorder:
+            self.recorder.input(command)
+        timer = self.timer
+        if timer:
+            timer.start()
+        self.command_action = None
+        self.pathfinder.start_command()
+        try:
+            if self.pending_prompt:
+                prompt = self.pending_prompt
+                self.pending_prompt = None
+                self.command_action = "answer"
+                if timer:
+                    timer.mark(PARSE)
+                prompt.handler(command.strip())
+            elif not command.strip():
+                return None
             else:
-                message_handler.print_message("Continuing the adventure...", "system")
-        elif command == "save":
-            save_game_state = {
-                "current_scene_id": self.current_scene["id"],
-                "inventory_items": self.inventory.items,
-                "equipped_items": self.inventory.equipped_items,
-                "player_stats": self.player_stats,
-                "story_progress": self.story_progress,
-                "hints_used": self.hints_used,
-                "character_crafting_inventories": self.character_crafting_inventories,
-                "commands_since_last_move": self.commands_since_last_move,
-                "characters_last_move": self.characters_last_move
-            }
-            SaveLoad().save_game(save_game_state, "savegame.json")
-            message_handler.print_message("Game saved successfully!", "success")
-        elif command == "load":
-            try:
-                saved_state = SaveLoad().load_game("savegame.json")
-                self.load_game_state(saved_state)
-                message_handler.print_message("Game loaded successfully!", "success")
-                self.explore_scene()
-            except FileNotFoundError:
-                message_handler.print_message("No saved game found.", "error")
-            except Exception as e:
-                message_handler.print_message(f"Error loading game: {str(e)}", "error")
+                self.run_command(command.lower().strip())
+            if timer:
+                timer.mark(HANDLER)
+
+            if self.pending_prompt:
+                return AWAITING_CHOICE
+
+            if self.check_game_over():
+                return None
+
+            # After processing any command, move the characters that are due
+            self.check_character_movements()
+            if self.autosave_enabled:
+                self.save_journal.record(self.get_game_state(), self.world_state)
+            return None
+        finally:
+            if timer:
+                timer.mark(POST)
+            if save_writer.failures:
+                self.report_failed_saves()
+            # Everything the command printed goes out in one write
+            message_handler.flush()
+            if timer and self.command_action:
+                timer.finish(self.command_action, command)
+
+    def answer_quit(self, confirm):
+        if confirm.lower() == "yes":
+            message_handler.print_message("Thank you for playing! Goodbye!", "system")
+            self.quit_requested = True
+        else:
+            message_handler.print_message("Continuing the adventure...", "system")
+
+    def run_command(self, command):
+        # Built-in commands need no parsing; parsed commands mark it again once parsed
+        if self.timer:
+            self.timer.mark(PARSE)
+        if command == "quit":
+            self.command_action = "quit"
+            self.ask("Are you sure you want to quit your adventure? (yes/no): ", self.answer_quit)
+        elif command == "save" or command.startswith("save "):
+            self.command_action = "save_game"
+            self.save_game(command[5:].strip())
+        elif command == "load" or command.startswith("load "):
+            self.command_action = "load_game"
+            self.load_game(command[5:].strip())
+        elif command in ("saves", "list saves"):
+            self.command_action = "list_saves"
+            self.list_saves()
+        elif command in ("metrics", "debug metrics"):
+            self.command_action = "show_metrics"
+            self.show_metrics()
         else:
             parsed = self.parser.parse_command(command)
             action = parsed.get("action")
+            self.command_action = action
+            if self.timer:
+                self.timer.mark(PARSE)
             if action == "invalid":
                 message_handler.print_message(parsed.get("message"))
             else:
@@ -208,91 +355,51 @@ class GameEngine:
                 else:
                     message_handler.print_message("Unknown action.")
 
-
-
-        if self.check_game_over():
-            return
-
-        self.check_conditions()
-
-        # After processing any command, increment counter and check for character movement
-        self.commands_since_last_move += 1
-        self.check_character_movements()
-
     def check_character_movements(self):
-        """Check and process any pending character movements"""
-        for char_id, char in self.characters.items():
-            if not char.get("movable", False):
-                continue
-
-            moves_after = char.get("moves_after_commands", 5)
-            moves_on_scene_change = char.get("moves_on_scene_change", False)
-            follow_player = char.get("follow_player", False)
-
-            if follow_player:
-                self.move_character_to_player_scene(char_id)
-            elif self.commands_since_last_move >= moves_after:
-                self.move_character(char_id)
-            elif moves_on_scene_change:
-                self.move_character(char_id)
-
-    def move_character_to_player_scene(self, char_id):
-        """Move a character to the player's current scene"""
-        character = self.characters[char_id]
-        current_scene = self.current_scene["id"]
-
-        # Find the current scene of the character
-        for scene in self.scenes:
-            if "characters" in scene and char_id in scene["characters"]:
-                scene["characters"].remove(char_id)
-                break
-
-        # Add the character to the player's current scene
-        for scene in self.scenes:
-            if scene["id"] == current_scene:
-                if "characters" not in scene:
-                    scene["characters"] = []
-                if char_id not in scene["characters"]:
-                    scene["characters"].append(char_id)
-                    message_handler.print_message(f"\n{character['name']} follows you into the room.")
+        """Advance the movement schedule by one command and move due characters"""
+        for char_id in self.movement_scheduler.advance():
+            self.move_character(char_id)
+
+    def check_scene_change_movements(self):
+        """Move followers and characters that wander when the player changes scene"""
+        for char_id in self.movement_scheduler.followers:
+            self.move_character_to_player_scene(char_id)
+        for char_id in self.movement_scheduler.scene_change_movers:
+            self.move_character(char_id)
+
+    def move_character_to_player_scene(self, char_id, steps=2):
+        """Walk a character up to `steps` scenes along the open route to the player's scene"""
+        start_id = scene_id = self.character_locations.get(char_id)
+        target_id = self.current_scene["id"]
+        if scene_id is None:
+            return
+        for _ in range(steps):
+            next_id = self.pathfinder.next_hop(scene_id, target_id)
+            if next_id is None:
                 break
+            scene_id = next_id
+        if scene_id != start_id and self.place_character(char_id, scene_id) and scene_id == target_id:
+            message_handler.print_message(f"\n{self.characters[char_id]['name']} follows you into the room.")
 
     def move_character(self, char_id):
-        """Move a character to an adjacent scene"""
-        # Find current scene containing the character
-        current_scene = None
-        for scene in self.scenes:
-            if "characters" in scene and char_id in scene["characters"]:
-                current_scene = scene
-                break
-
+        """Move a character to an adjacent scene, or one step along its patrol"""
+        current_scene = self.get_character_scene(char_id)
         if not current_scene:
             return
 
-        # Get possible destinations from current scene's exits
-        possible_destinations = []
-        for exit in current_scene.get("exits", []):
-            if not exit.get("locked", False) and not exit.get("blocked", False):
-                possible_destinations.append(exit["scene_id"])
-
-        if possible_destinations:
+        if "patrol" in self.characters[char_id]:
+            new_scene_id = self.next_patrol_scene(char_id, current_scene["id"])
+        else:
+            # Get possible destinations from current scene's exits
+            possible_destinations = []
+            for exit in current_scene.get("exits", []):
+                if not exit.get("locked", False) and not exit.get("blocked", False):
+                    possible_destinations.append(exit["scene_id"])
             # Choose random destination
-            new_scene_id = random.choice(possible_destinations)
-
-            # Remove character from current scene
-            current_scene["characters"].remove(char_id)
-
-            # Add character to new scene
-            for scene in self.scenes:
-                if scene["id"] == new_scene_id:
-                    if "characters" not in scene:
-                        scene["characters"] = []
-                    scene["characters"].append(char_id)
-                    break
+            new_scene_id = self.rng.choice(possible_destinations) if possible_destinations else None
 
-            # Reset movement counter if this was triggered by command count
-            if self.commands_since_last_move >= self.characters[char_id].get("moves_after_commands", 5):
-                self.commands_since_last_move = 0
+        if new_scene_id:
+            self.place_character(char_id, new_scene_id)
 
             # Update last move time
             self.characters_last_move[char_id] = time.time()
@@ -305,8 +412,29 @@ class GameEngine:
                 else:
                     message_handler.print_message(f"\n{char_name} leaves the room.")
 
+    def next_patrol_scene(self, char_id, scene_id):
+        """Return the next scene on a character's way to its patrol waypoint, or None.
+
+        A character with a `patrol` list of scene ids walks the open route to
+        each one in turn, and starts over from the first after the last.
+        Waypoints it cannot reach are skipped until a route opens.
+        """
+        patrol = self.characters[char_id]["patrol"]
+        index = self.patrol_targets.get(char_id, 0)
+        for _ in range(len(patrol)):
+            index %= len(patrol)
+            if patrol[index] == scene_id:
+                index += 1
+                continue
+            next_id = self.pathfinder.next_hop(scene_id, patrol[index])
+            if next_id is not None:
+                self.patrol_targets[char_id] = (index + 1) % len(patrol) if next_id == patrol[index] else index
+                return next_id
+            index += 1
+        return None
+
     def change_scene(self, scene_id):
-        next_scene = next((scene for scene in self.scenes if scene["id"] == scene_id), None)
+        next_scene = self.get_scene(scene_id)
         if next_scene:
             self.current_scene = next_scene
             music_file = next_scene.get("music", "")
@@ -320,13 +448,15 @@ class GameEngine:
                     MediaPlayer.play_sound_effect(sound_effect_file)
                 else:
                     message_handler.print_message("The sound of silence!")
+            self.update_residency()
             message_handler.print_message(self.current_scene["description"])
             self.report_characters_in_scene()
+            self.triggers.emit("scene_entered", scene_id)
         else:
             message_handler.print_message("Invalid scene ID.")
 
-        # After changing scene, check for character movements
-        self.check_character_movements()
+        # After changing scene, move followers and scene change wanderers
+        self.check_scene_change_movements()
 
     def report_characters_in_scene(self):
         """Report characters present in the current scene"""
@@ -376,16 +506,16 @@ class GameEngine:
         character = self.characters[character_id]
         random_events = character.get("random_events", [])
         if random_events:
-            return random.choice(random_events)
+            return self.rng.choice(random_events)
         return ""
 
     def interact_with_item(self, item_name):
-        item = self.find_item_by_name(item_name)
+        item = self.find_item_by_name(item_name, self.scene_item_scope())
         if item:
             item_id = item["id"]
-            if item_id in self.current_scene["items"]:
+            if item_id in self.current_scene.get("items", []):
                 message_handler.print_message(item["description"])
-                if item["usable"]:
+                if item.get("usable", False):
                     # Logic to use the item
                     pass
                 elif item.get("interactive"):
@@ -409,13 +539,9 @@ class GameEngine:
                                     message_handler.print_message(f"You find a {self.items[content_item]['name']} inside.")
                     elif action == "unlock":
                         if passive_item.get("unlock_required_item") == "passcode":
-                            passcode = input("Enter the passcode to unlock the item: ")
-                            if passcode == passive_item.get("passcode"):
-                                message_handler.print_message(f"You enter the correct passcode and unlock the {passive_item['name']}.")
-                                passive_item["locked"] = False
-                                passive_item["current_state"] = state_data.get("next_state", "closed")
-                            else:
-                                message_handler.print_message("Incorrect passcode. The item remains locked.")
+                            self.ask("Enter the passcode to unlock the item: ", partial(
+                                self.answer_item_passcode, passive_item,
+                                passive_item.get("passcode"), state_data.get("next_state", "closed")))
                         elif "bent_wire" in self.inventory.items:
                             message_handler.print_message(f"You use the bent wire to pick the lock of the {passive_item['name']}.")
                             passive_item["locked"] = False
@@ -433,9 +559,9 @@ class GameEngine:
                         else:
                             message_handler.print_message("There is nothing to take.")
             else:
-                message_handler.print_message(random.choice(self.item_not_found_messages))
+                message_handler.print_message(self.rng.choice(self.item_not_found_messages))
         else:
-            message_handler.print_message(random.choice(self.item_not_found_messages))
+            message_handler.print_message(self.rng.choice(self.item_not_found_messages))
 
     def handle_interactive_item(self, item):
         current_state_key = item.get("current_state", "default")
@@ -454,13 +580,8 @@ class GameEngine:
                     self.reveal_item_from_interactive(item)
             elif action == "unlock":
                 if item["unlock_required_item"] == "passcode":
-                    passcode = input("Enter the passcode to unlock the item: ")
-                    if passcode == "321":
-                        message_handler.print_message(f"You enter the correct passcode and unlock the {item['name']}.")
-                        item["locked"] = False
-                        item["current_state"] = next_state
-                    else:
-                        message_handler.print_message("Incorrect passcode. The item remains locked.")
+                    self.ask("Enter the passcode to unlock the item: ", partial(
+                        self.answer_item_passcode, item, item.get("passcode", "321"), next_state))
                 elif "bent_wire" in self.inventory.items:
                     message_handler.print_message(f"You use the bent wire to pick the lock of the {item['name']}.")
                     item["locked"] = False
@@ -471,6 +592,14 @@ class GameEngine:
                 message_handler.print_message(f"You take the item from the {item['name']}.")
                 item["current_state"] = next_state
 
+    def answer_item_passcode(self, item, expected, next_state, passcode):
+        if passcode == expected:
+            message_handler.print_message(f"You enter the correct passcode and unlock the {item['name']}.")
+            item["locked"] = False
+            item["current_state"] = next_state
+        else:
+            message_handler.print_message("Incorrect passcode. The item remains locked.")
+
     def reveal_item_from_interactive(self, item):
         if "contents" in item:
             for content_item in item["contents"]:
@@ -479,10 +608,10 @@ class GameEngine:
 
     def take_item(self, item_name):
         if not item_name:
-            message_handler.print_message(random.choice(self.unclear_command_messages))
+            message_handler.print_message(self.rng.choice(self.unclear_command_messages))
             return
-        item = self.find_item_by_name(item_name)
-        if item and item["id"] in self.current_scene["items"]:
+        item = self.find_item_by_name(item_name, self.current_scene.get("items", []))
+        if item:
             item_id = item["id"]
             message_handler.print_message(f"You take the {item['name']}.")
             self.inventory.add_item(item_id, self.items)
@@ -495,25 +624,14 @@ class GameEngine:
                         if state["action"] == "take" and state["next_state"] == "empty":
                             passive_item_data["current_state"] = "empty"
         else:
-            message_handler.print_message(random.choice(self.item_not_found_messages))
+            message_handler.print_message(self.rng.choice(self.item_not_found_messages))
 
     def talk_to_character(self, character_name):
         if not character_name:
             message_handler.print_message("Who do you want to talk to?")
             return
 
-        # Normalize the character name for comparison
-        character_name = character_name.lower()
-
-        # First try exact matches, then partial matches
-        matching_characters = []
-        for char_id in self.current_scene.get("characters", []):
-            char = self.characters[char_id]
-            if char["name"].lower() == character_name:
-                matching_characters = [char_id]
-                break
-            elif character_name in char["name"].lower():
-                matching_characters.append(char_id)
+        matching_characters = self.find_characters_by_name(character_name)
 
         if not matching_characters:
             message_handler.print_message("Character not found in this scene.")
@@ -536,47 +654,51 @@ class GameEngine:
             self.display_styled_text("Choose an option:", "menu")
             for i, (option, response) in enumerate(options.items(), start=1):
                 self.display_styled_text(f"{i}. {option}", "menu")
-                
-            while True:
-                choice = input("Enter the number of your choice (or 'exit' to leave): ").lower().strip()
-                
-                # Check for exit command
-                if choice in ['exit', 'quit', 'leave', 'back']:
-                    self.display_styled_text("You end the conversation.", "dialogue")
-                    return
-                    
-                # Try to convert input to number
-                try:
-                    choice_num = int(choice) - 1
-                    if 0 <= choice_num < len(options):
-                        selected_option = list(options.keys())[choice_num]
-                        response = options[selected_option]
-                        self.display_styled_text(response, "dialogue")
-                        self.handle_dialogue_option(character, selected_option)
-                        return
-                    else:
-                        self.display_styled_text(f"Please enter a number between 1 and {len(options)}.", "error")
-                except ValueError:
-                    self.display_styled_text("Please enter a valid number or 'exit' to leave the conversation.", "error")
+            self.ask_dialogue_choice(character)
         else:
             self.display_styled_text("No dialogue options available.", "dialogue")
 
+    def ask_dialogue_choice(self, character):
+        self.ask("Enter the number of your choice (or 'exit' to leave): ",
+                 partial(self.answer_dialogue_choice, character))
+
+    def answer_dialogue_choice(self, character, choice):
+        options = character.get("dialogue_options", {})
+        choice = choice.lower()
+
+        # Check for exit command
+        if choice in ['exit', 'quit', 'leave', 'back']:
+            self.display_styled_text("You end the conversation.", "dialogue")
+            return
+
+        # Try to convert input to number
+        try:
+            choice_num = int(choice) - 1
+            if 0 <= choice_num < len(options):
+                selected_option = list(options.keys())[choice_num]
+                response = options[selected_option]
+                self.display_styled_text(response, "dialogue")
+                self.handle_dialogue_option(character, selected_option)
+                return
+            else:
+                self.display_styled_text(f"Please enter a number between 1 and {len(options)}.", "error")
+        except ValueError:
+            self.display_styled_text("Please enter a valid number or 'exit' to leave the conversation.", "error")
+        self.ask_dialogue_choice(character)
+
     def give_item_to_character(self, item_name, character_name):
         """Enhanced give item handler with multiple interaction types."""
-        item = self.find_item_by_name(item_name)
+        item = self.find_item_by_name(item_name, self.inventory.items)
         if not item:
-            self.display_styled_text("Item not found in the game data.", "error")
-            return
-            
-        if item["id"] not in self.inventory.items:
-            self.display_styled_text(f"{item['name']} not in your inventory.", "error")
+            item = self.find_item_by_name(item_name)
+            if not item:
+                self.display_styled_text("Item not found in the game data.", "error")
+            else:
+                self.display_styled_text(f"{item['name']} not in your inventory.", "error")
             return
 
         # Find the character in the current scene
-        matching_characters = [
-            char_id for char_id in self.current_scene.get("characters", [])
-            if character_name.lower() in self.characters[char_id]["name"].lower()
-        ]
+        matching_characters = self.find_characters_by_name(character_name)
 
         if not matching_characters:
             message_handler.print_message("That character isn't here.")
@@ -590,12 +712,7 @@ class GameEngine:
             self.character_crafting_inventories[character_id] = set()
 
         # Check for crafting requirements first
-        required_items_for_character = set()
-        for craftable_id, craftable_item in self.items.items():
-            if "npc_craftable" in craftable_item:
-                craft_data = craftable_item["npc_craftable"]
-                if craft_data["crafter"] == character_id:
-                    required_items_for_character.update(craft_data["required_items"])
+        required_items_for_character = self.recipes.required_items_for_crafter(character_id)
 
         # Check for item interactions defined in character
         if "item_interactions" in character:
@@ -656,21 +773,20 @@ class GameEngine:
             message_handler.print_message(f"{character['name']} takes the {item['name']}.")
 
             # Check if we can craft anything
-            for craftable_id, craftable_item in self.items.items():
-                if "npc_craftable" in craftable_item:
-                    craft_data = craftable_item["npc_craftable"]
-                    if craft_data["crafter"] == character_id:
-                        required_items = set(craft_data["required_items"])
-                        if required_items.issubset(self.character_crafting_inventories[character_id]):
-                            message_handler.print_message(craft_data["success_message"])
-                            self.character_crafting_inventories[character_id].clear()
-                            self.inventory.add_item(craftable_id, self.items)
-                            message_handler.print_message(craft_data["dialogue_response"])
-                        else:
-                            remaining_items = required_items - self.character_crafting_inventories[character_id]
-                            remaining_names = [self.items[item_id]["name"] for item_id in remaining_items]
-                            if remaining_names:
-                                message_handler.print_message(f"The {character['name']} still needs: {', '.join(remaining_names)}")
+            for craftable_id in self.recipes.recipes_for_crafter(character_id):
+                craft_data = self.items[craftable_id]["npc_craftable"]
+                required_items = set(craft_data["required_items"])
+                if required_items.issubset(self.character_crafting_inventories[character_id]):
+                    message_handler.print_message(craft_data["success_message"])
+                    self.character_crafting_inventories[character_id].clear()
+                    self.inventory.add_item(craftable_id, self.items)
+                    message_handler.print_message(craft_data["dialogue_response"])
+                else:
+                    # In recipe order, so the message is the same on every run
+                    remaining_names = [self.items[item_id]["name"] for item_id in craft_data["required_items"]
+                                       if item_id not in self.character_crafting_inventories[character_id]]
+                    if remaining_names:
+                        message_handler.print_message(f"The {character['name']} still needs: {', '.join(remaining_names)}")
         else:
             message_handler.print_message(f"{character['name']} has no use for this item.")
 
@@ -696,17 +812,7 @@ class GameEngine:
             message_handler.print_message("Who do you want to fight?")
             return
 
-        # Normalize the character name for comparison
-        character_name = character_name.lower()
-
-        # First try exact matches, then partial matches
-        matching_characters = []
-        for char_id, char in self.characters.items():
-            if char["name"].lower() == character_name:
-                matching_characters = [char_id]
-                break
-            elif character_name in char["name"].lower():
-                matching_characters.append(char_id)
+        matching_characters = self.find_characters_by_name(character_name)
 
         if not matching_characters:
             message_handler.print_message("Character not found in this scene.")
@@ -715,12 +821,9 @@ class GameEngine:
             character = self.characters[character_id]
             if character["type"] in ["hostile", "neutral", "aggressive"]:
                 enemy_stats = character["stats"]
-                battle = BattleSystem(self.player_stats, enemy_stats)
+                battle = BattleSystem(self.player_stats, enemy_stats, self.rng)
                 battle.start_battle()
-                if self.player_stats["health"] > 0:
-                    self.update_story_progress(f"{character_id}_defeated", True)
-                    self.remove_enemy_from_scene(character_id)
-                    self.drop_items_from_character(character_id)
+                self.ask_battle_action(battle, character_id)
             else:
                 message_handler.print_message("This character is not hostile.")
         else:
@@ -728,8 +831,25 @@ class GameEngine:
             for char_id in matching_characters:
                 message_handler.print_message(f"- {self.characters[char_id]['name']}")
 
+    def ask_battle_action(self, battle, character_id):
+        self.ask("Do you want to attack or defend? ", partial(self.answer_battle_action, battle, character_id))
+
+    def answer_battle_action(self, battle, character_id, action):
+        battle.take_turn(action.lower())
+        if not battle.is_over():
+            self.ask_battle_action(battle, character_id)
+        elif self.player_stats["health"] > 0:
+            self.update_story_progress(f"{character_id}_defeated", True)
+            self.remove_enemy_from_scene(character_id)
+            self.drop_items_from_character(character_id)
+            self.triggers.emit("enemy_defeated", character_id)
+
     def remove_enemy_from_scene(self, character_id):
-        self.current_scene["characters"].remove(character_id)
+        if self.character_locations.get(character_id) == self.current_scene["id"]:
+            self.remove_character_from_scene(character_id)
+        else:
+            self.current_scene["characters"].remove(character_id)
+        self.movement_scheduler.remove_character(character_id)
         message_handler.print_message(f"The {self.characters[character_id]['name']} has been defeated and removed from the scene.")
         message_handler.print_message("There are signs of recent fight all over the place.")
 
@@ -750,40 +870,77 @@ class GameEngine:
 
         if len(exits) == 1:
             self.display_styled_text("There is just one exit from here. Do you want to leave?", "menu")
-            while True:
-                choice = input("Enter 'yes' to leave or 'no' to stay (or 'exit' to cancel): ").lower().strip()
-                if choice in ['yes', 'y']:
-                    self.attempt_to_exit(exits[0])
-                    break
-                elif choice in ['no', 'n', 'exit', 'cancel']:
-                    self.display_styled_text("You decide to stay.", "dialogue")
-                    break
-                else:
-                    self.display_styled_text("Please enter 'yes' or 'no'.", "error")
+            self.ask("Enter 'yes' to leave or 'no' to stay (or 'exit' to cancel): ", self.answer_single_exit)
         else:
             self.display_styled_text("There are multiple exits. Where do you want to go?", "menu")
             for i, exit in enumerate(exits):
                 self.display_styled_text(f"{i + 1}. {exit['door_name']}", "menu")
-            
-            while True:
-                choice = input("Enter the number of your choice (or 'exit' to cancel): ").lower().strip()
-                
-                if choice in ['exit', 'cancel', 'back']:
-                    self.display_styled_text("You decide to stay.", "dialogue")
-                    return
-                    
-                try:
-                    choice_num = int(choice) - 1
-                    if 0 <= choice_num < len(exits):
-                        self.attempt_to_exit(exits[choice_num])
-                        break
-                    else:
-                        self.display_styled_text(f"Please enter a number between 1 and {len(exits)}.", "error")
-                except ValueError:
-                    if not choice:  # Empty input
-                        self.display_styled_text("You decide to stay.", "dialogue")
-                        return
-                    self.display_styled_text("Please enter a valid number or 'exit' to cancel.", "error")
+            self.ask("Enter the number of your choice (or 'exit' to cancel): ", self.answer_exit_choice)
+
+    def travel_to(self, destination):
+        """Walk the shortest open route to a scene the player names.
+
+        Scenes on the way are passed through: followers keep up and scene
+        triggers fire, but only the last scene is described. The walk stops
+        early if something on the way closes the route or asks the player
+        a question.
+        """
+        route = self.pathfinder.find_scene(self.current_scene["id"], destination)
+        if route is None:
+            self.display_styled_text(f"You know of no open way to {destination}.", "error")
+            return
+        if not route:
+            self.display_styled_text("You are already there.", "dialogue")
+            return
+
+        target_id = route.pop()
+        for next_id in route:
+            if next_id not in self.pathfinder.exits(self.current_scene["id"]):
+                self.display_styled_text("The way on is closed.", "error")
+                return
+            self.current_scene = self.get_scene(next_id)
+            self.update_residency()
+            message_handler.print_message(f"You pass through the {self.current_scene['name']}.")
+            self.triggers.emit("scene_entered", next_id)
+            self.check_scene_change_movements()
+            if self.pending_prompt:
+                return
+        if target_id not in self.pathfinder.exits(self.current_scene["id"]):
+            self.display_styled_text("The way on is closed.", "error")
+            return
+        self.change_scene(target_id)
+
+    def answer_single_exit(self, choice):
+        choice = choice.lower()
+        if choice in ['yes', 'y']:
+            self.attempt_to_exit(self.current_scene["exits"][0])
+        elif choice in ['no', 'n', 'exit', 'cancel']:
+            self.display_styled_text("You decide to stay.", "dialogue")
+        else:
+            self.display_styled_text("Please enter 'yes' or 'no'.", "error")
+            self.ask("Enter 'yes' to leave or 'no' to stay (or 'exit' to cancel): ", self.answer_single_exit)
+
+    def answer_exit_choice(self, choice):
+        exits = self.current_scene.get("exits", [])
+        choice = choice.lower()
+
+        if choice in ['exit', 'cancel', 'back']:
+            self.display_styled_text("You decide to stay.", "dialogue")
+            return
+
+        try:
+            choice_num = int(choice) - 1
+            if 0 <= choice_num < len(exits):
+                self.attempt_to_exit(exits[choice_num])
+                return
+            else:
+                self.display_styled_text(f"Please enter a number between 1 and {len(exits)}.", "error")
+        except ValueError:
+            if not choice:  # Empty input
+                self.display_styled_text("You decide to stay.", "dialogue")
+                return
+            self.display_styled_text("Please enter a valid number or 'exit' to cancel.", "error")
+        self.ask("Enter the number of your choice (or 'exit' to cancel): ", self.answer_exit_choice)
 
     def attempt_to_exit(self, exit):
         """Handle exit attempt with proper input validation."""
@@ -804,20 +961,7 @@ class GameEngine:
         elif exit.get("locked", False):
             required_item = exit.get("required_item")
             if required_item == "passcode":
-                while True:
-                    passcode = input("Enter the passcode to unlock the door (or 'exit' to cancel): ").strip()
-                    if passcode.lower() in ['exit', 'cancel', 'back']:
-                        self.display_styled_text("You decide not to enter a passcode.", "dialogue")
-                        return
-                    if passcode == exit.get("passcode"):
-                        self.display_styled_text(exit["unlock_text"], "success")
-                        exit["locked"] = False
-                        self.change_scene(exit["scene_id"])
-                        break
-                    elif not passcode:  # Empty input
-                        return
-                    else:
-                        self.display_styled_text("Incorrect passcode. The door remains locked.", "error")
+                self.ask_door_passcode(exit)
             elif required_item in self.inventory.items:
                 self.display_styled_text(exit["unlock_text"], "success")
                 if self.items[required_item].get("consumable", False):
@@ -829,6 +973,21 @@ class GameEngine:
         else:
             self.change_scene(exit["scene_id"])
 
+    def ask_door_passcode(self, exit):
+        self.ask("Enter the passcode to unlock the door (or 'exit' to cancel): ",
+                 partial(self.answer_door_passcode, exit))
+
+    def answer_door_passcode(self, exit, passcode):
+        if passcode.lower() in ['exit', 'cancel', 'back']:
+            self.display_styled_text("You decide not to enter a passcode.", "dialogue")
+        elif passcode == exit.get("passcode"):
+            self.display_styled_text(exit["unlock_text"], "success")
+            exit["locked"] = False
+            self.change_scene(exit["scene_id"])
+        elif passcode:  # Empty input cancels
+            self.display_styled_text("Incorrect passcode. The door remains locked.", "error")
+            self.ask_door_passcode(exit)
+
     def list_inventory(self):
         items_text = "Inventory:\n" + "\n".join(
             f"- {self.items[item_id]['name']}"
@@ -838,13 +997,13 @@ class GameEngine:
 
     def examine_item(self, item_name):
         if not item_name:
-            message_handler.print_message(random.choice(self.unclear_command_messages))
+            message_handler.print_message(self.rng.choice(self.unclear_command_messages))
             return
-        item = self.find_item_by_name(item_name)
-        if item and item["id"] in self.inventory.items:
+        item = self.find_item_by_name(item_name, self.inventory.items)
+        if item:
             message_handler.print_message(item["description"])
         else:
-            message_handler.print_message(random.choice(self.item_not_found_messages))
+            message_handler.print_message(self.rng.choice(self.item_not_found_messages))
 
     def craft_item(self, item_name):
         item = self.find_item_by_name(item_name)
@@ -854,8 +1013,8 @@ class GameEngine:
             message_handler.print_message("Item not found in the game data.")
 
     def combine_items(self, item1_name, item2_name):
-        item1 = self.find_item_by_name(item1_name)
-        item2 = self.find_item_by_name(item2_name)
+        item1 = self.find_item_by_name(item1_name, self.inventory.items)
+        item2 = self.find_item_by_name(item2_name, self.inventory.items)
         if item1 and item2:
             self.inventory.combine_items(item1["id"], item2["id"], self.items)
         else:
@@ -893,20 +1052,25 @@ class GameEngine:
         message_handler.print_message(f"Attack: {self.player_stats['attack']}")
         self.inventory.list_equipped_items(self.items)
 
-    def find_item_by_name(self, item_name):
-        for item_id, item in self.items.items():
-            if item_name.lower() in item.get("name", "").lower():
-                return {
-                    "id": item_id,
-                    "name": item.get("name", "Unknown Item"),
-                    "description": item.get("description", "No description available."),
-                    "usable": item.get("usable", False),
-                    "interactive": item.get("interactive", False),
-                    "states": item.get("states", {}),
-                    "readable_item": item.get("readable_item", None),
-                    "read_speed": item.get("read_speed", 0.05)
-                }
-        return None
+    def scene_item_scope(self):
+        """Item ids the player can reach in the current scene."""
+        return self.current_scene.get("items", []) + self.current_scene.get("passive_items", [])
+
+    def find_item_by_name(self, item_name, scope=None):
+        """Resolve a player-typed item name to its item data.
+
+        Args:
+            item_name (str): Name typed by the player
+            scope (list): Item ids to search, or None for the whole world
+        """
+        if not item_name:
+            return None
+        item_id = self.item_names.resolve(item_name, scope)
+        return self.items[item_id] if item_id else None
+
+    def find_characters_by_name(self, character_name):
+        """Return ids of the best matching characters in the current scene."""
+        return self.character_names.matches(character_name, self.current_scene.get("characters", []))
 
     def display_story_text(self, text_key):
         text_info = self.story_texts.get(text_key, None)
@@ -929,25 +1093,24 @@ class GameEngine:
 
     def update_story_progress(self, event, value):
         self.story_progress[event] = value
+        if value:
+            self.triggers.emit("flag_set", event)
 
     def get_story_progress(self, event):
         return self.story_progress.get(event, None)
 
-    def check_conditions(self):
-        for condition, items in self.story_texts["conditions"].items():
-            for item_name, text_info in items.items():
-                if condition == "item_in_inventory" and item_name in self.inventory.items:
-                    self.display_story_text(text_info["text"])
-                elif condition == "enemy_defeated" and self.check_enemy_defeated(item_name):
-                    self.display_story_text(text_info["text"])
+    def load_triggers(self):
+        """Retire the show_once story triggers that already fired."""
+        self.triggers.retired = {key for key, value in self.story_progress.items() if value}
 
-    def check_enemy_defeated(self, enemy_name):
-        # Implement logic to check if the enemy is defeated
-        return True
+    def fire_trigger(self, trigger):
+        if trigger["show_once"]:
+            self.story_progress[trigger["id"]] = True
+        message_handler.print_message(trigger["text"], trigger["style"])
 
     def use_item(self, item_name):
-        item = self.find_item_by_name(item_name)
-        if item and item["id"] in self.inventory.items and item["usable"]:
+        item = self.find_item_by_name(item_name, self.inventory.items)
+        if item and item.get("usable", False):
             if "effect" in item:
                 effect = item["effect"]
                 if "health" in effect:
@@ -961,7 +1124,7 @@ class GameEngine:
             message_handler.print_message("Item not found in inventory or cannot be used.")
 
     def equip_item(self, item_name):
-        item = self.find_item_by_name(item_name)
+        item = self.find_item_by_name(item_name, self.inventory.items)
         if item:
             effect = self.inventory.equip_item(item["id"], self.items)
             for stat, value in effect.items():
@@ -970,7 +1133,7 @@ class GameEngine:
             message_handler.print_message("Item not found in inventory or cannot be equipped.")
 
     def unequip_item(self, item_name):
-        item = self.find_item_by_name(item_name)
+        item = self.find_item_by_name(item_name, self.inventory.equipped_items)
         if item:
             effect = self.inventory.unequip_item(item["id"], self.items)
             for stat, value in effect.items():
@@ -981,7 +1144,7 @@ class GameEngine:
     def get_random_event(self):
         random_events = self.current_scene.get("random_events", [])
         if random_events:
-            return random.choice(random_events)
+            return self.rng.choice(random_events)
         return ""
 
     # In GameEngine class:
@@ -992,13 +1155,12 @@ class GameEngine:
         Args:
             item_name (str): Name of the item to repair
         """
-        item = self.find_item_by_name(item_name)
+        item = self.find_item_by_name(item_name, self.inventory.items)
         if not item:
-            message_handler.print_message("Item not found.")
-            return
-
-        if item["id"] not in self.inventory.items:
-            message_handler.print_message("Item not found in your inventory.")
+            if self.find_item_by_name(item_name):
+                message_handler.print_message("Item not found in your inventory.")
+            else:
+                message_handler.print_message("Item not found.")
             return
 
         self.inventory.repair_item(item["id"], self.items)
@@ -1021,60 +1183,39 @@ class GameEngine:
 
     def read_item(self, item_name):
         """Read a readable item with proper delay and styling."""
-        item = self.find_item_by_name(item_name)
+        item = self.find_item_by_name(item_name, self.inventory.items + self.current_scene.get("items", []))
         if item and "readable_item" in item:
             text = item["readable_item"]
             self.display_styled_text(f"You start reading the {item['name']}:", "default")
-            message_handler.print_with_delay(text, item.get("read_speed", 0.05), "reading")
+            message_handler.print_with_delay(text, item.get("read_speed"), "reading")
         else:
-            self.display_styled_text(random.choice(self.item_not_found_messages), "error")
+            self.display_styled_text(self.rng.choice(self.item_not_found_messages), "error")
 
     def look_at(self, target_name):
         if not target_name:
             message_handler.print_message("What do you want to look at?")
             return
 
-        # Normalize the target name for comparison
-        target_name = target_name.lower()
-
-        # Check characters first
-        if "characters" in self.current_scene:
-            for char_id in self.current_scene["characters"]:
-                char = self.characters[char_id]
-                if target_name in char["name"].lower():
-                    message_handler.print_message(char["description"])
-                    return
-
-        # Then check items in the current scene
-        for item_id in self.current_scene.get("items", []):
-            item = self.items[item_id]
-            if target_name in item["name"].lower():
-                message_handler.print_message(item["description"])
-                return
+        # Characters win ties with items
+        char_rank, char_ids = self.character_names.search(target_name, self.current_scene.get("characters", []))
+        item_rank, item_ids = self.item_names.search(target_name, self.scene_item_scope() + self.inventory.items)
 
-        # Check interactive items in the current scene
-        for item_id in self.current_scene.get("passive_items", []):
-            item = self.items[item_id]
-            if target_name in item["name"].lower():
+        if char_ids and (item_rank is None or char_rank <= item_rank):
+            message_handler.print_message(self.characters[char_ids[0]]["description"])
+        elif item_ids:
+            item = self.items[item_ids[0]]
+            if item["id"] in self.current_scene.get("passive_items", []):
                 current_state = item.get("current_state", "default")
-                state_data = item["states"].get(current_state, {})
+                state_data = item.get("states", {}).get(current_state, {})
                 message_handler.print_message(state_data.get("description", "No description available."))
-                return
-
-        # Finally check items in inventory
-        for item_id in self.inventory.items:
-            item = self.items[item_id]
-            if target_name in item["name"].lower():
+            else:
                 message_handler.print_message(item["description"])
-                return
-
-        message_handler.print_message("You don't see that here.")
+        else:
+            message_handler.print_message("You don't see that here.")
 
     def get_available_styles(self):
         """Get list of available style configurations."""
-        style_dir = os.path.join("engine", "style", "configs")
-        style_files = [f for f in os.listdir(style_dir) if f.endswith('.json')]
-        return [os.path.splitext(f)[0] for f in style_files]
+        return self.style_manager.available_styles
 
     def change_style(self, style_name=None):
         """Change the game's style configuration.
@@ -1103,18 +1244,12 @@ class GameEngine:
                 message_handler.print_message(f"- {style}", "system")
             return
         
-        try:
-            # Load and apply the new style
-            style_config = StyleConfig.load(style_name)
-            self.text_styler.process_config(style_config)
-            self.message_handler.text_styler.process_config(style_config)
-            self.config["style_config"] = style_name
-            
-            # Announce the style change
-            message_handler.print_message(f"Style changed to: {style_name}", "success")
-            
-        except Exception as e:
-            message_handler.print_message(f"Error loading style '{style_name}': {str(e)}", "error")
+        # Styles are precompiled, so switching is only a pointer swap
+        self.change_style_config(style_name)
+        self.config["style_config"] = style_name
+
+        # Announce the style change
+        message_handler.print_message(f"Style changed to: {style_name}", "success")
 
 
     def repair_communicator(self):
@@ -1129,11 +1264,8 @@ class GameEngine:
         if not items:
             return
         
-        try:
-            # Get terminal width with fallback
-            term_width = shutil.get_terminal_size().columns - 4  # Account for frame
-        except:
-            term_width = 76  # Fallback width if can't detect terminal size
+        # The styler tracks the terminal width on resize
+        term_width = self.text_styler.terminal_size.columns - 4  # Account for frame
         
         # Format the title
         text = f"{title}\n\n"
@@ -1162,8 +1294,10 @@ class GameEngine:
                 "inventory": "Check your inventory",
                 "stats": "Show your character stats",
                 "exit": "Exit current room (if possible)",
+                "go to [place]": "Walk the shortest open way to a place",
                 "style": "Change game visual style",
-                "save/load": "Save or load game progress",
+                "save/load [slot]": "Save or load game progress, optionally in a named slot",
+                "saves": "List your saved games",
                 "quit": "Exit the game"
             },
             "Interaction Commands": {
@@ -1279,13 +1413,112 @@ class GameEngine:
                 "error"
             )
 
-    def load_game_state(self, saved_state):
-        """Load a saved game state."""
+    def save_game(self, slot=""):
+        """Save to a named slot, or the quicksave slot; the file is written in the background."""
+        metadata = {"scene": self.current_scene.get("name", self.current_scene["id"]),
+                    "health": self.player_stats.get("health")}
+        slot = self.saves.save(slot or "quicksave", self.get_game_state(), self.world_state.entries(), metadata)
+        message_handler.print_message(f"Saving the game to '{slot}'...", "success")
+
+    def report_failed_saves(self):
+        """Tell the player about saves that could not be written since the last command."""
+        for slot, error in self.saves.failed_saves():
+            message_handler.print_message(f"The game could not be saved to '{slot}': {error}", "error")
+
+    def load_game(self, slot=""):
+        """Load a slot, or else the quicksave slot, then the autosave, then a save from before slots.
+
+        Saves from before slots are not kept per player, so only a single
+        player game falls back to them.
+        """
+        try:
+            from_journal = slot == SaveManager.AUTOSAVE or (not slot and not self.saves.exists("quicksave"))
+            if from_journal:
+                saved = self.save_journal.load()
+                if saved is None and not slot and self.single_player:
+                    from_journal = False
+                    saved = (SaveLoad().load_game("savegame.json"), None)
+                elif saved is None:
+                    raise FileNotFoundError(slot)
+            else:
+                saved = self.saves.load(slot or "quicksave")
+            self.load_game_state(*saved)
+            if not from_journal:
+                # The autosave on disk holds another game than the one just loaded
+                self.save_journal.detach()
+            message_handler.print_message("Game loaded successfully!", "success")
+            self.explore_scene()
+        except FileNotFoundError:
+            message_handler.print_message("No saved game found.", "error")
+        except Exception as e:
+            message_handler.print_message(f"Error loading game: {str(e)}", "error")
+
+    def list_saves(self):
+        """List the player's save slots from their headers."""
+        saves = []
+        for header in self.saves.list_slots():
+            saved_at = time.strftime("%Y-%m-%d %H:%M", time.localtime(header["saved_at"]))
+            saves.append(f"{header['slot']}: {header.get('scene', '?')}, health {header.get('health', '?')}, "
+                         f"saved {saved_at}")
+        autosaved_at = self.save_journal.saved_at()
+        if autosaved_at:
+            saved_at = time.strftime("%Y-%m-%d %H:%M", time.localtime(autosaved_at))
+            saves.append(f"{SaveManager.AUTOSAVE}: saved {saved_at}")
+        if saves:
+            self.display_grouped_text("Saved Games", saves, "list_category")
+        else:
+            message_handler.print_message("No saved games.", "system")
+
+    def show_metrics(self):
+        """Show command latency by action, slowest on average first."""
+        if not self.metrics:
+            message_handler.print_message("Metrics are off; enable them in the \"metrics\" section of the config.",
+                                          "system")
+            return
+        lines = []
+        for action, stats in self.metrics.snapshot().items():
+            phases = ", ".join(f"{phase} {us:.0f}" for phase, us in stats["phases_us"].items())
+            lines.append(f"{action}: {stats['count']} runs, mean {stats['mean_us']:.0f} us, "
+                         f"p99 <= {stats['p99_us']:.0f} us, max {stats['max_us']:.0f} us, "
+                         f"{stats['slow']} slow ({phases})")
+        if lines:
+            self.display_grouped_text("Command Latency", lines, "list_category")
+        else:
+            message_handler.print_message("No commands timed yet.", "system")
+
+    def get_game_state(self):
+        """Return the player's state for saving; world changes are saved from the WorldState."""
+        return {
+            "current_scene_id": self.current_scene["id"],
+            "inventory_items": self.inventory.items,
+            "equipped_items": self.inventory.equipped_items,
+            "player_stats": self.player_stats,
+            "story_progress": self.story_progress,
+            "hints_used": self.hints_used,
+            "character_crafting_inventories": {
+                char_id: sorted(items) for char_id, items in self.character_crafting_inventories.items()
+            },
+            "character_locations": self.character_locations.maps[0],
+            "movement_schedule": self.movement_scheduler.get_state(),
+            "patrol_targets": self.patrol_targets,
+            "characters_last_move": self.characters_last_move
+        }
+
+    def load_game_state(self, saved_state, world_entries=None):
+        """Load a saved game state.
+
+        Args:
+            saved_state (dict): Player state from get_game_state
+            world_entries (list): Saved world changes, None for saves made without them
+        """
+        if world_entries is not None:
+            self.world_state.restore(world_entries)
+        self.character_locations.maps[0].clear()
+        self.character_locations.maps[0].update(saved_state.get("character_locations", {}))
+
         # Load current scene
-        self.current_scene = next(
-            scene for scene in self.scenes 
-            if scene["id"] == saved_state["current_scene_id"]
-        )
+        self.current_scene = self.get_scene(saved_state["current_scene_id"])
+        self.update_residency()
         
         # Load inventory
         self.inventory.items = saved_state["inventory_items"]
@@ -1295,11 +1528,18 @@ class GameEngine:
         self.player_stats = saved_state["player_stats"]
         self.story_progress = saved_state["story_progress"]
         self.hints_used = saved_state.get("hints_used", 0)
+        self.load_triggers()
         
         # Load character states
-        self.character_crafting_inventories = saved_state.get("character_crafting_inventories", {})
-        self.commands_since_last_move = saved_state.get("commands_since_last_move", 0)
+        self.character_crafting_inventories = {
+            char_id: set(items) for char_id, items in saved_state.get("character_crafting_inventories", {}).items()
+        }
+        # Defeated characters have no location and stay out of the schedule
+        movable = {char_id: movement for char_id, movement in self.world.movable_characters.items()
+                   if self.character_locations.get(char_id) is not None}
+        self.movement_scheduler.load_state(saved_state.get("movement_schedule"), movable)
         self.characters_last_move = saved_state.get("characters_last_move", {})
+        self.patrol_targets = saved_state.get("patrol_targets", {})
         
         # Initial scene description
         message_handler.print_message("\nGame loaded. Current location:", "system")
@@ -1,14 +1,21 @@
 from engine.message_handler import message_handler
+from engine.name_index import NameIndex
+from engine.recipe_index import RecipeIndex
 
 class Inventory:
-    def __init__(self):
+    def __init__(self, name_index=None, recipes=None, events=None):
         self.items = []
         self.equipped_items = []
+        self.name_index = name_index
+        self.recipes = recipes
+        self.events = events
 
     def add_item(self, item_id, items_data):
         item = items_data[item_id]
         self.items.append(item_id)
         message_handler.print_message(f"{item['name']} added to inventory.")
+        if self.events:
+            self.events.emit("item_acquired", item_id)
 
     def remove_item(self, item_id):
         if item_id in self.items:
@@ -71,51 +78,12 @@ class Inventory:
 
     def find_item_by_partial_name(self, partial_name, items_data):
         """Find an item in inventory by partial name match."""
-        partial_name = partial_name.lower()
-#        print(f"DEBUG: Looking for item with partial name: '{partial_name}'")
-#        print(f"DEBUG: Current inventory: {self.items}")
-        
         # First check if it's a direct ID match
         if partial_name in self.items:
             return partial_name
-            
-        matches = []
-        for item_id in self.items:
-            item = items_data[item_id]
-            item_name = item['name'].lower()
-#            print(f"DEBUG: Checking against item: {item_id} ({item_name})")
-            
-            # Check exact match
-            if partial_name == item_name:
- #               print(f"DEBUG: Found exact match: {item_id}")
-                return item_id
-                
-            # Check last word match
-            last_word = item_name.split()[-1]
-            if partial_name == last_word:
-#                print(f"DEBUG: Found last word match: {item_id}")
-                matches.append(item_id)
-                
-            # Check partial match
-            elif partial_name in item_name:
-#                print(f"DEBUG: Found partial match: {item_id}")
-                matches.append(item_id)
-                
-        # Handle matches
-        if len(matches) == 1:
-#            print(f"DEBUG: Returning single match: {matches[0]}")
-            return matches[0]
-        elif matches:
-            # Prefer last word matches
-            for item_id in matches:
-                if partial_name == items_data[item_id]['name'].lower().split()[-1]:
-#                    print(f"DEBUG: Returning preferred last word match: {item_id}")
-                    return item_id
-#            print(f"DEBUG: Returning first match: {matches[0]}")
-            return matches[0]
-            
-#        print(f"DEBUG: No matches found for {partial_name}")
-        return None
+
+        name_index = self.name_index or NameIndex({item_id: items_data[item_id] for item_id in self.items})
+        return name_index.resolve(partial_name, self.items)
 
     def combine_items(self, item1_name, item2_name, items_data):
         """Combine two items."""
@@ -128,23 +96,25 @@ class Inventory:
 #        print(f"DEBUG: Found item1_id: {item1_id}, item2_id: {item2_id}")
 
         if not item1_id or not item2_id:
-            print("One or both items not found in your inventory.")
+            message_handler.print_plain("One or both items not found in your inventory.")
             return None
 
-        # Check all items for a valid combination
-#        print(f"DEBUG: Looking for combination with components: {item1_id}, {item2_id}")
-        for result_id, result_item in items_data.items():
-            if 'components' in result_item:
-                components = set(result_item['components'])
-#                print(f"DEBUG: Checking result item {result_id} with components {components}")
-                if {item1_id, item2_id} == components:
-                    print(f"You combine {items_data[item1_id]['name']} and {items_data[item2_id]['name']} to create {result_item['name']}.")
-                    self.items.remove(item1_id)
-                    self.items.remove(item2_id)
-                    self.add_item(result_id, items_data)
-                    return result_id
-
-        print("These items cannot be combined.")
+        result_id = self.get_recipes(items_data).combination_for(item1_id, item2_id)
+        if result_id:
+            result_item = items_data[result_id]
+            message_handler.print_plain(f"You combine {items_data[item1_id]['name']} and {items_data[item2_id]['name']} to create {result_item['name']}.")
+            self.items.remove(item1_id)
+            self.items.remove(item2_id)
+            self.add_item(result_id, items_data)
+            return result_id
+
+        message_handler.print_plain("These items cannot be combined.")
+
+    def get_recipes(self, items_data):
+        """Return the recipe index, compiling one if none was provided."""
+        if self.recipes is None:
+            self.recipes = RecipeIndex(items_data)
+        return self.recipes
 
     def examine_item(self, item_name, items_data):
         item = items_data.get(item_name.lower())
@@ -180,12 +150,7 @@ class Inventory:
             message_handler.print_message(f"You need a {items_data[repair_item_id]['name']} to repair this item.")
             return
 
-        # Get the repaired version's name from the components list of items
-        repaired_item_id = None
-        for potential_item_id, potential_item in items_data.items():
-            if potential_item.get("components") == [item_id]:
-                repaired_item_id = potential_item_id
-                break
+        repaired_item_id = self.get_recipes(items_data).repaired_version(item_id)
 
         if not repaired_item_id:
             message_handler.print_message("Cannot find the repaired version of this item.")
@@ -0,0 +1,350 @@
+import random
+import threading
+
+# Cell offsets by exit direction; y grows to the south
+DIRECTIONS = {"North": (0, -1), "East": (1, 0), "South": (0, 1), "West": (-1, 0)}
+
+ADJECTIVES = ["Dripping", "Narrow", "Echoing", "Mossy", "Crumbling", "Dusty", "Flooded", "Silent", "Cold",
+              "Twisting", "Low", "Vaulted"]
+PLACES = ["Passage", "Chamber", "Tunnel", "Alcove", "Crossing", "Gallery", "Cell", "Hall"]
+METALS = ["Brass", "Iron", "Bone", "Copper", "Silver", "Rusted"]
+CREATURES = [("Cave Rat", "aggressive"), ("Tunnel Crawler", "hostile"), ("Lost Miner", "neutral"),
+             ("Hermit", "neutral"), ("Stone Sentinel", "hostile")]
+
+
+class Maze:
+    """A procedurally generated maze of scenes, made lazily from a seed.
+
+    The maze is an unbounded grid of cells, one scene each, split into
+    square regions. A region is carved as a random spanning tree of its
+    cells, with Kruskal's algorithm, and then gets a few extra passages so
+    it has loops. Passages between neighbouring regions are derived from
+    the seed and the pair of regions, so each region can be made on its own
+    and the whole maze stays connected.
+
+    Some dead-end branches of a region's tree are shut off behind a locked
+    gate with a chest inside; the key lies in the part of the region that
+    is reachable without passing any gate. Chests and characters are
+    scattered through the rest.
+
+    Regions are made when something first looks up one of their scenes,
+    items or characters, or when the player comes within `radius` regions,
+    and are kept for the life of the process. They come out the same every
+    time for the same seed, so every session shares them and a save only
+    records what the player changed.
+    """
+
+    PREFIX = "maze_"
+
+    def __init__(self, seed=0, entrance=None, region_size=6, loop_chance=0.15, lock_chance=0.5,
+                 chest_chance=0.05, character_chance=0.06, radius=1):
+        self.seed = seed
+        self.entrance = entrance
+        self.region_size = region_size
+        self.loop_chance = loop_chance
+        self.lock_chance = lock_chance
+        self.chest_chance = chest_chance
+        self.character_chance = character_chance
+        self.radius = radius
+        self.regions = set()
+        self.scenes = {}
+        self.items = {}
+        self.characters = {}
+        # Called with the (scenes, items, characters) dicts of each new region
+        self.on_region = None
+        self.lock = threading.RLock()
+
+    @classmethod
+    def from_config(cls, settings):
+        """Create a maze from the "maze" section of a game config."""
+        keys = ("seed", "entrance", "region_size", "loop_chance", "lock_chance", "chest_chance",
+                "character_chance", "radius")
+        return cls(**{key: settings[key] for key in keys if key in settings})
+
+    def rng(self, *key):
+        return random.Random(":".join(str(part) for part in (self.seed,) + key))
+
+    @classmethod
+    def scene_id(cls, x, y):
+        return f"{cls.PREFIX}{x}_{y}"
+
+    def owns(self, entity_id):
+        return isinstance(entity_id, str) and entity_id.startswith(self.PREFIX)
+
+    def cell_of(self, entity_id):
+        """Return the (x, y) cell an entity id belongs to, or None."""
+        if not self.owns(entity_id):
+            return None
+        parts = entity_id.rsplit("_", 2)
+        try:
+            return int(parts[-2]), int(parts[-1])
+        except (ValueError, IndexError):
+            return None
+
+    def region_of(self, x, y):
+        return x // self.region_size, y // self.region_size
+
+    # Lookups
+
+    def lookup(self, entities, entity_id):
+        cell = self.cell_of(entity_id)
+        if cell is None:
+            return None
+        self.region(*self.region_of(*cell))
+        return entities.get(entity_id)
+
+    def scene(self, scene_id):
+        """Return a maze scene by id, making its region if needed, or None."""
+        return self.lookup(self.scenes, scene_id)
+
+    def item(self, item_id):
+        return self.lookup(self.items, item_id)
+
+    def character(self, char_id):
+        return self.lookup(self.characters, char_id)
+
+    def reveal(self, scene_id):
+        """Make the regions within `radius` regions of a scene."""
+        cell = self.cell_of(scene_id)
+        if cell is None:
+            return
+        rx, ry = self.region_of(*cell)
+        for dy in range(-self.radius, self.radius + 1):
+            for dx in range(-self.radius, self.radius + 1):
+                self.region(rx + dx, ry + dy)
+
+    def region(self, rx, ry):
+        with self.lock:
+            if (rx, ry) in self.regions:
+                return
+            scenes, items, characters = self.generate_region(rx, ry)
+            self.scenes.update(scenes)
+            self.items.update(items)
+            self.characters.update(characters)
+            self.regions.add((rx, ry))
+            if self.on_region:
+                self.on_region(scenes, items, characters)
+
+    # Generation
+
+    def border_offsets(self, rx, ry, side):
+        """Cells along the east or south side of a region that open into the next region."""
+        rng = self.rng("border", side, rx, ry)
+        count = 2 if rng.random() < self.loop_chance else 1
+        return rng.sample(range(self.region_size), count)
+
+    def border_exits(self, rx, ry):
+        """Map local cells of a region to the directions that lead into a neighbouring region."""
+        last = self.region_size - 1
+        exits = {}
+        for offset in self.border_offsets(rx, ry, "east"):
+            exits.setdefault((last, offset), []).append("East")
+        for offset in self.border_offsets(rx - 1, ry, "east"):
+            exits.setdefault((0, offset), []).append("West")
+        for offset in self.border_offsets(rx, ry, "south"):
+            exits.setdefault((offset, last), []).append("South")
+        for offset in self.border_offsets(rx, ry - 1, "south"):
+            exits.setdefault((offset, 0), []).append("North")
+        return exits
+
+    def carve(self, rng):
+        """Carve a random spanning tree over a region's cells.
+
+        Returns:
+            tuple: Tree passages as a dict of cell -> set of linked cells,
+            and the passages left out of the tree
+        """
+        size = self.region_size
+        cells = [(x, y) for y in range(size) for x in range(size)]
+        walls = [((x, y), (x + 1, y)) for x, y in cells if x + 1 < size]
+        walls += [((x, y), (x, y + 1)) for x, y in cells if y + 1 < size]
+        rng.shuffle(walls)
+
+        parent = {cell: cell for cell in cells}
+
+        def find(cell):
+            while parent[cell] != cell:
+                parent[cell] = parent[parent[cell]]
+                cell = parent[cell]
+            return cell
+
+        links = {cell: set() for cell in cells}
+        spare = []
+        for a, b in walls:
+            root_a, root_b = find(a), find(b)
+            if root_a == root_b:
+                spare.append((a, b))
+                continue
+            parent[root_a] = root_b
+            links[a].add(b)
+            links[b].add(a)
+        return links, spare
+
+    def lock_branches(self, rng, links, borders):
+        """Choose dead-end branches to shut behind locked gates.
+
+        Returns:
+            dict: Gate cell -> cell outside it whose passage into it is locked
+        """
+        # Root the tree at a border cell so every branch points away from the rest of the maze
+        root = min(borders)
+        order = [root]
+        tree_parent = {root: None}
+        for cell in order:
+            for linked in sorted(links[cell]):
+                if linked not in tree_parent:
+                    tree_parent[linked] = cell
+                    order.append(linked)
+
+        sizes = {cell: 1 for cell in order}
+        has_border = {cell: cell in borders for cell in order}
+        for cell in reversed(order[1:]):
+            sizes[tree_parent[cell]] += sizes[cell]
+            has_border[tree_parent[cell]] |= has_border[cell]
+
+        gates = {}
+        if rng.random() >= self.lock_chance:
+            return gates
+        largest = max(2, len(order) // 4)
+        candidates = [cell for cell in order[1:] if not has_border[cell] and sizes[cell] <= largest]
+        if candidates:
+            gate = rng.choice(candidates)
+            gates[gate] = tree_parent[gate]
+        return gates
+
+    def generate_region(self, rx, ry):
+        """Return the scenes, items and characters of one region, keyed by id."""
+        size = self.region_size
+        rng = self.rng("region", rx, ry)
+        links, spare = self.carve(rng)
+        borders = self.border_exits(rx, ry)
+        gates = self.lock_branches(rng, links, borders)
+
+        # Cells behind a gate can only be reached through it
+        behind = set()
+        for gate, outside in gates.items():
+            stack = [gate]
+            while stack:
+                cell = stack.pop()
+                behind.add(cell)
+                stack.extend(linked for linked in links[cell] if linked not in behind and linked != outside)
+        for a, b in spare:
+            if a not in behind and b not in behind and rng.random() < self.loop_chance:
+                links[a].add(b)
+                links[b].add(a)
+
+        origin_x, origin_y = rx * size, ry * size
+        scenes, items, characters = {}, {}, {}
+        for y in range(size):
+            for x in range(size):
+                scene = self.make_scene(rng, origin_x + x, origin_y + y)
+                scenes[scene["id"]] = scene
+                for linked in sorted(links[(x, y)], key=lambda cell: (cell[1], cell[0])):
+                    direction = next(name for name, (dx, dy) in DIRECTIONS.items()
+                                     if (x + dx, y + dy) == linked)
+                    scene["exits"].append(self.passage(direction, origin_x + linked[0], origin_y + linked[1]))
+                for direction in borders.get((x, y), []):
+                    dx, dy = DIRECTIONS[direction]
+                    scene["exits"].append(self.passage(direction, origin_x + x + dx, origin_y + y + dy))
+                if self.entrance and (origin_x + x, origin_y + y) == (0, 0):
+                    scene["exits"].append({"door_name": "Way Out", "locked": False, "lock_text": "",
+                                           "unlock_text": "", "required_item": "", "scene_id": self.entrance})
+
+        free = sorted(cell for cell in links if cell not in behind)
+        for gate, outside in gates.items():
+            key_x, key_y = rng.choice(free)
+            key = self.make_key(rng, origin_x + key_x, origin_y + key_y)
+            items[key["id"]] = key
+            scenes[self.scene_id(origin_x + key_x, origin_y + key_y)]["items"].append(key["id"])
+            gate_scene = self.scene_id(origin_x + gate[0], origin_y + gate[1])
+            for exit in scenes[self.scene_id(origin_x + outside[0], origin_y + outside[1])]["exits"]:
+                if exit["scene_id"] == gate_scene:
+                    self.lock_passage(exit, key)
+            # Whatever lies behind a gate is worth the key
+            self.place_chest(rng, scenes[gate_scene], items, origin_x + gate[0], origin_y + gate[1])
+
+        for x, y in sorted(links, key=lambda cell: (cell[1], cell[0])):
+            scene = scenes[self.scene_id(origin_x + x, origin_y + y)]
+            if not scene["passive_items"] and rng.random() < self.chest_chance:
+                self.place_chest(rng, scene, items, origin_x + x, origin_y + y)
+            if (x, y) not in behind and rng.random() < self.character_chance:
+                character = self.make_character(rng, origin_x + x, origin_y + y)
+                characters[character["id"]] = character
+                scene["characters"].append(character["id"])
+        return scenes, items, characters
+
+    def make_scene(self, rng, x, y):
+        adjective, place = rng.choice(ADJECTIVES), rng.choice(PLACES)
+        return {
+            "id": self.scene_id(x, y),
+            "name": f"{adjective} {place} ({x}, {y})",
+            "description": f"You stand in a {adjective.lower()} {place.lower()} of the maze.",
+            "items": [],
+            "passive_items": [],
+            "characters": [],
+            "exits": [],
+            "random_events": ["Water drips somewhere in the dark.", "A draught whistles through the maze."],
+            "hint": "Keys are never behind the gates they open.",
+        }
+
+    def passage(self, direction, x, y):
+        return {"door_name": f"{direction} Passage", "locked": False, "lock_text": "", "unlock_text": "",
+                "required_item": "", "scene_id": self.scene_id(x, y)}
+
+    @staticmethod
+    def lock_passage(exit, key):
+        direction = exit["door_name"].split()[0]
+        exit.update(door_name=f"{direction} Gate", locked=True,
+                    lock_text=f"The {direction.lower()} gate is locked. It takes the {key['name']}.",
+                    unlock_text=f"The {key['name']} turns in the lock and the gate swings open.",
+                    required_item=key["id"])
+
+    def make_key(self, rng, x, y):
+        return {"id": f"{self.PREFIX}key_{x}_{y}", "name": f"{rng.choice(METALS)} Key ({x}, {y})",
+                "description": "A heavy key for one of the maze's gates.", "usable": False,
+                "key": True, "consumable": True}
+
+    def place_chest(self, rng, scene, items, x, y):
+        loot_id = f"{self.PREFIX}loot_{x}_{y}"
+        if rng.random() < 0.5:
+            loot = {"name": f"Healing Draught ({x}, {y})", "description": "A flask of something restorative.",
+                    "usable": True, "effect": {"health": rng.randint(10, 40)}}
+        else:
+            loot = {"name": f"{rng.choice(METALS)} Blade ({x}, {y})", "description": "An old but sharp blade.",
+                    "usable": False, "equippable": True, "effect": {"attack": rng.randint(3, 15)}}
+        loot["id"] = loot_id
+        chest = {
+            "id": f"{self.PREFIX}chest_{x}_{y}",
+            "name": f"Old Chest ({x}, {y})",
+            "description": "A wooden chest bound with iron.",
+            "usable": False,
+            "interactive": True,
+            "current_state": "closed",
+            "states": {
+                "closed": {"description": "The chest is closed.", "action": "open", "next_state": "open"},
+                "open": {"description": f"The chest is open, revealing the {loot['name']}.", "action": "take",
+                         "next_state": "empty"},
+                "empty": {"description": "The chest is empty.", "action": None, "next_state": None},
+            },
+            "contents": [loot_id],
+        }
+        items[loot_id] = loot
+        items[chest["id"]] = chest
+        scene["passive_items"].append(chest["id"])
+
+    def make_character(self, rng, x, y):
+        creature, kind = rng.choice(CREATURES)
+        way = [name for name, value in (("north", y > 0), ("south", y < 0), ("west", x > 0), ("east", x < 0))
+               if value]
+        directions = f"Head {' and '.join(way)}, if you are looking for the way out." if way else \
+            "You are standing right by the way out."
+        return {
+            "id": f"{self.PREFIX}character_{x}_{y}",
+            "name": f"{creature} ({x}, {y})",
+            "description": f"A {creature.lower()} that has made the maze its home.",
+            "type": kind,
+            "greeting": f"A {creature.lower()} watches you from the shadows.",
+            "dialogue": {"greet": "..."},
+            "dialogue_options": {"Ask the way": directions, "Leave it be": "It goes back to its business."},
+            "stats": {"health": rng.randint(10, 60), "attack": rng.randint(2, 12), "defense": rng.randint(1, 6)},
+        }
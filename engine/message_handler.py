@@ -1,5 +1,5 @@
-import sys
-import time
+from typing import Optional
+from engine.output import OutputRecord, get_sink
 from engine.text_styler import TextStyler
 
 class MessageHandler:
@@ -18,20 +18,23 @@ class MessageHandler:
             
         self.text_styler.print_text(message, style)
 
-    def print_with_delay(self, text: str, char_delay: float = 0.05, style: str = "default"):
-        """Print text character by character with delay and style."""
+    def print_plain(self, message: str):
+        """Print a message without styling."""
+        get_sink().emit(OutputRecord(message, None))
+
+    def print_with_delay(self, text: str, char_delay: Optional[float] = None, style: str = "default"):
+        """Type text out with the character and paragraph delays of a style.
+
+        char_delay overrides the style's character delay.
+        """
         if not text or not text.strip():
             return
 
-        # Split into paragraphs and print with style
-        paragraphs = text.split("\n\n")
-        for i, paragraph in enumerate(paragraphs):
-            for char in paragraph:
-                sys.stdout.write(char)
-                sys.stdout.flush()
-                if char not in {' ', '\n'}:
-                    time.sleep(char_delay)
-            if i < len(paragraphs) - 1:
-                print("\n")
+        get_sink().emit(OutputRecord(text, style, typed=True, char_delay=char_delay,
+                                     bundle=self.text_styler.current_bundle()))
+
+    def flush(self):
+        """Write out the output buffered for the current command."""
+        get_sink().flush()
 
 message_handler = MessageHandler()
\ No newline at end of file
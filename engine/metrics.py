@@ -0,0 +1,250 @@
+import atexit
+import json
+import os
+import threading
+from bisect import bisect_left
+from collections import deque
+from time import perf_counter_ns
+
+from engine.save_manager import save_writer
+
+# Phases of a command, in the order they run
+PHASES = ("parse", "handler", "post", "render")
+PARSE, HANDLER, POST, RENDER = range(len(PHASES))
+# Histogram bucket bounds in microseconds
+BUCKETS_US = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000, 250000, 1000000)
+_BUCKETS_NS = tuple(bound * 1000 for bound in BUCKETS_US)
+
+
+class ActionStats:
+    """Latency histogram and phase totals for one action."""
+
+    __slots__ = ("count", "total_ns", "max_ns", "buckets", "phase_ns", "slow")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.buckets = [0] * (len(BUCKETS_US) + 1)
+        self.phase_ns = [0] * len(PHASES)
+        self.slow = 0
+
+    def percentile_us(self, fraction):
+        """Upper bound of the bucket holding the given fraction of commands."""
+        target = self.count * fraction
+        seen = 0
+        for bound, count in zip(BUCKETS_US, self.buckets):
+            seen += count
+            if seen >= target:
+                return bound
+        return self.max_ns / 1000
+
+
+class CommandMetrics:
+    """Latency of player commands by action, shared by every session.
+
+    Timing a command only appends its phase marks to a queue; the queue is
+    folded into the histograms in batches, or when the stats are read.
+    Stats are exported to `export_file` every `export_interval` seconds, as
+    Prometheus text or JSON by the file's extension, and any command slower
+    than `slow_ms` is appended to `slow_log` with its phase breakdown. Both
+    files are written by the background save writer, never by a command.
+    """
+
+    BATCH = 1024
+
+    def __init__(self, slow_ms=50, slow_log=None, export_file=None, export_interval=10):
+        self.slow_ns = int(slow_ms * 1e6)
+        self.slow_log = slow_log
+        self.export_file = export_file
+        self.export_interval_ns = int(export_interval * 1e9)
+        self.next_export = perf_counter_ns() + self.export_interval_ns if export_file else float("inf")
+        self.actions = {}
+        # (action, start, parsed, handled, post, end) of commands not yet counted
+        self.pending = deque()
+        # Slow command entries waiting to be appended to the slow log
+        self.slow_entries = []
+        self.lock = threading.Lock()
+        if export_file:
+            atexit.register(self.export)
+
+    def after_record(self, timing, command):
+        """Handle a queued timing that is slow or fills the queue, or when an export is due."""
+        start, end = timing[1], timing[-1]
+        if end - start > self.slow_ns and self.slow_log:
+            with self.lock:
+                self.slow_entries.append(self.slow_entry(timing, command))
+            save_writer.queue(self.slow_log, self.write_slow_log)
+        if end >= self.next_export:
+            self.next_export = end + self.export_interval_ns
+            save_writer.queue(self.export_file, self.export)
+        elif len(self.pending) >= self.BATCH:
+            self.collect()
+
+    def collect(self):
+        """Fold the queued timings into the per-action stats."""
+        with self.lock:
+            pending = self.pending
+            actions = self.actions
+            while pending:
+                action, start, parsed, handled, post, end = pending.popleft()
+                stats = actions.get(action)
+                if stats is None:
+                    stats = actions[action] = ActionStats()
+                total = end - start
+                stats.count += 1
+                stats.total_ns += total
+                if total > stats.max_ns:
+                    stats.max_ns = total
+                stats.buckets[bisect_left(_BUCKETS_NS, total)] += 1
+                if total > self.slow_ns:
+                    stats.slow += 1
+                # Marks a command returned before reaching hold an earlier command's time
+                parsed = max(parsed, start)
+                handled = max(handled, parsed)
+                post = max(post, handled)
+                phase_ns = stats.phase_ns
+                phase_ns[0] += parsed - start
+                phase_ns[1] += handled - parsed
+                phase_ns[2] += post - handled
+                phase_ns[3] += end - post
+
+    @staticmethod
+    def slow_entry(timing, command):
+        action, *marks = timing
+        entry = {"command": command, "action": action, "total_ms": (marks[-1] - marks[0]) / 1e6}
+        for phase, duration in zip(PHASES, phase_durations(marks)):
+            entry[f"{phase}_ms"] = duration / 1e6
+        return entry
+
+    def write_slow_log(self):
+        """Append the waiting slow command entries to the slow log."""
+        with self.lock:
+            entries, self.slow_entries = self.slow_entries, []
+        if not entries:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.slow_log)), exist_ok=True)
+        with open(self.slow_log, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(entry) + "\n" for entry in entries))
+
+    def snapshot(self):
+        """Return the stats as plain data, slowest action on average first."""
+        self.collect()
+        with self.lock:
+            actions = {
+                action: {
+                    "count": stats.count,
+                    "slow": stats.slow,
+                    "mean_us": stats.total_ns / stats.count / 1000,
+                    "p50_us": stats.percentile_us(0.5),
+                    "p99_us": stats.percentile_us(0.99),
+                    "max_us": stats.max_ns / 1000,
+                    "phases_us": {phase: ns / stats.count / 1000 for phase, ns in zip(PHASES, stats.phase_ns)},
+                    "buckets": dict(zip([str(bound) for bound in BUCKETS_US] + ["inf"], stats.buckets)),
+                }
+                for action, stats in self.actions.items()
+            }
+        return dict(sorted(actions.items(), key=lambda item: item[1]["mean_us"], reverse=True))
+
+    def prometheus_text(self):
+        lines = [
+            "# HELP clio_command_seconds Latency of player commands by action.",
+            "# TYPE clio_command_seconds histogram",
+        ]
+        phase_lines = [
+            "# HELP clio_command_phase_seconds_total Time spent in each phase of player commands.",
+            "# TYPE clio_command_phase_seconds_total counter",
+        ]
+        slow_lines = [
+            "# HELP clio_slow_commands_total Commands slower than the slow command threshold.",
+            "# TYPE clio_slow_commands_total counter",
+        ]
+        self.collect()
+        with self.lock:
+            for action, stats in sorted(self.actions.items()):
+                label = f'action="{action}"'
+                cumulative = 0
+                for bound, count in zip(BUCKETS_US, stats.buckets):
+                    cumulative += count
+                    lines.append(f'clio_command_seconds_bucket{{{label},le="{bound / 1e6:g}"}} {cumulative}')
+                lines.append(f'clio_command_seconds_bucket{{{label},le="+Inf"}} {stats.count}')
+                lines.append(f"clio_command_seconds_sum{{{label}}} {stats.total_ns / 1e9:.9f}")
+                lines.append(f"clio_command_seconds_count{{{label}}} {stats.count}")
+                for phase, ns in zip(PHASES, stats.phase_ns):
+                    phase_lines.append(f'clio_command_phase_seconds_total{{{label},phase="{phase}"}} {ns / 1e9:.9f}')
+                slow_lines.append(f"clio_slow_commands_total{{{label}}} {stats.slow}")
+        return "\n".join(lines + phase_lines + slow_lines) + "\n"
+
+    def export(self):
+        """Write the stats to the export file, replacing it in one step."""
+        if not self.export_file:
+            return
+        if self.export_file.endswith(".json"):
+            data = json.dumps(self.snapshot(), indent=2)
+        else:
+            data = self.prometheus_text()
+        os.makedirs(os.path.dirname(os.path.abspath(self.export_file)), exist_ok=True)
+        temp_file = self.export_file + ".tmp"
+        with open(temp_file, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(temp_file, self.export_file)
+
+
+def phase_durations(marks):
+    """Nanoseconds spent in each phase, given the marks at phase boundaries.
+
+    A command that returned early never reached some marks; they hold a
+    time from an earlier command, and the phases they end took no time.
+    """
+    durations = []
+    previous = marks[0]
+    for mark in marks[1:]:
+        if mark < previous:
+            mark = previous
+        durations.append(mark - previous)
+        previous = mark
+    return durations
+
+
+class CommandTimer:
+    """Marks the phase boundaries of one session's current command."""
+
+    __slots__ = ("metrics", "marks")
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+        self.marks = [0] * len(PHASES)
+
+    def start(self):
+        self.marks[0] = perf_counter_ns()
+
+    def mark(self, phase):
+        """Mark the end of a phase."""
+        self.marks[phase + 1] = perf_counter_ns()
+
+    def finish(self, action, command):
+        """Mark the end of rendering and queue the command's timing."""
+        marks = self.marks
+        end = perf_counter_ns()
+        metrics = self.metrics
+        timing = (action, marks[0], marks[1], marks[2], marks[3], end)
+        metrics.pending.append(timing)
+        # Everything else waits for a slow command, a full queue or a due export
+        if end - marks[0] > metrics.slow_ns or end >= metrics.next_export or len(metrics.pending) >= metrics.BATCH:
+            metrics.after_record(timing, command)
+
+
+_shared = {}
+
+
+def get_metrics(config):
+    """Return the shared metrics for a config's "metrics" settings, or None when they are off."""
+    settings = config.get("metrics")
+    if not settings or not settings.get("enabled", True):
+        return None
+    key = json.dumps(settings, sort_keys=True)
+    metrics = _shared.get(key)
+    if metrics is None:
+        metrics = _shared[key] = CommandMetrics(settings.get("slow_ms", 50), settings.get("slow_log"),
+                                                settings.get("export_file"), settings.get("export_interval", 10))
+    return metrics
@@ -0,0 +1,82 @@
+import heapq
+
+
+class MovementScheduler:
+    """Keeps track of when movable characters are due to act.
+
+    Characters that wander every few commands sit in a priority queue keyed by
+    the command tick of their next move, each with its own countdown. Followers
+    and characters that wander when the player changes scene are kept in
+    separate lists, since they only act on scene changes.
+    """
+
+    def __init__(self):
+        self.tick = 0
+        self.intervals = {}
+        self.due_ticks = {}
+        self.followers = []
+        self.scene_change_movers = []
+        self._queue = []
+
+    def add_character(self, char_id, character):
+        """Register a character if it is movable."""
+        if not character.get("movable", False):
+            return
+        if character.get("follow_player", False):
+            self.followers.append(char_id)
+            return
+        if character.get("moves_on_scene_change", False):
+            self.scene_change_movers.append(char_id)
+        interval = max(1, character.get("moves_after_commands", 5))
+        self.intervals[char_id] = interval
+        self.schedule(char_id, self.tick + interval)
+
+    def remove_character(self, char_id):
+        """Stop scheduling a character, e.g. after it has been defeated."""
+        self.intervals.pop(char_id, None)
+        self.due_ticks.pop(char_id, None)
+        if char_id in self.followers:
+            self.followers.remove(char_id)
+        if char_id in self.scene_change_movers:
+            self.scene_change_movers.remove(char_id)
+
+    def schedule(self, char_id, due_tick):
+        # Superseded queue entries are skipped when popped
+        self.due_ticks[char_id] = due_tick
+        heapq.heappush(self._queue, (due_tick, char_id))
+
+    def advance(self):
+        """Advance one command tick and return the characters due to move."""
+        self.tick += 1
+        due = []
+        while self._queue and self._queue[0][0] <= self.tick:
+            due_tick, char_id = heapq.heappop(self._queue)
+            if self.due_ticks.get(char_id) != due_tick:
+                continue
+            due.append(char_id)
+            self.schedule(char_id, self.tick + self.intervals[char_id])
+        return due
+
+    def get_state(self):
+        return {"tick": self.tick, "due_ticks": dict(self.due_ticks)}
+
+    def load_state(self, state, characters):
+        """Rebuild the schedule for a loaded game and restore the countdowns saved by get_state.
+
+        Args:
+            state (dict): Saved by get_state, or None
+            characters (dict): Movement settings by id of the movable characters still in the game
+        """
+        state = state or {}
+        self.tick = state.get("tick", 0)
+        self.intervals = {}
+        self.due_ticks = {}
+        self.followers = []
+        self.scene_change_movers = []
+        self._queue = []
+        for char_id, character in characters.items():
+            self.add_character(char_id, character)
+        saved_due = state.get("due_ticks", {})
+        for char_id in self.intervals:
+            if char_id in saved_due:
+                self.schedule(char_id, saved_due[char_id])
@@ -0,0 +1,236 @@
+import re
+import threading
+from bisect import bisect_left
+
+# Match ranks, best first
+EXACT = 0
+LAST_WORD = 1
+PREFIX = 2
+SUBSTRING = 3
+
+NGRAM_SIZE = 3
+
+
+def normalize_name(name):
+    """Lowercase a name and collapse punctuation, underscores and spacing."""
+    return " ".join(re.findall(r"[^\W_]+", str(name).lower()))
+
+
+def rank_match(query, name, entity_id=""):
+    """Rank how well a normalized query matches a normalized name.
+
+    Returns:
+        int or None: EXACT, LAST_WORD, PREFIX or SUBSTRING, None if no match
+    """
+    if not query:
+        return None
+    if query == name or query == entity_id:
+        return EXACT
+    if query == name.rsplit(" ", 1)[-1]:
+        return LAST_WORD
+    if (" " + name).find(" " + query) != -1:
+        return PREFIX
+    if query in name:
+        return SUBSTRING
+    return None
+
+
+class NameIndex:
+    """Resolves player-typed names to entity ids.
+
+    Every name is normalized and indexed by full name, last word, each of
+    its words and character trigrams (names shorter than that whole), so a world-wide lookup only touches
+    the candidates that can match; word prefixes are found by bisecting
+    the sorted words. Lookups scoped to a scene or the inventory rank just
+    the ids in scope. Both rank matches the same way: exact, then last
+    word, then word prefix, then substring, with ties broken by the order
+    the entities were added.
+
+    An index can sit on top of a `base` with the same lookups, such as one
+    stored in a content pack; names added later are indexed in memory.
+    Maze regions add names from server worker threads, so adding and
+    searching hold the index lock.
+    """
+
+    def __init__(self, entities=None, base=None):
+        self.base = base
+        self.entries = {}
+        self.exact = {}
+        self.last_words = {}
+        self.words = {}
+        self.ngrams = {}
+        self._sorted_words = None
+        self.lock = threading.RLock()
+        if entities:
+            for entity_id, entity in entities.items():
+                self.add(entity_id, entity.get("name", entity_id))
+
+    def __len__(self):
+        return len(self.entries) + (len(self.base) if self.base else 0)
+
+    def add(self, entity_id, name):
+        """Index an entity under its display name and its id."""
+        with self.lock:
+            if self.entry(entity_id) is not None:
+                return
+            norm = normalize_name(name)
+            norm_id = normalize_name(entity_id)
+            self.entries[entity_id] = (norm, norm_id, len(self))
+
+            for key in {norm, norm_id}:
+                self.exact.setdefault(key, []).append(entity_id)
+            words = norm.split()
+            if words:
+                self.last_words.setdefault(words[-1], []).append(entity_id)
+            for word in set(words):
+                if word not in self.words:
+                    self.words[word] = []
+                    self._sorted_words = None
+                self.words[word].append(entity_id)
+            for gram in ngrams_of(norm):
+                self.ngrams.setdefault(gram, set()).add(entity_id)
+
+    def entry(self, entity_id):
+        """Return (normalized name, normalized id, order) for an id, or None."""
+        entry = self.entries.get(entity_id)
+        if entry is None and self.base is not None:
+            entry = self.base.entry(entity_id)
+        return entry
+
+    def lookup(self, kind, key):
+        """Return the ids indexed under a key of one kind, such as "words"."""
+        return getattr(self, kind).get(key, ())
+
+    def gram_terms(self):
+        return self.ngrams.keys()
+
+    def sorted_words(self):
+        if self._sorted_words is None:
+            self._sorted_words = sorted(self.words)
+        return self._sorted_words
+
+    def export(self):
+        """Return the index as plain data, for storing in a content pack."""
+        with self.lock:
+            return {
+                "entries": [[entity_id, norm, norm_id] for entity_id, (norm, norm_id, _) in self.entries.items()],
+                "exact": self.exact,
+                "last_words": self.last_words,
+                "words": self.words,
+                "ngrams": {gram: sorted(ids) for gram, ids in self.ngrams.items()},
+            }
+
+    def _sources(self):
+        return [self] if self.base is None else [self.base, self]
+
+    def _lookup(self, kind, key):
+        ids = self.lookup(kind, key)
+        if self.base is None:
+            return ids
+        base_ids = self.base.lookup(kind, key)
+        return list(base_ids) + list(ids) if ids else base_ids
+
+    def _prefixed(self, prefix):
+        """Return the ids with a word starting with prefix."""
+        ids = set()
+        for source in self._sources():
+            words = source.sorted_words()
+            for i in range(bisect_left(words, prefix), len(words)):
+                if not words[i].startswith(prefix):
+                    break
+                ids.update(source.lookup("words", words[i]))
+        return ids
+
+    def _containing(self, query):
+        """Return the ids whose name contains a query shorter than a trigram."""
+        ids = set()
+        for source in self._sources():
+            for term in source.gram_terms():
+                if query in term:
+                    ids.update(source.lookup("ngrams", term))
+        return ids
+
+    def _candidate_tiers(self, query):
+        """Yield (rank, ids) pairs; no id in a later tier ranks better than it.
+
+        Until one of them has any ids, the exact and last word tiers hold
+        only ids of their own rank, in the order they were added.
+        """
+        yield EXACT, self._lookup("exact", query)
+        yield LAST_WORD, self._lookup("last_words", query)
+        yield PREFIX, self._prefixed(query.split(" ", 1)[0])
+
+        if len(query) < NGRAM_SIZE:
+            yield SUBSTRING, self._containing(query)
+            return
+        postings = []
+        for i in range(len(query) - NGRAM_SIZE + 1):
+            posting = self._lookup("ngrams", query[i:i + NGRAM_SIZE])
+            if not posting:
+                return
+            postings.append(set(posting))
+        postings.sort(key=len)
+        yield SUBSTRING, postings[0].intersection(*postings[1:])
+
+    def search(self, query, scope=None):
+        """Find the best matching ids for a query.
+
+        Args:
+            query (str): Name typed by the player
+            scope (iterable): Ids to restrict the search to, or None for all
+
+        Returns:
+            tuple: (rank, ids) for the best tier, or (None, []) if nothing matches
+        """
+        query = normalize_name(query)
+        if not query:
+            return None, []
+        with self.lock:
+            return self._search(query, scope)
+
+    def _search(self, query, scope):
+        if scope is None:
+            tiers = self._candidate_tiers(query)
+        else:
+            tiers = [(SUBSTRING, scope)]
+
+        best_rank = None
+        best = {}
+        for tier_rank, candidates in tiers:
+            if best_rank is not None and best_rank <= tier_rank:
+                break
+            if scope is None and tier_rank in (EXACT, LAST_WORD):
+                # No need to rank these, or look up their entries
+                if candidates:
+                    return tier_rank, list(candidates)
+                continue
+            for entity_id in candidates:
+                if entity_id in best:
+                    continue
+                entry = self.entry(entity_id)
+                if entry is None:
+                    continue
+                rank = rank_match(query, entry[0], entry[1])
+                if rank is None or (best_rank is not None and rank > best_rank):
+                    continue
+                if best_rank is None or rank < best_rank:
+                    best_rank = rank
+                    best = {}
+                best[entity_id] = entry[2]
+        return best_rank, sorted(best, key=best.get)
+
+    def matches(self, query, scope=None):
+        """Return the ids in the best matching tier, in a stable order."""
+        return self.search(query, scope)[1]
+
+    def resolve(self, query, scope=None):
+        """Return the single best matching id, or None."""
+        ids = self.matches(query, scope)
+        return ids[0] if ids else None
+
+
+def ngrams_of(text):
+    """Return the trigrams of a normalized name, or the name itself if shorter."""
+    if len(text) < NGRAM_SIZE:
+        return {text} if text else set()
+    return {text[i:i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
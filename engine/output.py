@@ -0,0 +1,125 @@
+import sys
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, List, Optional
+from engine.animation import animations
+
+
+@dataclass
+class OutputRecord:
+    """One message produced while a command runs.
+
+    style is a TextStyler style name, or None for plain text, looked up in
+    the style bundle that was active when the record was written. Typed records
+    are typed out instead of rendered, at char_delay or else at the speed of
+    their style.
+    """
+    text: str
+    style: Optional[str] = "default"
+    typed: bool = False
+    char_delay: Optional[float] = None
+    bundle: Optional[Any] = None
+
+
+class OutputSink:
+    """Receives the output records of the engine."""
+
+    def emit(self, record: OutputRecord):
+        raise NotImplementedError
+
+    def flush(self):
+        pass
+
+
+class StreamSink(OutputSink):
+    """Buffers records and renders them in one write when flushed.
+
+    Records that play over time (typewriter text, animated frames) are
+    played when reached, after writing everything buffered before them.
+    Animated effects run on the animation thread and do not hold up the
+    command.
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream
+        self.records: List[OutputRecord] = []
+
+    def emit(self, record: OutputRecord):
+        self.records.append(record)
+
+    def flush(self):
+        if not self.records:
+            return
+        from engine.text_styler import TextStyler
+        styler = TextStyler()
+        # The console stream is looked up at flush time so redirected stdout is honoured
+        stream = self.stream or sys.stdout
+        records, self.records = self.records, []
+        chunks = []
+        for record in records:
+            if styler.is_timed(record):
+                self.write(stream, chunks)
+                chunks = []
+                styler.play(record, stream)
+            else:
+                chunks.append(styler.render(record))
+        self.write(stream, chunks)
+
+    @staticmethod
+    def write(stream, chunks):
+        if not chunks:
+            return
+        # Newer output fast-forwards any effect still playing on this stream
+        animations.cancel(stream)
+        stream.write("".join(chunks))
+        stream.flush()
+
+
+class NullSink(OutputSink):
+    """Discards all output, for benchmarks."""
+
+    def emit(self, record: OutputRecord):
+        pass
+
+
+class CaptureSink(OutputSink):
+    """Keeps the records unrendered, for tests."""
+
+    def __init__(self):
+        self.records: List[OutputRecord] = []
+
+    def emit(self, record: OutputRecord):
+        self.records.append(record)
+
+    def messages(self, style=None):
+        """Return the captured texts, optionally only those with the given style."""
+        return [record.text for record in self.records if style is None or record.style == style]
+
+    def text(self):
+        return "\n".join(record.text for record in self.records)
+
+    def clear(self):
+        self.records.clear()
+
+
+_default_sink = StreamSink()
+_current_sink = ContextVar("output_sink", default=None)
+
+
+def get_sink() -> OutputSink:
+    """Return the sink output goes to in the current context."""
+    return _current_sink.get() or _default_sink
+
+
+@contextmanager
+def use_sink(sink: OutputSink):
+    """Send output in this context to sink, flushing it on exit."""
+    token = _current_sink.set(sink)
+    try:
+        yield sink
+    finally:
+        try:
+            sink.flush()
+        finally:
+            _current_sink.reset(token)
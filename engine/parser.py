@@ -1,4 +1,21 @@
+import re
+from collections import OrderedDict
+
+
 class Parser:
+    """Turns a player's command into an action and its parameters.
+
+    Every verb in `actions`, plus aliases added with add_verbs, is compiled
+    into a trie keyed by word, so a command is matched against all verbs in
+    a single walk over its words. The longest verb that fits wins. What
+    follows the verb fills the action's parameter, or is split on the
+    action's `separators` when it takes two. Parsed commands are kept in a
+    small LRU cache, since players repeat themselves.
+    """
+
+    # Distinct commands whose parse results are kept
+    PARSE_CACHE_SIZE = 256
+
     def __init__(self):
         self.actions = [
             {
@@ -19,7 +36,9 @@ class Parser:
             {
                 "names": ["combine", "merge"],
                 "action": "combine_items",
-                "parameters": ["item1_name", "item2_name"]
+                "parameters": ["item1_name", "item2_name"],
+                "separators": [" with ", " and ", " + "],
+                "usage": "Invalid combination format. Use 'combine [item1] with [item2]' or 'combine [item1] and [item2]'."
             },
             {
                 "names": ["repair"],
@@ -59,7 +78,9 @@ class Parser:
             {
                 "names": ["give"],
                 "action": "give_item_to_character",
-                "parameters": ["item_name", "character_name"]
+                "parameters": ["item_name", "character_name"],
+                "separators": [" to "],
+                "usage": "Invalid give command. Use 'give [item_name] to [character_name]'."
             },
             {
                 "names": ["fight", "attack", "hit"],
@@ -77,10 +98,15 @@ class Parser:
                 "parameters": ["target_name"]
             },
             {
-                "names": ["exit", "go to"],
+                "names": ["exit"],
                 "action": "exit_room",
                 "parameters": []
             },
+            {
+                "names": ["go to", "travel to", "walk to"],
+                "action": "travel_to",
+                "parameters": ["destination"]
+            },
             {
                 "names": ["inventory"],
                 "action": "list_inventory",
@@ -114,7 +140,8 @@ class Parser:
             {
                 "names": ["help", "?"],
                 "action": "help",
-                "parameters": ["topic"]
+                "parameters": ["topic"],
+                "optional": True
             },
             {
                 "names": ["hint"],
@@ -124,126 +151,109 @@ class Parser:
             {
                 "names": ["style"],
                 "action": "change_style",
-                "parameters": ["style_name"]
+                "parameters": ["style_name"],
+                "optional": True
             }
         ]
+        self.trie = {}
+        self.verbs = {}
+        self.parse_cache = OrderedDict()
+        for action in self.actions:
+            self.compile_action(action)
 
-    def parse_combination(self, command):
-        """Parse combination command formats."""
-        # Handle various combination formats:
-        # "item1 with item2"
-        # "item1 and item2"
-        command = command.replace(" with ", " + ")
-        command = command.replace(" and ", " + ")
-        items = command.split(" + ")
-        return [item.strip() for item in items] if len(items) == 2 else None
-
-    def parse_command(self, command):
-        command = command.lower().strip()
-
-        # Special case for "give" command
-        if command.startswith("give "):
-            remaining = command[5:].strip()
-            parts = remaining.split(" to ")
-            if len(parts) == 2:
-                item_name = parts[0].strip()
-                character_name = parts[1].strip()
-                return {
-                    "action": "give_item_to_character",
-                    "parameters": {"item_name": item_name, "character_name": character_name}
-                }
-            else:
-                return {
-                    "action": "invalid",
-                    "message": "Invalid give command. Use 'give [item_name] to [character_name]'."
-                }
+    def compile_action(self, action):
+        """Add an action's verbs to the trie; a verb already taken keeps its first action."""
+        separators = action.get("separators")
+        splitter = re.compile("|".join(map(re.escape, separators))) if separators else None
+        for name in action["names"]:
+            self.add_verb(name, action, splitter)
 
-        # Special case for help command
-        if command.startswith("help "):
-            parts = command.split(None, 1)  # Split into max 2 parts
-            if len(parts) > 1:
-                return {
-                    "action": "help",
-                    "parameters": {"topic": parts[1].strip()}  # Changed from topic_name to topic
-                }
-        elif command == "help":
-            return {
-                "action": "help",
-                "parameters": {"topic": None}  # Changed from topic_name to topic
-            }
-        
+    def add_verb(self, name, action, splitter):
+        node = self.trie
+        for word in name.split():
+            node = node.setdefault(word, {})
+        # The empty key marks the end of a verb, as words are never empty
+        node.setdefault("", (name, action, splitter))
+        self.verbs.setdefault(name, node[""])
 
-        # Special case for style command
-        if command.startswith("style"):
-            parts = command.split(None, 1)
-            style_name = parts[1] if len(parts) > 1 else None
-            return {
-                "action": "change_style",
-                "parameters": {"style_name": style_name}
-            }            
+    def add_verbs(self, verbs):
+        """Add verb aliases, such as those defined in the game config.
 
-        # Handle combine command specially
-        if command.startswith("combine "):
-            remaining = command[8:].strip()  # Length of "combine " is 8
-            items = self.parse_combination(remaining)
-            if items:
-                return {
-                    "action": "combine_items",
-                    "parameters": {
-                        "item1_name": items[0],
-                        "item2_name": items[1]
-                    }
-                }
+        Args:
+            verbs (dict): Alias -> an existing verb or action name, e.g. {"x": "examine"}
+        """
+        actions = {action["action"]: action for action in self.actions}
+        for alias, verb in verbs.items():
+            alias = " ".join(alias.lower().split())
+            if verb in self.verbs:
+                _, action, splitter = self.verbs[verb]
+            elif verb in actions:
+                action = actions[verb]
+                _, _, splitter = self.verbs[action["names"][0]]
             else:
-                return {
-                    "action": "invalid",
-                    "message": "Invalid combination format. Use 'combine [item1] with [item2]' or 'combine [item1] and [item2]'."
-                }
+                raise ValueError(f"Verb alias '{alias}' names unknown verb '{verb}'")
+            if alias not in action["names"]:
+                action["names"].append(alias)
+            self.add_verb(alias, action, splitter)
+        self.parse_cache.clear()
 
-        # Process multi-word commands
-        for action in self.actions:
-            for name in action["names"]:
-                if " " in name:  # Multi-word command
-                    if command.startswith(name + " "):
-                        remaining = command[len(name):].strip()
-                        if remaining:
-                            # Check if this is a combination command
-                            if action["action"] == "combine_items":
-                                items = self.parse_combination(remaining)
-                                if items:
-                                    return {
-                                        "action": action["action"],
-                                        "parameters": {
-                                            "item1_name": items[0],
-                                            "item2_name": items[1]
-                                        }
-                                    }
-                            else:
-                                return {
-                                    "action": action["action"],
-                                    "parameters": {action["parameters"][0]: remaining}
-                                }
-                    elif command == name:
-                        if not action["parameters"]:
-                            return {"action": action["action"], "parameters": {}}
-                        else:
-                            return {
-                                "action": "invalid",
-                                "message": f"The command '{name}' needs a target. Try '{name} [target]'."
-                            }
+    def parse_command(self, command):
+        """Parse a command, returning a cached result for one seen recently.
 
-        # Process single-word commands
-        for action in self.actions:
-            for name in action["names"]:
-                if not " " in name:
-                    if command == name:
-                        return {"action": action["action"], "parameters": {}}
-                    elif command.startswith(name + " "):
-                        remaining = command[len(name):].strip()
-                        if remaining and action["parameters"]:
-                            return {
-                                "action": action["action"],
-                                "parameters": {action["parameters"][0]: remaining}
-                            }
+        The result is shared with later calls, so it must not be modified.
+        """
+        command = " ".join(command.lower().split())
+        parsed = self.parse_cache.get(command)
+        if parsed is not None:
+            self.parse_cache.move_to_end(command)
+            return parsed
+        parsed = self.resolve(command)
+        self.parse_cache[command] = parsed
+        if len(self.parse_cache) > self.PARSE_CACHE_SIZE:
+            self.parse_cache.popitem(last=False)
+        return parsed
+
+    def resolve(self, command):
+        """Parse a normalized command without the cache."""
+        words = command.split(" ")
+        matches = []
+        node = self.trie
+        for length, word in enumerate(words, 1):
+            node = node.get(word)
+            if node is None:
+                break
+            if "" in node:
+                matches.append((length, node[""]))
 
+        # A verb that takes no parameters does not match if words follow it, so try a shorter one
+        for length, verb in reversed(matches):
+            parsed = self.bind(verb, " ".join(words[length:]))
+            if parsed is not None:
+                return parsed
         return {"action": "invalid", "message": "I don't understand that command. Try 'help' for a list of commands."}
+
+    @staticmethod
+    def bind(verb, remaining):
+        """Fill an action's parameters with the words after its verb, or None if they do not fit."""
+        name, action, splitter = verb
+        parameters = action["parameters"]
+        if not remaining:
+            if not parameters:
+                return {"action": action["action"], "parameters": {}}
+            if action.get("optional"):
+                return {"action": action["action"], "parameters": {parameters[0]: None}}
+            return {
+                "action": "invalid",
+                "message": f"The command '{name}' needs a target. Try '{name} [target]'."
+            }
+        if not parameters:
+            return None
+        if splitter is None:
+            return {"action": action["action"], "parameters": {parameters[0]: remaining}}
+        parts = splitter.split(remaining)
+        if len(parts) != 2:
+            return {"action": "invalid", "message": action["usage"]}
+        return {
+            "action": action["action"],
+            "parameters": {parameters[0]: parts[0].strip(), parameters[1]: parts[1].strip()}
+        }
@@ -0,0 +1,176 @@
+from collections import OrderedDict, deque
+
+from engine.name_index import EXACT, normalize_name, rank_match
+
+
+def passable(exit):
+    return not exit.get("locked", False) and not exit.get("blocked", False)
+
+
+class ReverseSearch:
+    """Breadth-first search backwards from a target over open exits.
+
+    `next_hops` maps every scene found so far to the next scene on a
+    shortest open route from it to the target. The search is resumed only
+    as far as a walker needs, and is `done` once nothing more can be found.
+    """
+
+    __slots__ = ("target", "next_hops", "queue", "done")
+
+    def __init__(self, target):
+        self.target = target
+        self.next_hops = {target: None}
+        self.queue = deque([target])
+        self.done = False
+
+
+class Pathfinder:
+    """Shortest routes over one session's exit graph.
+
+    Routes only use exits that are neither locked nor blocked, and only
+    cross scenes that already exist, so they never make new maze regions.
+
+    Walkers heading for the same scene share one search, run backwards from
+    that scene along the World's `entrances` index. Whoever asks first
+    extends it until their own scene is found, so followers chasing the
+    player cost one search per scene change, not one each. Searches are
+    kept for the `max_targets` targets used last, including what they found
+    unreachable, and dropped when an exit is locked, unlocked, blocked or
+    unblocked. A search stops after `max_scenes` scenes, and all searches
+    together expand at most `max_work` scenes per command; a walker whose
+    route is not found within that waits and tries again next command.
+    """
+
+    def __init__(self, world_state, max_scenes=10000, max_work=2000, max_targets=32):
+        self.world_state = world_state
+        self.world = world_state.world
+        self.max_scenes = max_scenes
+        self.max_work = max_work
+        self.max_targets = max_targets
+        self.searches = OrderedDict()
+        # Entrances added by exits this session created, {scene id: [scene ids]}
+        self.extra_entrances = {}
+        self.version = None
+        self.work = 0
+
+    def start_command(self):
+        """Give the searches a fresh work budget for the next command."""
+        self.work = 0
+
+    def check_version(self):
+        if self.version != self.world_state.exits_version:
+            self.searches.clear()
+            self.extra_entrances = self.session_entrances()
+            self.version = self.world_state.exits_version
+
+    def session_entrances(self):
+        """Return the entrances added by exits lists this session owns."""
+        entrances = {}
+        for path, exits in self.world_state.changes.items():
+            if len(path) != 3 or path[-1] != "exits" or not isinstance(exits, list):
+                continue
+            scene_id = path[1] if path[0] == "maze" else self.world_state.scenes[path[1]]["id"]
+            for exit in exits:
+                entrances.setdefault(exit["scene_id"], []).append(scene_id)
+        return entrances
+
+    def exits(self, scene_id):
+        """Yield the ids of the scenes reachable in one step through open exits."""
+        scene = self.world_state.get_scene(scene_id, make=False)
+        if scene is None:
+            return
+        for exit in scene.get("exits", []):
+            if passable(exit):
+                yield exit["scene_id"]
+
+    def entrances(self, scene_id):
+        """Yield the ids of the scenes with an open exit into a scene."""
+        for source in self.world.entrances.get(scene_id, []) + self.extra_entrances.get(scene_id, []):
+            if scene_id in self.exits(source):
+                yield source
+
+    def reverse_search(self, target):
+        search = self.searches.get(target)
+        if search is None:
+            search = self.searches[target] = ReverseSearch(target)
+            if len(self.searches) > self.max_targets:
+                self.searches.popitem(last=False)
+        else:
+            self.searches.move_to_end(target)
+        return search
+
+    def next_hop(self, source, target):
+        """Return the next scene on a shortest open route from source to target.
+
+        Returns:
+            str or None: The next scene id, None if there is no open route,
+            or none was found within this command's work budget
+        """
+        self.check_version()
+        search = self.reverse_search(target)
+        next_hops = search.next_hops
+        while source not in next_hops and not search.done:
+            if self.work >= self.max_work:
+                return None
+            self.work += 1
+            scene_id = search.queue.popleft()
+            for previous_id in self.entrances(scene_id):
+                if previous_id not in next_hops:
+                    next_hops[previous_id] = scene_id
+                    search.queue.append(previous_id)
+            if not search.queue or len(next_hops) >= self.max_scenes:
+                search.done = True
+        return next_hops.get(source)
+
+    def search(self, source, is_target):
+        """Breadth-first search from source for the nearest scene is_target accepts.
+
+        Returns:
+            list or None: Scene ids from source to the target, or None
+        """
+        came_from = {source: None}
+        queue = deque([source])
+        while queue:
+            scene_id = queue.popleft()
+            if is_target(scene_id):
+                route = []
+                while scene_id is not None:
+                    route.append(scene_id)
+                    scene_id = came_from[scene_id]
+                route.reverse()
+                return route
+            if len(came_from) >= self.max_scenes:
+                continue
+            for next_id in self.exits(scene_id):
+                if next_id not in came_from:
+                    came_from[next_id] = scene_id
+                    queue.append(next_id)
+        return None
+
+    def find_scene(self, source, name):
+        """Find the nearest scene reachable through open exits whose name or id matches.
+
+        Returns:
+            list or None: Scene ids after source on the route to the best
+            match, which is the nearest of the best ranked, or None
+        """
+        query = normalize_name(name)
+        best = {}
+
+        def rank(scene_id):
+            scene = self.world_state.get_scene(scene_id, make=False)
+            if scene is None:
+                return False
+            match = rank_match(query, normalize_name(scene.get("name", scene_id)), normalize_name(scene_id))
+            if match is not None and match not in best:
+                best[match] = scene_id
+            # Nothing can beat an exact match, and the first one found is the nearest
+            return match == EXACT
+
+        route = self.search(source, rank)
+        if not best:
+            return None
+        target = best[min(best)]
+        if route is None or route[-1] != target:
+            route = self.search(source, lambda scene_id: scene_id == target)
+        return route[1:]
@@ -0,0 +1,15 @@
+from dataclasses import dataclass
+from typing import Callable
+
+# Returned by GameEngine.process_command while a prompt waits for the next line
+AWAITING_CHOICE = "awaiting choice"
+
+@dataclass
+class Prompt:
+    """A question the engine is waiting for the player to answer.
+
+    The next line of input is passed to handler instead of being parsed as
+    a command. Handlers that need another answer ask a new prompt.
+    """
+    message: str
+    handler: Callable[[str], None]
@@ -0,0 +1,51 @@
+def component_key(item_ids):
+    """Order independent key for a multiset of item ids."""
+    return tuple(sorted(item_ids))
+
+
+class RecipeIndex:
+    """Crafting recipes compiled from the items data at load time.
+
+    Maps component multisets to the item they combine into, broken items to
+    their repaired version and NPC crafters to the items they can craft, so
+    combining, repairing and giving items to a crafter are hash lookups.
+    """
+
+    def __init__(self, items_data=None):
+        self.combinations = {}
+        self.repairs = {}
+        self.npc_recipes = {}
+        self.npc_required_items = {}
+        if items_data:
+            for item_id, item in items_data.items():
+                self.add_item(item_id, item)
+
+    def add_item(self, item_id, item):
+        # The first item defined for a recipe wins, as with the old linear scans
+        components = item.get("components")
+        if components:
+            self.combinations.setdefault(component_key(components), item_id)
+            if len(components) == 1:
+                self.repairs.setdefault(components[0], item_id)
+
+        craft_data = item.get("npc_craftable")
+        if craft_data:
+            crafter = craft_data["crafter"]
+            self.npc_recipes.setdefault(crafter, []).append(item_id)
+            self.npc_required_items.setdefault(crafter, set()).update(craft_data["required_items"])
+
+    def combination_for(self, *item_ids):
+        """Return the id of the item the given items combine into, or None."""
+        return self.combinations.get(component_key(item_ids))
+
+    def repaired_version(self, item_id):
+        """Return the id of the repaired version of a broken item, or None."""
+        return self.repairs.get(item_id)
+
+    def recipes_for_crafter(self, character_id):
+        """Return the ids of the items a character can craft."""
+        return self.npc_recipes.get(character_id, [])
+
+    def required_items_for_crafter(self, character_id):
+        """Return the ids of every item a character crafts with."""
+        return self.npc_required_items.get(character_id, set())
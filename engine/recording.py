@@ -0,0 +1,119 @@
+import difflib
+import json
+import tempfile
+import time
+
+from engine.game_engine import GameEngine
+from engine.output import CaptureSink, OutputSink, use_sink
+from engine.parser import Parser
+from engine.save_manager import SaveManager
+from engine.typewriter import set_no_delay
+from engine.world import World
+
+RECORDING_VERSION = 1
+
+
+class SessionRecorder(OutputSink):
+    """Records a session so it can be replayed exactly.
+
+    The recording is JSON lines: a header with the session's seed, content
+    hash and config, then one line per input line, answers to prompts
+    included, with the text of the output it produced. The recorder is the
+    output sink of the session and passes every record on to the sink that
+    would otherwise have received it.
+    """
+
+    def __init__(self, filename, sink):
+        self.file = open(filename, "w", encoding="utf-8")
+        self.sink = sink
+        self.command = None
+        self.output = []
+
+    def start(self, engine, config_file):
+        """Write the header for an engine's session and start recording its input."""
+        header = {
+            "clio_recording": RECORDING_VERSION,
+            "seed": engine.seed,
+            "content_hash": engine.world.content_hash,
+            "config": config_file,
+            "player": engine.saves.player,
+        }
+        self.file.write(json.dumps(header) + "\n")
+        engine.recorder = self
+
+    def input(self, command):
+        self.write_entry()
+        self.command = command
+
+    def emit(self, record):
+        if self.command is not None:
+            self.output.append(record.text)
+        self.sink.emit(record)
+
+    def flush(self):
+        self.write_entry()
+        self.sink.flush()
+
+    def write_entry(self):
+        # An input's entry is complete once its output has been flushed or the next line arrives
+        if self.command is None:
+            return
+        self.file.write(json.dumps({"input": self.command, "output": self.output}) + "\n")
+        self.file.flush()
+        self.command = None
+        self.output = []
+
+    def close(self):
+        self.write_entry()
+        self.file.close()
+
+
+def read_recording(filename):
+    """Return the header and input entries of a recording."""
+    with open(filename, "r", encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f if line.strip()]
+    if not lines or lines[0].get("clio_recording") != RECORDING_VERSION:
+        raise ValueError(f"{filename} is not a CLIo recording")
+    return lines[0], lines[1:]
+
+
+def replay(filename, config_file=None):
+    """Run a recording again at full speed without a terminal and compare the output.
+
+    Returns:
+        dict: Commands replayed, seconds taken, whether the content matched
+        the recording and a unified diff of any output that differs
+    """
+    header, entries = read_recording(filename)
+    config_file = config_file or header["config"]
+    with open(config_file, "r") as f:
+        config = json.load(f)
+    set_no_delay()
+
+    world = World.load(config)
+    capture = CaptureSink()
+    expected, actual = [], []
+    with tempfile.TemporaryDirectory() as save_dir, use_sink(capture):
+        engine = GameEngine(config_file, None, Parser(), world=world, player=header["player"], seed=header["seed"])
+        # Replays must not touch the player's real saves
+        engine.autosave_enabled = False
+        engine.saves = SaveManager(save_dir, header["player"])
+        engine.save_journal = engine.saves.journal
+
+        start = time.perf_counter()
+        for entry in entries:
+            capture.clear()
+            engine.process_command(entry["input"])
+            prompt = f">> {entry['input']}"
+            expected.append(prompt)
+            expected.extend(entry["output"])
+            actual.append(prompt)
+            actual.extend(capture.messages())
+        elapsed = time.perf_counter() - start
+
+    return {
+        "commands": len(entries),
+        "seconds": elapsed,
+        "content_matches": world.content_hash == header["content_hash"],
+        "diff": list(difflib.unified_diff(expected, actual, "recorded", "replayed", lineterm="")),
+    }
@@ -0,0 +1,100 @@
+import threading
+import weakref
+from collections import Counter, OrderedDict
+
+
+class ResidencyManager:
+    """Keeps decoded pack entities in memory around the players.
+
+    Entities are keyed by (kind, key), for example ("scenes", 3) or
+    ("items", "apple"). Each session pins its neighborhood: the scene it is
+    in, the scenes within a few exits and the entities those reference.
+    Everything else is paged in when used and evicted least recently used
+    once the decoded entities exceed the memory cap. Sizes are estimated
+    from the encoded size of each entity in the pack.
+
+    Sessions never write to these entities; their changes live in their
+    WorldState, so evicting and decoding an entity again loses nothing.
+    """
+
+    def __init__(self, memory_cap=64 * 1024 * 1024, radius=1):
+        self.memory_cap = memory_cap
+        self.radius = radius
+        # Unpinned entities in least recently used order, and pinned ones apart
+        self.entries = OrderedDict()
+        self.pinned_entries = {}
+        self.size = 0
+        self.pins = {}
+        self.pinned = Counter()
+        self.lock = threading.Lock()
+
+    def get(self, key, size, load):
+        """Return a resident entity, paging it in with load() if needed."""
+        with self.lock:
+            entry = self.pinned_entries.get(key)
+            if entry is None:
+                entry = self.entries.get(key)
+                if entry is not None:
+                    self.entries.move_to_end(key)
+            if entry is not None:
+                return entry[0]
+
+        value = load()
+        with self.lock:
+            entry = self.pinned_entries.get(key) or self.entries.get(key)
+            if entry is not None:
+                # Another session paged it in meanwhile; keep a single copy
+                return entry[0]
+            if self.pinned[key]:
+                self.pinned_entries[key] = (value, size)
+            else:
+                self.entries[key] = (value, size)
+            self.size += size
+            self.evict()
+        return value
+
+    def evict(self):
+        """Drop unpinned entities, oldest use first, until under the memory cap."""
+        while self.size > self.memory_cap and self.entries:
+            _, (_, size) = self.entries.popitem(last=False)
+            self.size -= size
+
+    def pin(self, owner, keys):
+        """Replace the set of entities an owner keeps resident.
+
+        The pins are released when the owner is garbage collected.
+        """
+        keys = set(keys)
+        with self.lock:
+            owner_id = id(owner)
+            if owner_id not in self.pins:
+                weakref.finalize(owner, self.release, owner_id)
+            old = self.pins.get(owner_id, set())
+            self.pins[owner_id] = keys
+            self._pin(keys - old)
+            self._unpin(old - keys)
+            self.evict()
+
+    def release(self, owner_id):
+        with self.lock:
+            self._unpin(self.pins.pop(owner_id, set()))
+            self.evict()
+
+    def _pin(self, keys):
+        for key in keys:
+            self.pinned[key] += 1
+            if key in self.entries:
+                self.pinned_entries[key] = self.entries.pop(key)
+
+    def _unpin(self, keys):
+        for key in keys:
+            self.pinned[key] -= 1
+            if self.pinned[key] > 0:
+                continue
+            del self.pinned[key]
+            # Entities a session just left count as the most recently used
+            if key in self.pinned_entries:
+                self.entries[key] = self.pinned_entries.pop(key)
+
+    def is_resident(self, key):
+        return key in self.pinned_entries or key in self.entries
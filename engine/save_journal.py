@@ -0,0 +1,247 @@
+import json
+import os
+from collections.abc import Mapping, Sequence
+
+
+def plain(value):
+    # Session state can hold views onto the shared world; save their contents
+    if isinstance(value, Mapping):
+        return dict(value)
+    if isinstance(value, Sequence) and not isinstance(value, str):
+        return list(value)
+    raise TypeError(f"Cannot save {type(value).__name__}")
+
+
+def encode(value):
+    """Encode save data compactly as JSON."""
+    return json.dumps(value, separators=(",", ":"), default=plain)
+
+
+# How player fields are split for saving only what changed: a field named
+# here is saved entry by entry, and its own dict splits those entries further
+FIELD_SPLITS = {
+    "character_locations": {},
+    "character_crafting_inventories": {},
+    "patrol_targets": {},
+    "movement_schedule": {"due_ticks": {}},
+}
+
+# The movement tick moves every command. A change to it alone is not worth a
+# record, but it goes along with records written for other changes, so the
+# saved movement countdowns stay right.
+VOLATILE = (("movement_schedule", "tick"),)
+
+# Fields only saved in snapshots: when characters last moved, which nothing
+# needs back exactly
+SNAPSHOT_ONLY = ("characters_last_move",)
+
+_SCALARS = (str, int, float, bool, type(None))
+_MISSING = object()
+
+
+def fingerprint(value):
+    # Scalars compare as they are; anything else may be edited in place later
+    return value if isinstance(value, _SCALARS) else encode(value)
+
+
+class SaveJournal:
+    """A save made of a compacted snapshot plus a journal of later changes.
+
+    Saving after a command appends one line holding only the player state
+    entries and world changes that differ from the last save. Fields named
+    in FIELD_SPLITS, such as character locations, are compared and saved
+    entry by entry. Every `snapshot_interval` records, the full state is
+    written as a new snapshot and the journal starts over. Loading reads
+    the snapshot and replays the journal records written after it.
+
+    The files on disk may belong to an earlier game, so a session leaves
+    them alone until its state first changes, and then starts with a
+    snapshot. Loading the autosave continues it instead.
+
+    Records carry a sequence number, so a journal left behind by a crash
+    between writing a snapshot and truncating the journal is skipped, and
+    a last line cut short by a crash is ignored.
+    """
+
+    def __init__(self, path, snapshot_interval=100):
+        self.snapshot_file = path + ".snapshot.json"
+        self.journal_file = path + ".journal"
+        self.snapshot_interval = snapshot_interval
+        self.seq = 0
+        self.records = 0
+        # Fingerprints of the state entries as of the last save, by path; None if unknown
+        self.saved_entries = None
+        # Copies of the split maps as of the last save, so unchanged ones are skipped whole
+        self.saved_maps = {}
+        self.saved_world = {}
+        # Whether the files on disk hold this session's game
+        self.synced = False
+
+    def start(self, state, world_state):
+        """Take a new session's state as the starting point, without writing anything."""
+        world_state.take_dirty()
+        self.remember(state, world_state.entries())
+        self.synced = False
+
+    def detach(self):
+        """Forget what was saved, after the session loaded a game from elsewhere."""
+        self.saved_entries = None
+        self.synced = False
+
+    def record(self, state, world_state):
+        """Save what changed since the last save.
+
+        Returns:
+            bool: Whether anything was written
+        """
+        if self.saved_entries is None or self.records >= self.snapshot_interval:
+            self.snapshot(state, world_state)
+            return True
+
+        changed, maps, deleted = {}, [], []
+        for key, value in state.items():
+            if key not in SNAPSHOT_ONLY:
+                self.compare(value, FIELD_SPLITS.get(key), (key,), changed, maps, deleted)
+        world = []
+        for entry in world_state.take_dirty():
+            path = tuple(entry[0])
+            encoded = encode(entry)
+            if self.saved_world.get(path) != encoded:
+                world.append((path, entry, encoded))
+        if not world and not deleted and all(path in VOLATILE for path in changed):
+            return False
+        if not self.synced:
+            self.snapshot(state, world_state)
+            return True
+
+        for path, (value, mark) in changed.items():
+            self.saved_entries[path] = mark
+        for path, value in maps:
+            self.saved_maps[path] = dict(value)
+        for path in deleted:
+            self.forget(path)
+        for path, entry, encoded in world:
+            self.saved_world[path] = encoded
+
+        self.seq += 1
+        line = encode({
+            "seq": self.seq,
+            "entries": [[list(path), value] for path, (value, mark) in changed.items()],
+            "deleted": [list(path) for path in deleted],
+            "world": [entry for path, entry, encoded in world],
+        })
+        with open(self.journal_file, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+        self.records += 1
+        return True
+
+    def compare(self, value, split, path, changed, maps, deleted):
+        """Collect the state entries under path that differ from the last save."""
+        if split is None or not isinstance(value, Mapping):
+            mark = fingerprint(value)
+            if self.saved_entries.get(path, _MISSING) != mark:
+                changed[path] = (value, mark)
+            return
+        saved = self.saved_maps.get(path)
+        if saved == value:
+            return
+        maps.append((path, value))
+        for key, item in value.items():
+            self.compare(item, split.get(key), path + (key,), changed, maps, deleted)
+        if saved is not None:
+            deleted.extend(path + (key,) for key in saved if key not in value)
+
+    def forget(self, path):
+        """Drop what was saved at and under a deleted path."""
+        for saved in (self.saved_entries, self.saved_maps):
+            for key in [key for key in saved if key[:len(path)] == path]:
+                del saved[key]
+
+    def snapshot(self, state, world_state):
+        """Write the full state as a new snapshot and empty the journal."""
+        self.seq += 1
+        world_state.take_dirty()
+        world = world_state.entries()
+        data = encode({"seq": self.seq, "state": state, "world": world})
+        os.makedirs(os.path.dirname(os.path.abspath(self.snapshot_file)), exist_ok=True)
+        temp_file = self.snapshot_file + ".tmp"
+        with open(temp_file, "w", encoding="utf-8") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, self.snapshot_file)
+        open(self.journal_file, "w").close()
+        self.remember(state, world)
+        self.records = 0
+        self.synced = True
+
+    def load(self):
+        """Return the saved (state, world entries), or None if there is no save."""
+        try:
+            with open(self.snapshot_file, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            return None
+
+        seq = snapshot["seq"]
+        state = snapshot["state"]
+        world = snapshot["world"]
+        records = 0
+        for record in self.read_journal():
+            if record["seq"] <= seq:
+                continue
+            seq = record["seq"]
+            for path, value in record["entries"]:
+                node = state
+                for key in path[:-1]:
+                    node = node.setdefault(key, {})
+                node[path[-1]] = value
+            for path in record["deleted"]:
+                node = state
+                for key in path[:-1]:
+                    node = node.get(key, {})
+                node.pop(path[-1], None)
+            world.extend(record["world"])
+            records += 1
+
+        # Later saves continue from the loaded state
+        self.seq = seq
+        self.records = records
+        self.remember(state, world)
+        self.synced = True
+        return state, world
+
+    def remember(self, state, world):
+        self.saved_entries = {}
+        self.saved_maps = {}
+        for key, value in state.items():
+            if key not in SNAPSHOT_ONLY:
+                self.keep(value, FIELD_SPLITS.get(key), (key,))
+        self.saved_world = {tuple(entry[0]): encode(entry) for entry in world}
+
+    def keep(self, value, split, path):
+        if split is None or not isinstance(value, Mapping):
+            self.saved_entries[path] = fingerprint(value)
+            return
+        self.saved_maps[path] = dict(value)
+        for key, item in value.items():
+            self.keep(item, split.get(key), path + (key,))
+
+    def saved_at(self):
+        """Return when the save was last written, or None if there is none."""
+        times = [os.path.getmtime(filename) for filename in (self.snapshot_file, self.journal_file)
+                 if os.path.exists(filename)]
+        return max(times) if os.path.exists(self.snapshot_file) else None
+
+    def read_journal(self):
+        try:
+            with open(self.journal_file, "r", encoding="utf-8") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return
+        for line in lines:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # Only the last record can be torn; nothing follows it
+                return
@@ -1,10 +1,19 @@
 import json
+import os
+from engine.message_handler import message_handler
 
 class SaveLoad:
+    """Single-file JSON saves, as written before save slots.
+
+    The engine saves through SaveManager; this reads old saves.
+    """
+
     def save_game(self, game_state, filename):
-        with open(filename, 'w') as f:
+        # Write beside the old save and swap, so a crash never leaves a torn file
+        with open(filename + '.tmp', 'w') as f:
             json.dump(game_state, f)
-        print("Game saved.")
+        os.replace(filename + '.tmp', filename)
+        message_handler.print_plain("Game saved.")
 
     def load_game(self, filename):
         with open(filename, 'r') as f:
@@ -0,0 +1,207 @@
+import atexit
+import json
+import os
+import re
+import struct
+import sys
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+from engine.save_journal import SaveJournal, encode
+
+SAVE_MAGIC = b"CLIOSAVE"
+SAVE_VERSION = 1
+
+# magic, version, header length
+_PREAMBLE = struct.Struct("<8sII")
+
+
+def safe_name(name, default="default"):
+    """Reduce a player or slot name to something safe to use as a file name."""
+    return re.sub(r"[^a-z0-9_-]+", "_", name.strip().lower()).strip("_")[:40] or default
+
+
+class SaveWriter:
+    """Writes save files, and other files the game keeps, on a background thread.
+
+    Each save goes to a temporary file that is renamed over the old save,
+    so a crash leaves either the old or the new save, never a torn one.
+    A write queued for a file that already has one waiting replaces it, so
+    back-to-back saves cost one write. Files whose last write failed are
+    kept in `failures` until they are reported or written again.
+    """
+
+    def __init__(self):
+        self.failures = {}
+        self._pending = OrderedDict()
+        self._writing = None
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def submit(self, filename, header, body):
+        """Queue a save; body is compressed on the writer thread."""
+        self.queue(filename, lambda: self.write(filename, header, body))
+
+    def queue(self, filename, write):
+        """Queue a call of write() that writes filename."""
+        with self._condition:
+            self._pending[filename] = write
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="clio-saves", daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+
+    def flush(self, filename=None, directory=None):
+        """Block until the queued saves, or those for one file or directory, are on disk."""
+        with self._condition:
+            while any(self._waiting_for(name, filename, directory)
+                      for name in [self._writing, *self._pending] if name):
+                self._condition.wait()
+
+    def take_failures(self, directory):
+        """Return and forget the files in a directory whose last write failed, with their errors."""
+        with self._condition:
+            failed = {name: error for name, error in self.failures.items()
+                      if os.path.dirname(name) == directory}
+            for name in failed:
+                del self.failures[name]
+        return failed
+
+    @staticmethod
+    def _waiting_for(name, filename, directory):
+        if filename:
+            return name == filename
+        if directory:
+            return os.path.dirname(name) == directory
+        return True
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+                filename, write = self._pending.popitem(last=False)
+                self._writing = filename
+            error = None
+            try:
+                write()
+            except OSError as e:
+                # The previous version is still intact; keep writing the others
+                error = e
+                print(f"Failed to write {filename}: {e}", file=sys.stderr)
+            finally:
+                with self._condition:
+                    if error is None:
+                        self.failures.pop(filename, None)
+                    else:
+                        self.failures[filename] = error
+                    self._writing = None
+                    self._condition.notify_all()
+
+    @staticmethod
+    def write(filename, header, body):
+        header_data = encode(header).encode("utf-8")
+        os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
+        temp_file = filename + ".tmp"
+        with open(temp_file, "wb") as f:
+            f.write(_PREAMBLE.pack(SAVE_MAGIC, SAVE_VERSION, len(header_data)))
+            f.write(header_data)
+            f.write(zlib.compress(body.encode("utf-8")))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, filename)
+
+
+save_writer = SaveWriter()
+# Never drop a save the player was told had been made
+atexit.register(save_writer.flush)
+
+
+class SaveManager:
+    """Named save slots for one player, kept in their own directory.
+
+    Each slot is one file: a small header with metadata for listing saves,
+    followed by the compressed game state. The autosave journal of the
+    player lives in the same directory.
+    """
+
+    AUTOSAVE = "autosave"
+
+    def __init__(self, directory="saves", player="default", snapshot_interval=100):
+        self.player = safe_name(player)
+        self.directory = os.path.join(directory, self.player)
+        self.journal = SaveJournal(os.path.join(self.directory, self.AUTOSAVE), snapshot_interval)
+
+    def slot_file(self, slot):
+        return os.path.join(self.directory, safe_name(slot, "quicksave") + ".sav")
+
+    def save(self, slot, state, world_entries, metadata=None):
+        """Queue a save of the game to a slot.
+
+        The state is encoded here, so the game can keep changing while the
+        save is compressed and written in the background.
+        """
+        slot = safe_name(slot, "quicksave")
+        header = {"slot": slot, "player": self.player, "saved_at": time.time()}
+        header.update(metadata or {})
+        body = encode({"state": state, "world": world_entries})
+        save_writer.submit(self.slot_file(slot), header, body)
+        return slot
+
+    def load(self, slot):
+        """Return the (state, world entries) saved in a slot.
+
+        Raises:
+            FileNotFoundError: If the slot has no save
+            ValueError: If the file is not a readable save
+        """
+        filename = self.slot_file(slot)
+        save_writer.flush(filename)
+        with open(filename, "rb") as f:
+            self.read_header(f, filename)
+            try:
+                data = json.loads(zlib.decompress(f.read()))
+            except (zlib.error, ValueError):
+                raise ValueError(f"Save '{slot}' is corrupted")
+        return data["state"], data["world"]
+
+    def failed_saves(self):
+        """Return (slot, error) for each save of this player that could not be written."""
+        failed = save_writer.take_failures(self.directory)
+        return [(os.path.basename(name)[:-len(".sav")], error)
+                for name, error in failed.items() if name.endswith(".sav")]
+
+    def exists(self, slot):
+        filename = self.slot_file(slot)
+        save_writer.flush(filename)
+        return os.path.exists(filename)
+
+    def list_slots(self):
+        """Return the header of every slot, newest first, without reading the saved games."""
+        save_writer.flush(directory=self.directory)
+        headers = []
+        if not os.path.isdir(self.directory):
+            return headers
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(".sav"):
+                continue
+            try:
+                with open(entry.path, "rb") as f:
+                    headers.append(self.read_header(f, entry.path))
+            except (OSError, ValueError):
+                continue
+        return sorted(headers, key=lambda header: header.get("saved_at", 0), reverse=True)
+
+    @staticmethod
+    def read_header(f, filename):
+        preamble = f.read(_PREAMBLE.size)
+        if len(preamble) < _PREAMBLE.size:
+            raise ValueError(f"{filename} is not a save file")
+        magic, version, header_length = _PREAMBLE.unpack(preamble)
+        if magic != SAVE_MAGIC:
+            raise ValueError(f"{filename} is not a save file")
+        if version != SAVE_VERSION:
+            raise ValueError(f"{filename} is save version {version}, expected {SAVE_VERSION}")
+        return json.loads(f.read(header_length))
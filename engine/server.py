@@ -0,0 +1,266 @@
+import asyncio
+import io
+import json
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from engine.game_engine import GameEngine
+from engine.message_handler import message_handler
+from engine.output import StreamSink, use_sink
+from engine.parser import Parser
+from engine.save_manager import safe_name
+from engine.text_styler import TextStyler
+from engine.world import World
+
+IAC = 255
+TELNET_OPTION_COMMANDS = {251, 252, 253, 254}
+
+_session_local = threading.local()
+
+
+def strip_telnet_commands(data):
+    """Remove telnet IAC negotiation sequences from a line of input."""
+    if IAC not in data:
+        return data
+    result = bytearray()
+    i = 0
+    while i < len(data):
+        byte = data[i]
+        if byte != IAC:
+            result.append(byte)
+            i += 1
+        elif i + 1 < len(data) and data[i + 1] == IAC:
+            result.append(IAC)
+            i += 2
+        elif i + 1 < len(data) and data[i + 1] in TELNET_OPTION_COMMANDS:
+            i += 3
+        else:
+            i += 2
+    return bytes(result)
+
+
+class SessionStream(io.TextIOBase):
+    """Routes stdout to the game session whose command is running on this thread.
+
+    The engine prints through sys.stdout; the server swaps this stream in so
+    output produced while a session's command runs goes to its connection,
+    while every other thread keeps the real console.
+    """
+
+    def __init__(self, fallback):
+        self.fallback = fallback
+
+    def write(self, text):
+        session = getattr(_session_local, "session", None)
+        if session is None:
+            return self.fallback.write(text)
+        session.send(text)
+        return len(text)
+
+    def flush(self):
+        if getattr(_session_local, "session", None) is None:
+            self.fallback.flush()
+
+    def isatty(self):
+        return False
+
+
+class GameSession:
+    """One connected player with a private engine.
+
+    The engine never blocks for input: questions are pending prompts that
+    the next line answers. Each line is run as one command on the server's
+    worker pool, and the event loop moves bytes between the socket and the
+    engine. Typed text is paced on the event loop: its pauses are queued
+    with the output, so no worker sleeps, and a new line from the player
+    skips the pauses still queued.
+    """
+
+    def __init__(self, server, reader, writer):
+        self.server = server
+        self.reader = reader
+        self.writer = writer
+        self.loop = asyncio.get_running_loop()
+        self.engine = None
+        self.player = None
+        self.sink = StreamSink(self)
+        self.closed = False
+        # Output and pauses waiting to be written, tagged with the line they answer
+        self.output = asyncio.Queue()
+        self.generation = 0
+
+    def send(self, text):
+        if self.closed:
+            return
+        data = text.replace("\n", "\r\n").encode("utf-8", "replace")
+        self.loop.call_soon_threadsafe(self.output.put_nowait, (self.generation, data))
+
+    def pause(self, seconds):
+        """Pause the output for typed text, without holding up the calling thread."""
+        if not self.closed:
+            self.loop.call_soon_threadsafe(self.output.put_nowait, (self.generation, seconds))
+
+    async def pump(self):
+        """Write the queued output to the connection until closed."""
+        try:
+            while True:
+                generation, item = await self.output.get()
+                if item is None:
+                    return
+                if isinstance(item, bytes):
+                    self.writer.write(item)
+                    await self.writer.drain()
+                elif generation == self.generation:
+                    await asyncio.sleep(item)
+        except ConnectionError:
+            pass
+
+    # Stream interface, so output from other threads such as animations
+    # still reaches this connection
+    def write(self, text):
+        self.send(text)
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def isatty(self):
+        return False
+
+    def run(self, func, *args):
+        """Run an engine call with output routed to this session."""
+        _session_local.session = self
+        styler = TextStyler()
+        token = styler.bind_bundle(self.engine.style_bundle if self.engine else styler.bundle)
+        try:
+            with use_sink(self.sink):
+                return func(*args)
+        finally:
+            styler.reset_bundle(token)
+            _session_local.session = None
+
+    def start_engine(self):
+        message_handler.print_plain("================================\n"
+                                    "CLIo - Text-Based CLI Game Maker\n"
+                                    "================================")
+        self.engine = GameEngine(self.server.config_file, None, Parser(), world=self.server.world,
+                                 player=self.player)
+        self.engine.message_handler.print_message(self.engine.current_scene["description"], "system")
+        self.engine.display_story_text("intro")
+
+    def handle_line(self, line):
+        """Process one line and report whether the session should keep going."""
+        self.engine.process_command(line)
+        return not (self.engine.quit_requested or self.engine.check_game_over())
+
+    async def call(self, func, *args):
+        return await self.loop.run_in_executor(self.server.executor, self.run, func, *args)
+
+    async def read_line(self):
+        data = await self.reader.readline()
+        if not data:
+            return None
+        return strip_telnet_commands(data).decode("utf-8", "replace").rstrip("\r\n")
+
+    async def login(self):
+        """Ask for the player's name, which keeps their saves apart from everyone else's."""
+        while True:
+            self.send("What is your name? ")
+            line = await self.read_line()
+            if line is None:
+                return False
+            name = safe_name(line, "")
+            if not name:
+                continue
+            if name in self.server.players:
+                self.send("Someone with that name is already playing.\n")
+                continue
+            self.server.players.add(name)
+            self.player = name
+            return True
+
+    async def serve(self):
+        pump = asyncio.create_task(self.pump())
+        try:
+            if not await self.login():
+                return
+            await self.call(self.start_engine)
+            self.send(self.engine.prompt_text())
+            while not self.reader.at_eof():
+                line = await self.read_line()
+                if line is None:
+                    break
+                # A new line fast-forwards the text still being typed out
+                self.generation += 1
+                if not await self.call(self.handle_line, line):
+                    break
+                self.send(self.engine.prompt_text())
+        except ConnectionError:
+            pass
+        finally:
+            self.closed = True
+            self.server.players.discard(self.player)
+            # Write out what is left without its pauses, then hang up
+            self.generation += 1
+            self.output.put_nowait((self.generation, None))
+            try:
+                await pump
+            except asyncio.CancelledError:
+                pass
+            self.writer.close()
+
+
+class GameServer:
+    """asyncio TCP/telnet front end that gives each connection its own session.
+
+    All sessions share one loaded World, so memory per session is only what
+    that player has changed, and a fixed pool of worker threads runs their
+    commands instead of one blocked thread per connection.
+    """
+
+    def __init__(self, config_file="game_files/config.json", host="127.0.0.1", port=4000, workers=32):
+        self.config_file = config_file
+        self.host = host
+        self.port = port
+        self.world = None
+        self.sessions = set()
+        self.players = set()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="clio-session")
+
+    async def handle_connection(self, reader, writer):
+        session = GameSession(self, reader, writer)
+        self.sessions.add(session)
+        try:
+            await session.serve()
+        except asyncio.CancelledError:
+            # The server is shutting down; serve() has closed the connection
+            pass
+        finally:
+            self.sessions.discard(session)
+
+    async def start(self):
+        with open(self.config_file, 'r') as f:
+            self.world = World.load(json.load(f))
+        if not isinstance(sys.stdout, SessionStream):
+            sys.stdout = SessionStream(sys.stdout)
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port, backlog=1024)
+        return self.server
+
+    async def serve_forever(self):
+        server = await self.start()
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for session in list(self.sessions):
+                session.writer.close()
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def run_server(config_file="game_files/config.json", host="127.0.0.1", port=4000):
+    server = GameServer(config_file, host, port)
+    print(f"CLIo server listening on {host}:{port}")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
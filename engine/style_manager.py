@@ -1,9 +1,14 @@
 # engine/style_manager.py
-from typing import Dict, Optional
+from typing import Dict, List
 from engine.style.config import StyleConfig
-import copy
+from engine.text_styler import StyleBundle
 
 class StyleManager:
+    """Compiles every style config once and hands out the shared bundles.
+
+    Bundles are immutable, so sessions share them and switching style is
+    a pointer swap.
+    """
     _instance = None
     _initialized = False
     
@@ -15,13 +20,26 @@ class StyleManager:
     def __init__(self):
         if not self._initialized:
             self.current_style = None
-            self.style_cache: Dict[str, StyleConfig] = {}
+            self.style_cache: Dict[str, StyleBundle] = {}
+            self.compile_all()
             self._initialized = True
-    
-    def get_style(self, style_name: str) -> StyleConfig:
-        if style_name not in self.style_cache:
-            self.style_cache[style_name] = StyleConfig.load(style_name)
-        return copy.deepcopy(self.style_cache[style_name])
+
+    def compile_all(self):
+        """Compile all files in engine/style/configs into style bundles."""
+        for path in sorted(StyleConfig.get_config_dir().glob("*.json")):
+            self.style_cache[path.stem] = StyleBundle.compile(path.stem, StyleConfig.load(path.stem))
+
+    @property
+    def available_styles(self) -> List[str]:
+        return list(self.style_cache)
+
+    def get_style(self, style_name: str) -> StyleBundle:
+        bundle = self.style_cache.get(style_name)
+        if bundle is None:
+            # Unknown names fall back to the built-in defaults, as StyleConfig.load does
+            bundle = StyleBundle.compile(style_name, StyleConfig.load(style_name))
+        return bundle
         
     def clear_cache(self):
-        self.style_cache.clear()
\ No newline at end of file
+        self.style_cache.clear()
+        self.compile_all()
@@ -1,12 +1,23 @@
-import os
 import sys
-import time
 import textwrap
 import shutil
+import signal
+import threading
+import itertools
+from collections import OrderedDict
+from contextvars import ContextVar
+from types import MappingProxyType
 from enum import Enum
 from dataclasses import dataclass, field
-from typing import Optional, Dict, List
+from typing import Optional, List, Mapping
 from engine.style.config import StyleConfig
+from engine.animation import Frame, animations
+from engine.output import OutputRecord, get_sink
+from engine.typewriter import Typewriter
+
+_bundle_serials = itertools.count(1)
+# Style bundle of the session whose output is being produced, if not the default
+_active_bundle = ContextVar("style_bundle", default=None)
 
 class FrameStyle(Enum):
     NONE = ""
@@ -42,26 +53,35 @@ class TextConfig:
     character_delay: float = 0
     paragraph_delay: float = 1.0
 
-class TextStyler:
-    _instance = None
-    _config = None
+@dataclass(frozen=True)
+class CompiledStyle:
+    """A style with everything per-message rendering needs precomputed."""
+    config: TextConfig
+    frame_chars: str
+    prefix: str = ""
+    suffix: str = ""
 
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance.terminal_size = shutil.get_terminal_size()
-            cls._instance.configs = {}
-        return cls._instance
 
-    def process_config(self, data):
-        if not data or not hasattr(data, 'styles'):
-            return
-            
-        TextStyler._config = data
+@dataclass(frozen=True)
+class StyleBundle:
+    """Immutable set of compiled styles from one style config file.
+
+    Switching styles swaps the bundle in use; nothing is rebuilt.
+    """
+    name: str
+    styles: Mapping[str, CompiledStyle]
+    serial: int = field(default_factory=lambda: next(_bundle_serials))
+
+    def get(self, style_name: str) -> CompiledStyle:
+        return self.styles.get(style_name) or self.styles["default"]
+
+    @classmethod
+    def compile(cls, name: str, data: StyleConfig) -> 'StyleBundle':
+        styles = {}
         for style_name, style_data in data.styles.items():
             frame_type = style_data.get("frame", "SINGLE").upper()
             frame_style = FrameStyle[frame_type] if frame_type != "NONE" else FrameStyle.NONE
-            
+
             config = TextConfig(
                 speed=style_data.get("speed", data.text_speed),
                 frame_style=frame_style,
@@ -72,16 +92,74 @@ class TextStyler:
                 character_delay=style_data.get("character_delay", 0),
                 paragraph_delay=style_data.get("paragraph_delay", 1.0)
             )
-            self.configs[style_name] = config
-            
-        if "default" not in self.configs:
-            self.configs["default"] = TextConfig()
+            styles[style_name] = cls.compile_style(config)
+
+        if "default" not in styles:
+            styles["default"] = cls.compile_style(TextConfig())
+        return cls(name, MappingProxyType(styles))
+
+    @staticmethod
+    def compile_style(config: TextConfig) -> CompiledStyle:
+        if config.color and not config.effects.gradient:
+            return CompiledStyle(config, config.frame_style.value, f"\033[{config.color}m", "\033[0m")
+        return CompiledStyle(config, config.frame_style.value)
+
+
+class TextStyler:
+    _instance = None
+
+    # Rendered messages kept for repeated output such as look and help
+    RENDER_CACHE_SIZE = 512
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance.terminal_size = shutil.get_terminal_size()
+            cls._instance.bundle = StyleBundle("default", MappingProxyType({
+                "default": StyleBundle.compile_style(TextConfig())
+            }))
+            cls._instance.render_cache = OrderedDict()
+            cls._instance.render_lock = threading.Lock()
+            cls._instance.size_watched = cls._instance.watch_terminal_size()
+            cls._instance.typewriter = Typewriter()
+        return cls._instance
+
+    def use_bundle(self, bundle: StyleBundle):
+        """Switch the styles used for output in the current context."""
+        if _active_bundle.get() is not None:
+            _active_bundle.set(bundle)
+        else:
+            self.bundle = bundle
+
+    def current_bundle(self) -> StyleBundle:
+        return _active_bundle.get() or self.bundle
+
+    @staticmethod
+    def bind_bundle(bundle: StyleBundle):
+        """Give the current context its own styles, such as for one server session.
 
-    def update_config(self, new_config):
-        self.process_config(new_config)
+        Returns:
+            Token to pass to reset_bundle
+        """
+        return _active_bundle.set(bundle)
+
+    @staticmethod
+    def reset_bundle(token):
+        _active_bundle.reset(token)
 
     def update_terminal_size(self):
         self.terminal_size = shutil.get_terminal_size()
+
+    def watch_terminal_size(self) -> bool:
+        """Track the terminal size on resize instead of polling it per message.
+
+        Returns:
+            bool: False where SIGWINCH is unavailable and the size must be polled
+        """
+        if not hasattr(signal, "SIGWINCH") or threading.current_thread() is not threading.main_thread():
+            return False
+        signal.signal(signal.SIGWINCH, lambda signum, frame: self.update_terminal_size())
+        return True
         
     def get_wrap_width(self, config: TextConfig) -> int:
         if config.width:
@@ -99,16 +177,28 @@ class TextStyler:
             
         return gradient_lines
 
-    def animate_frame(self, frame_lines: List[str], speed: float = 0.02):
+    def frame_animation(self, frame_lines: List[str], speed: float = 0.02) -> List[Frame]:
+        """Frames that draw a frame line by line, redrawing from the top each time."""
+        frames = []
         for i in range(len(frame_lines)):
-            partial_frame = frame_lines[:i+1]
-            print('\n'.join(partial_frame), end='\r')
-            time.sleep(speed)
-            if i < len(frame_lines) - 1:
-                print('\033[F' * len(partial_frame))
-
-    def create_frame(self, text: str, style: TextConfig) -> List[str]:
-        chars = style.frame_style.value
+            # Move back up to the first line drawn by the previous frame
+            rewind = '\033[F' * i + '\n' if i else ''
+            end = '\n' if i == len(frame_lines) - 1 else '\r'
+            frames.append((rewind + '\n'.join(frame_lines[:i+1]) + end, speed))
+        return frames
+
+    def flash_animation(self, flashes: int = 3, speed: float = 0.1) -> List[Frame]:
+        # Only terminal mode toggles, so a prompt written meanwhile stays in place
+        return [('\033[?5h', speed), ('\033[?5l', speed)] * flashes
+
+    def fade_in_animation(self, text: str, delay: float = 0.05) -> List[Frame]:
+        return [(line + '\n', delay) for line in text.split('\n')]
+
+    def animate_frame(self, frame_lines: List[str], speed: float = 0.02, stream=None):
+        return animations.play(self.frame_animation(frame_lines, speed), stream or sys.stdout)
+
+    def create_frame(self, text: str, style: TextConfig, chars: Optional[str] = None) -> List[str]:
+        chars = chars or style.frame_style.value
         width = self.get_wrap_width(style)
         wrapped = textwrap.wrap(text, width - 4)
         
@@ -125,36 +215,87 @@ class TextStyler:
         return frame
 
     def print_text(self, text: str, style_name: str = "default", delay_override: Optional[float] = None):
-        config = self.configs.get(style_name, self.configs["default"])
-        self.update_terminal_size()
-        
-        if config.frame_style != FrameStyle.NONE:
-            frame_lines = self.create_frame(text, config)
+        """Print text in a style; with delay_override, type it out at that many seconds per character."""
+        typed = delay_override is not None
+        get_sink().emit(OutputRecord(text, style_name, typed=typed, char_delay=delay_override,
+                                     bundle=self.current_bundle()))
+
+    def style_lines(self, text: str, style: CompiledStyle) -> List[str]:
+        config = style.config
+        if style.frame_chars:
+            frame_lines = self.create_frame(text, config, style.frame_chars)
         else:
             frame_lines = [text]
-        
+
         if config.effects.gradient:
             frame_lines = self.apply_gradient('\n'.join(frame_lines))
-        elif config.color:
-            frame_lines = [f"\033[{config.color}m{line}\033[0m" for line in frame_lines]
+        elif style.prefix:
+            frame_lines = [style.prefix + line + style.suffix for line in frame_lines]
+        return frame_lines
+
+    def get_style(self, style_name: str, bundle: Optional[StyleBundle] = None) -> CompiledStyle:
+        return (bundle or self.current_bundle()).get(style_name)
+
+    def is_timed(self, record: OutputRecord) -> bool:
+        """Whether a record has to be played over time rather than written at once."""
+        if record.typed:
+            return True
+        if record.style is None:
+            return False
+        effects = self.get_style(record.style, record.bundle).config.effects
+        return effects.animate_frame or effects.flash
+
+    def render(self, record: OutputRecord) -> str:
+        """Render a record to the text a single write sends to the terminal."""
+        if record.style is None:
+            return record.text + '\n'
+        if not self.size_watched:
+            self.update_terminal_size()
 
+        bundle = record.bundle or self.current_bundle()
+        style = bundle.get(record.style)
+        key = (record.text, record.style, self.get_wrap_width(style.config), bundle.serial)
+        with self.render_lock:
+            rendered = self.render_cache.get(key)
+            if rendered is not None:
+                self.render_cache.move_to_end(key)
+                return rendered
+
+        rendered = '\n'.join(self.style_lines(record.text, style)) + '\n'
+        with self.render_lock:
+            self.render_cache[key] = rendered
+            if len(self.render_cache) > self.RENDER_CACHE_SIZE:
+                self.render_cache.popitem(last=False)
+        return rendered
+
+    def play(self, record: OutputRecord, stream=None):
+        """Write a timed record: typed text inline, effects on the animation thread."""
+        stream = stream or sys.stdout
+        style = self.get_style(record.style, record.bundle)
+        config = style.config
+        if record.typed:
+            char_delay = record.char_delay
+            if char_delay is None:
+                char_delay = config.character_delay or config.speed
+            animations.cancel(stream)
+            self.typewriter.write(record.text, stream, char_delay, config.paragraph_delay)
+            return
+
+        if not self.size_watched:
+            self.update_terminal_size()
+        frame_lines = self.style_lines(record.text, style)
         if config.effects.animate_frame:
-            self.animate_frame(frame_lines, config.effects.animation_speed)
+            frames = self.frame_animation(frame_lines, config.effects.animation_speed)
         else:
-            print('\n'.join(frame_lines))
+            frames = [('\n'.join(frame_lines) + '\n', 0)]
 
         if config.effects.flash:
-            self.flash_effect('\n'.join(frame_lines))
+            frames += self.flash_animation()
+        # Effects play on the animation thread; the command carries on meanwhile
+        animations.play(frames, stream)
 
-    def fade_in_text(self, text: str, delay: float = 0.05):
-        lines = text.split('\n')
-        for line in lines:
-            print(line)
-            time.sleep(delay)
-
-    def flash_effect(self, text: str, flashes: int = 3, speed: float = 0.1):
-        for _ in range(flashes):
-            print('\033[?5h')
-            time.sleep(speed)
-            print('\033[?5l')
-            time.sleep(speed)
\ No newline at end of file
+    def fade_in_text(self, text: str, delay: float = 0.05, stream=None):
+        return animations.play(self.fade_in_animation(text, delay), stream or sys.stdout)
+
+    def flash_effect(self, text: str, flashes: int = 3, speed: float = 0.1, stream=None):
+        return animations.play(self.flash_animation(flashes, speed), stream or sys.stdout)
\ No newline at end of file
@@ -0,0 +1,61 @@
+class TriggerEngine:
+    """Event driven story triggers.
+
+    Each trigger subscribes to the engine event that can make its condition
+    true and is only evaluated when that event fires, so nothing is polled
+    per command. Triggers marked show_once are retired after they fire.
+    The subscription table is compiled once per world and shared; each
+    session only keeps the ids of the triggers it has retired.
+    """
+
+    # Condition types used in story_texts["conditions"] and the event each one listens to
+    CONDITION_EVENTS = {
+        "item_in_inventory": "item_acquired",
+        "item_acquired": "item_acquired",
+        "enemy_defeated": "enemy_defeated",
+        "flag_set": "flag_set",
+        "scene_entered": "scene_entered",
+    }
+
+    def __init__(self, on_fire=None, subscriptions=None):
+        self.on_fire = on_fire
+        self.subscriptions = subscriptions if subscriptions is not None else {}
+        self.retired = set()
+
+    @classmethod
+    def compile_conditions(cls, conditions, resolve_key=None):
+        """Build the subscription table for story_texts["conditions"].
+
+        Args:
+            conditions (dict): Condition type -> {key: text info}
+            resolve_key (callable): Maps (condition, key) to the id events use
+
+        Returns:
+            dict: (event, key) -> list of triggers
+        """
+        subscriptions = {}
+        for condition, entries in conditions.items():
+            event = cls.CONDITION_EVENTS.get(condition)
+            if not event:
+                continue
+            for key, text_info in entries.items():
+                trigger = {
+                    "id": f"{condition}:{key}",
+                    "text": text_info.get("text", ""),
+                    "style": text_info.get("style", "story"),
+                    "show_once": text_info.get("show_once", False)
+                }
+                if resolve_key:
+                    key = resolve_key(condition, key) or key
+                subscriptions.setdefault((event, key), []).append(trigger)
+        return subscriptions
+
+    def emit(self, event, key):
+        """Fire the triggers subscribed to an event and retire show_once ones."""
+        for trigger in self.subscriptions.get((event, key), ()):
+            if trigger["id"] in self.retired:
+                continue
+            if trigger["show_once"]:
+                self.retired.add(trigger["id"])
+            if self.on_fire:
+                self.on_fire(trigger)
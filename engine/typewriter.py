@@ -0,0 +1,94 @@
+import os
+import sys
+import time
+
+# Set CLIO_NO_DELAY=1, or call set_no_delay, to print all text instantly
+_no_delay = bool(os.environ.get("CLIO_NO_DELAY"))
+
+
+def set_no_delay(enabled: bool = True):
+    """Turn typing delays off everywhere, for automation and replays."""
+    global _no_delay
+    _no_delay = enabled
+
+
+def no_delay() -> bool:
+    return _no_delay
+
+
+def key_pressed(stream=None) -> bool:
+    """Whether the player has typed something since the text started.
+
+    Only checked when the text goes to an interactive console, as typed
+    input on other streams belongs to someone else.
+    """
+    stream = stream or sys.stdout
+    if not stream.isatty() or not sys.stdin.isatty():
+        return False
+    try:
+        if os.name == "nt":
+            import msvcrt
+            return msvcrt.kbhit()
+        import select
+        readable, _, _ = select.select([sys.stdin], [], [], 0)
+        return bool(readable)
+    except (OSError, ValueError):
+        return False
+
+
+class Typewriter:
+    """Types text out in chunks, one chunk per frame.
+
+    Rather than a write, flush and sleep per character, each frame writes
+    the characters due by then and sleeps once. Input typed while the text
+    is playing fast-forwards to the end of it. A stream that paces its own
+    output, such as a network session, provides a `pause(seconds)` method
+    that is called instead of sleeping.
+    """
+
+    FRAME_TIME = 1 / 30
+
+    def __init__(self, frame_time: float = FRAME_TIME, skip_check=key_pressed):
+        self.frame_time = frame_time
+        self.skip_check = skip_check
+
+    def write(self, text: str, stream=None, char_delay: float = 0.05, paragraph_delay: float = 0):
+        """Type text to stream.
+
+        Args:
+            text (str): Text to type, paragraphs separated by blank lines
+            stream: Stream to write to, sys.stdout by default
+            char_delay (float): Seconds per character
+            paragraph_delay (float): Pause between paragraphs
+        """
+        stream = stream or sys.stdout
+        if _no_delay or char_delay <= 0:
+            stream.write(text)
+            stream.flush()
+            return
+
+        pause = getattr(stream, "pause", time.sleep)
+        chars_per_frame = max(1, round(self.frame_time / char_delay))
+        paragraphs = text.split("\n\n")
+        for i, paragraph in enumerate(paragraphs):
+            start = 0
+            while start < len(paragraph):
+                if self.skipped(stream):
+                    # Fast-forward through everything that is left
+                    stream.write(paragraph[start:] + "".join("\n\n" + rest for rest in paragraphs[i + 1:]))
+                    stream.flush()
+                    return
+                chunk = paragraph[start:start + chars_per_frame]
+                start += len(chunk)
+                stream.write(chunk)
+                stream.flush()
+                # Whitespace is typed without a pause, as before
+                pause(char_delay * sum(1 for char in chunk if char not in {' ', '\n'}))
+            if i < len(paragraphs) - 1:
+                stream.write("\n\n")
+                if paragraph_delay > 0 and not self.skipped(stream):
+                    stream.flush()
+                    pause(paragraph_delay)
+
+    def skipped(self, stream) -> bool:
+        return _no_delay or bool(self.skip_check and self.skip_check(stream))
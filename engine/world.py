@@ -0,0 +1,646 @@
+import copy
+import hashlib
+import json
+import os
+from collections.abc import Mapping, MutableMapping, MutableSequence, Sequence
+from engine.content_pack import ContentPack
+from engine.content_store import ContentStore
+from engine.maze import Maze
+from engine.residency import ResidencyManager
+from engine.name_index import NameIndex, EXACT
+from engine.recipe_index import RecipeIndex
+from engine.triggers import TriggerEngine
+
+_DELETED = object()
+
+# Exit keys that decide whether an exit can be passed
+EXIT_STATE_KEYS = ("locked", "blocked")
+
+# Character keys the movement scheduler needs, kept in the indexes
+MOVEMENT_KEYS = ("movable", "follow_player", "moves_on_scene_change", "moves_after_commands")
+
+
+class World:
+    """Game content loaded once and shared read-only between sessions.
+
+    Sessions never mutate a World. Each one wraps it in a WorldState, which
+    records that session's changes as an overlay.
+    """
+
+    _loaded = {}
+
+    # Config keys naming the JSON content files, in constructor order
+    CONTENT_FILE_KEYS = ("scenes_file", "items_file", "characters_file", "story_texts_file")
+
+    def __init__(self, scenes, items, characters, story_texts, indexes=None,
+                 item_names=None, character_names=None):
+        self.scenes = scenes
+        self.items = items
+        self.characters = characters
+        self.story_texts = story_texts
+        # Set for packed worlds, whose entities are paged in and out
+        self.residency = None
+        # Set when the config adds a generated maze to the content
+        self.maze = None
+        self._content_hash = None
+
+        if indexes is None:
+            indexes = self.build_indexes()
+        self.indexes = indexes
+        self.scene_index = indexes["scene_index"]
+        self.character_locations = indexes["character_locations"]
+        self.entrances = indexes["entrances"]
+        self.stat_keys = indexes["stat_keys"]
+        self.movable_characters = indexes["movable_characters"]
+
+        self.item_names = item_names if item_names is not None else NameIndex(self.items)
+        self.character_names = character_names if character_names is not None else NameIndex(self.characters)
+        self.recipes = RecipeIndex(indexes["recipe_items"])
+        self.triggers = TriggerEngine.compile_conditions(
+            self.story_texts.get("conditions", {}),
+            self.resolve_trigger_key
+        )
+
+    def build_indexes(self):
+        """Scan the content once for everything the engine looks up by key.
+
+        The result is plain data, so content packs store it precomputed and
+        never need to decode every entity at start-up.
+        """
+        for item_id, item in self.items.items():
+            item.setdefault("id", item_id)
+
+        self.scene_index = {}
+        self.character_locations = {}
+        for index, scene in enumerate(self.scenes):
+            self.scene_index[scene["id"]] = index
+            for char_id in scene.get("characters", []):
+                # A character listed in several scenes is tracked by its first one
+                self.character_locations.setdefault(char_id, scene["id"])
+        self.place_movable_characters()
+
+        # Scenes with an exit into each scene, for searching routes backwards
+        entrances = {}
+        for scene in self.scenes:
+            self.add_entrances(entrances, scene)
+
+        stat_keys = []
+        for item in self.items.values():
+            for stat in item.get("effect", {}):
+                if stat not in stat_keys:
+                    stat_keys.append(stat)
+
+        return {
+            "scene_index": self.scene_index,
+            "character_locations": self.character_locations,
+            "entrances": entrances,
+            "stat_keys": stat_keys,
+            "movable_characters": {
+                char_id: {key: char[key] for key in MOVEMENT_KEYS if key in char}
+                for char_id, char in self.characters.items()
+                if char.get("movable", False)
+            },
+            "recipe_items": {
+                item_id: {key: item[key] for key in ("components", "npc_craftable") if key in item}
+                for item_id, item in self.items.items()
+                if "components" in item or "npc_craftable" in item
+            },
+        }
+
+    @property
+    def content_hash(self):
+        """SHA-256 of the content, the same whether it was loaded from JSON, a database or a pack."""
+        if self._content_hash is None:
+            digest = hashlib.sha256()
+            # A maze is made from its seed, so only the authored content counts
+            for part in (self.scenes, self.items, self.characters, self.story_texts):
+                part = getattr(part, "base", part)
+                digest.update(json.dumps(part, sort_keys=True, separators=(",", ":")).encode("utf-8"))
+            self._content_hash = digest.hexdigest()
+        return self._content_hash
+
+    @classmethod
+    def load(cls, config):
+        """Load the content named in a game config.
+
+        A built content pack is used when the config names one and it is
+        newer than its sources. Otherwise the content database is used when
+        the config names one that is newer than the JSON content files, and
+        the JSON content files if not.
+        Worlds are cached by file paths, so every session started from the
+        same config shares one copy of the content.
+        """
+        files = cls.content_sources(config)
+        pack_file = config.get("content_pack")
+        maze = config.get("maze")
+        # Sessions with a maze share it, but not with configs that have another one
+        maze_key = (json.dumps(maze, sort_keys=True),) if maze else ()
+        if pack_file and cls.is_current(pack_file, files):
+            key = (os.path.abspath(pack_file),) + maze_key
+            world = cls._loaded.get(key)
+            if world is None:
+                residency = ResidencyManager(config.get("memory_cap_mb", 64) * 1024 * 1024,
+                                             config.get("residency_radius", 1))
+                world = cls.from_pack(pack_file, residency, verify=config.get("verify_pack", False))
+                if maze:
+                    world.attach_maze(Maze.from_config(maze))
+                cls._loaded[key] = world
+            return world
+
+        key = files + maze_key
+        world = cls._loaded.get(key)
+        if world is None:
+            world = cls.from_content(config)
+            if maze:
+                world.attach_maze(Maze.from_config(maze))
+            cls._loaded[key] = world
+        return world
+
+    @classmethod
+    def content_sources(cls, config):
+        """Return the absolute paths of the files the content is read from."""
+        files = tuple(os.path.abspath(config[key]) for key in cls.CONTENT_FILE_KEYS)
+        content_db = config.get("content_db")
+        if content_db and cls.is_current(content_db, files):
+            return (os.path.abspath(content_db),)
+        return files
+
+    @staticmethod
+    def is_current(built_file, files):
+        """Whether a pack or database exists and was written after its sources last changed."""
+        if not os.path.exists(built_file):
+            return False
+        built = os.path.getmtime(built_file)
+        return all(not os.path.exists(filename) or os.path.getmtime(filename) <= built for filename in files)
+
+    @classmethod
+    def from_content(cls, config):
+        """Load the content database or JSON content files of a game config, bypassing any pack.
+
+        JSON files edited after the database was last written take precedence over it.
+        """
+        content_db = config.get("content_db")
+        if content_db and cls.content_sources(config) == (os.path.abspath(content_db),):
+            return cls.from_store(content_db)
+        return cls.from_files(config)
+
+    @classmethod
+    def from_files(cls, config):
+        """Load the JSON content files named in a game config."""
+        return cls(*(cls.load_data(config[key]) for key in cls.CONTENT_FILE_KEYS))
+
+    @classmethod
+    def from_store(cls, filename):
+        """Load the content held in a SQLite content database."""
+        store = ContentStore(filename)
+        try:
+            return cls(*store.load())
+        finally:
+            store.close()
+
+    @classmethod
+    def from_pack(cls, filename, residency=None, verify=False):
+        """Open a content pack built by `clio build`, decoding entities lazily.
+
+        With `verify`, the pack's content is checked against its checksum
+        first, which reads the whole file.
+        """
+        pack = ContentPack(filename, residency, verify)
+        world = cls(pack.scenes(), pack.items(), pack.characters(), pack.story_texts(), pack.indexes,
+                    NameIndex(base=pack.names("item_names")), NameIndex(base=pack.names("character_names")))
+        world.residency = pack.residency
+        # Hashing a pack's content would decode all of it; the hash is recorded when it is built
+        world._content_hash = pack.header.get("content_hash") or pack.body_digest.hex()
+        return world
+
+    @staticmethod
+    def load_data(filename):
+        with open(filename, 'r') as f:
+            return json.load(f)
+
+    def attach_maze(self, maze):
+        """Add a generated maze to the content; its entities are looked up by id as they are made."""
+        self.maze = maze
+        self.items = GeneratedEntities(self.items, maze.item)
+        self.characters = GeneratedEntities(self.characters, maze.character)
+        maze.on_region = self.index_region
+
+    def index_region(self, scenes, items, characters):
+        """Make a new maze region's items, characters and exits known to the indexes."""
+        for item_id, item in items.items():
+            self.item_names.add(item_id, item["name"])
+        for char_id, char in characters.items():
+            self.character_names.add(char_id, char["name"])
+        for scene_id, scene in scenes.items():
+            for char_id in scene["characters"]:
+                self.character_locations.setdefault(char_id, scene_id)
+            self.add_entrances(self.entrances, scene)
+
+    @staticmethod
+    def add_entrances(entrances, scene):
+        for exit in scene.get("exits", []):
+            sources = entrances.setdefault(exit["scene_id"], [])
+            if scene["id"] not in sources:
+                sources.append(scene["id"])
+
+    def place_movable_characters(self):
+        """Put movable characters that no scene lists into their initial scene."""
+        for char_id, char in self.characters.items():
+            if not char.get("movable", False) or char_id in self.character_locations:
+                continue
+            scene_id = char.get("initial_scene", "scene1")
+            if scene_id in self.scene_index:
+                self.scenes[self.scene_index[scene_id]].setdefault("characters", []).append(char_id)
+                self.character_locations[char_id] = scene_id
+
+    def neighborhood(self, scene_id, radius, get_scene):
+        """Keys of the scenes within radius exits of a scene and what they reference.
+
+        Args:
+            scene_id (str): Scene the player is in
+            radius (int): Number of exits to follow
+            get_scene (callable): Returns a session's view of a scene by id
+
+        Returns:
+            set: (kind, key) pairs as used by the residency manager
+        """
+        keys = set()
+        seen = {scene_id}
+        frontier = [scene_id]
+        for depth in range(radius + 1):
+            next_frontier = []
+            for current_id in frontier:
+                scene = get_scene(current_id)
+                if scene is None:
+                    continue
+                if current_id in self.scene_index:
+                    keys.add(("scenes", self.scene_index[current_id]))
+                keys.update(("items", item_id) for item_id in scene.get("items", []))
+                keys.update(("items", item_id) for item_id in scene.get("passive_items", []))
+                keys.update(("characters", char_id) for char_id in scene.get("characters", []))
+                if depth < radius:
+                    for exit in scene.get("exits", []):
+                        if exit.get("scene_id") not in seen:
+                            seen.add(exit.get("scene_id"))
+                            next_frontier.append(exit.get("scene_id"))
+            frontier = next_frontier
+        return keys
+
+    def resolve_trigger_key(self, condition, key):
+        """Map a condition key written as a name to the id its event carries."""
+        if condition in ("item_in_inventory", "item_acquired"):
+            rank, ids = self.item_names.search(key)
+        elif condition == "enemy_defeated":
+            rank, ids = self.character_names.search(key)
+        else:
+            return key
+        return ids[0] if rank == EXACT else key
+
+
+class WorldState:
+    """One session's view of a shared World.
+
+    Reads fall through to the World. Writes, including in-place edits of
+    nested lists and dicts, are recorded in `changes` keyed by their path,
+    so a session only holds what its player has changed. The paths that may
+    have been written since the last save are kept in `dirty` for the save
+    journal. `exits_version` counts changes to whether exits can be passed,
+    so route caches know when to start over.
+    """
+
+    def __init__(self, world):
+        self.world = world
+        self.changes = {}
+        self.added_keys = {}
+        self.dirty = set()
+        self.exits_version = 0
+        self.scenes = OverlayList(world.scenes, self, ("scenes",))
+        self.items = OverlayDict(world.items, self, ("items",))
+        self.characters = OverlayDict(world.characters, self, ("characters",))
+
+    def get_scene(self, scene_id, make=True):
+        """Return the session view of a scene, or None.
+
+        With `make` false, a maze scene whose region has not been made yet
+        counts as missing.
+        """
+        index = self.world.scene_index.get(scene_id)
+        if index is None:
+            maze = self.world.maze
+            if maze is None:
+                return None
+            scene = maze.scene(scene_id) if make else maze.scenes.get(scene_id)
+            if scene is None:
+                return None
+            # Maze scenes are not in the scene list; their changes are keyed by id
+            return OverlayDict(scene, self, ("maze", scene_id))
+        return self.scenes[index]
+
+    def take_dirty(self):
+        """Return the changes possibly written since the last call, as save entries."""
+        dirty, self.dirty = self.dirty, set()
+        return [self.entry(path) for path in dirty]
+
+    def entries(self):
+        """Return every change as save entries."""
+        return [self.entry(path) for path in self.changes]
+
+    def entry(self, path):
+        """Return a change as [path, value, deleted, added]."""
+        value = self.changes[path]
+        added = path[-1] in self.added_keys.get(path[:-1], ())
+        if value is _DELETED:
+            return [list(path), None, True, added]
+        return [list(path), value, False, added]
+
+    def restore(self, entries):
+        """Replace this session's changes with saved entries, applied in order."""
+        self.changes = {}
+        self.added_keys = {}
+        self.dirty = set()
+        self.exits_version += 1
+        for path, value, deleted, added in entries:
+            path = tuple(path)
+            self.changes[path] = _DELETED if deleted else value
+            if added and path[-1] not in self.added_keys.get(path[:-1], ()):
+                self.added_keys.setdefault(path[:-1], []).append(path[-1])
+
+    def wrap(self, value, path):
+        if isinstance(value, dict):
+            return OverlayDict(value, self, path)
+        if isinstance(value, list):
+            return OverlayList(value, self, path)
+        return value
+
+    def wrap_owned(self, value, root, path):
+        """Wrap a value this session owns, at `path` inside its change at `root`."""
+        if isinstance(value, dict):
+            return OwnedDict(value, self, root, path)
+        if isinstance(value, list):
+            return OwnedList(value, self, root, path)
+        return value
+
+    def touch(self, root, path):
+        """Note a write at `path`, made to the change at `root`."""
+        self.dirty.add(root)
+        # The exits list, an exit in it, or an exit's locked/blocked state
+        if path[-1] == "exits" or path[-2:-1] == ("exits",) or (
+                path[-1] in EXIT_STATE_KEYS and path[-3:-2] == ("exits",)):
+            self.exits_version += 1
+
+    def materialize(self, value, path):
+        """Return a plain copy of a shared value with this session's changes applied."""
+        if path in self.changes:
+            return copy.deepcopy(self.changes[path])
+        if isinstance(value, Mapping):
+            result = {}
+            for key in list(value) + self.added_keys.get(path, []):
+                child_path = path + (key,)
+                if key in result or self.changes.get(child_path) is _DELETED:
+                    continue
+                result[key] = self.materialize(value.get(key), child_path)
+            return result
+        if isinstance(value, Sequence) and not isinstance(value, str):
+            return [self.materialize(item, path + (i,)) for i, item in enumerate(value)]
+        return value
+
+
+class GeneratedEntities(Mapping):
+    """Authored entities by id, falling back to entities generated on demand.
+
+    Iterating only yields the authored entities; generated ones are found
+    by looking them up.
+    """
+
+    def __init__(self, base, generate):
+        self.base = base
+        self.generate = generate
+
+    def __getitem__(self, key):
+        try:
+            return self.base[key]
+        except KeyError:
+            pass
+        value = self.generate(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return key in self.base or self.generate(key) is not None
+
+    def __iter__(self):
+        return iter(self.base)
+
+    def __len__(self):
+        return len(self.base)
+
+
+class OverlayDict(MutableMapping):
+    """Copy-on-write view of a shared dict."""
+
+    __slots__ = ("_base", "_state", "_path")
+
+    def __init__(self, base, state, path):
+        self._base = base
+        self._state = state
+        self._path = path
+
+    def __getitem__(self, key):
+        path = self._path + (key,)
+        changes = self._state.changes
+        if path in changes:
+            value = changes[path]
+            if value is _DELETED:
+                raise KeyError(key)
+            return self._state.wrap_owned(value, path, path)
+        return self._state.wrap(self._base[key], path)
+
+    def __setitem__(self, key, value):
+        path = self._path + (key,)
+        if key not in self._base and path not in self._state.changes:
+            self._state.added_keys.setdefault(self._path, []).append(key)
+        self._state.changes[path] = value
+        self._state.touch(path, path)
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        path = self._path + (key,)
+        self._state.changes[path] = _DELETED
+        self._state.touch(path, path)
+
+    def __contains__(self, key):
+        value = self._state.changes.get(self._path + (key,))
+        if value is not None:
+            return value is not _DELETED
+        return key in self._base or self._path + (key,) in self._state.changes
+
+    def __iter__(self):
+        for key in self._base:
+            if self._state.changes.get(self._path + (key,)) is not _DELETED:
+                yield key
+        for key in self._state.added_keys.get(self._path, ()):
+            if self._state.changes.get(self._path + (key,)) is not _DELETED:
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"OverlayDict({self._state.materialize(self._base, self._path)!r})"
+
+
+class OverlayList(MutableSequence):
+    """Copy-on-write view of a shared list.
+
+    The first structural change copies the list into the session's changes;
+    until then reads go straight to the shared list.
+    """
+
+    __slots__ = ("_base", "_state", "_path")
+
+    def __init__(self, base, state, path):
+        self._base = base
+        self._state = state
+        self._path = path
+
+    def _current(self):
+        return self._state.changes.get(self._path, self._base)
+
+    def _own(self):
+        owned = self._state.changes.get(self._path)
+        if owned is None:
+            owned = self._state.materialize(self._base, self._path)
+            self._state.changes[self._path] = owned
+        return owned
+
+    def __getitem__(self, index):
+        current = self._current()
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(current)))]
+        value = current[index]
+        path = self._path + (index % len(current),)
+        if current is self._base:
+            return self._state.wrap(value, path)
+        return self._state.wrap_owned(value, self._path, path)
+
+    def __setitem__(self, index, value):
+        self._own()[index] = value
+        self._state.touch(self._path, self._path + (index,))
+
+    def __delitem__(self, index):
+        del self._own()[index]
+        self._state.touch(self._path, self._path + (index,))
+
+    def insert(self, index, value):
+        self._own().insert(index, value)
+        self._state.touch(self._path, self._path + (index,))
+
+    def __len__(self):
+        return len(self._current())
+
+    def __contains__(self, value):
+        return value in self._current()
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __add__(self, other):
+        return list(self) + list(other)
+
+    def __radd__(self, other):
+        return list(other) + list(self)
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return f"OverlayList({list(self)!r})"
+
+
+class OwnedDict(MutableMapping):
+    """View of a dict inside a change the session already owns.
+
+    Edits go straight to the dict. Wrapping it only lets the session notice
+    them: they mark the change dirty for the save journal and, on exits,
+    move `exits_version`.
+    """
+
+    __slots__ = ("_value", "_state", "_root", "_path")
+
+    def __init__(self, value, state, root, path):
+        self._value = value
+        self._state = state
+        self._root = root
+        self._path = path
+
+    def __getitem__(self, key):
+        return self._state.wrap_owned(self._value[key], self._root, self._path + (key,))
+
+    def __setitem__(self, key, value):
+        self._value[key] = value
+        self._state.touch(self._root, self._path + (key,))
+
+    def __delitem__(self, key):
+        del self._value[key]
+        self._state.touch(self._root, self._path + (key,))
+
+    def __contains__(self, key):
+        return key in self._value
+
+    def __iter__(self):
+        return iter(self._value)
+
+    def __len__(self):
+        return len(self._value)
+
+    def __repr__(self):
+        return f"OwnedDict({self._value!r})"
+
+
+class OwnedList(MutableSequence):
+    """View of a list inside a change the session already owns, like OwnedDict."""
+
+    __slots__ = ("_value", "_state", "_root", "_path")
+
+    def __init__(self, value, state, root, path):
+        self._value = value
+        self._state = state
+        self._root = root
+        self._path = path
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._value)))]
+        value = self._value[index]
+        return self._state.wrap_owned(value, self._root, self._path + (index % len(self._value),))
+
+    def __setitem__(self, index, value):
+        self._value[index] = value
+        self._state.touch(self._root, self._path + (index,))
+
+    def __delitem__(self, index):
+        del self._value[index]
+        self._state.touch(self._root, self._path + (index,))
+
+    def insert(self, index, value):
+        self._value.insert(index, value)
+        self._state.touch(self._root, self._path + (index,))
+
+    def __len__(self):
+        return len(self._value)
+
+    def __contains__(self, value):
+        return value in self._value
+
+    def __iter__(self):
+        for index in range(len(self._value)):
+            yield self[index]
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return f"OwnedList({self._value!r})"
@@ -1,5 +1,8 @@
+import argparse
 import json
 import os
+import sys
+from contextlib import nullcontext
 from os import environ
 environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
 from engine.game_engine import GameEngine
@@ -7,6 +10,9 @@ from engine.save_load import SaveLoad
 from engine.media_player import MediaPlayer
 from engine.parser import Parser
 from engine.message_handler import message_handler
+from engine.output import StreamSink, use_sink
+from engine.recording import SessionRecorder
+from engine.typewriter import set_no_delay
 
 def load_data(filename):
     with open(filename, 'r') as f:
@@ -15,7 +21,7 @@ def load_data(filename):
 def clear_screen():
     os.system('cls' if os.name == 'nt' else 'clear')
 
-def main():
+def main(seed=None, record=None, config_file='game_files/config.json'):
     clear_screen()
     print("================================")
     print("CLIo - Text-Based CLI Game Maker")
@@ -23,26 +29,110 @@ def main():
     print("================================")
     print("                                ")
 
-    media_player = MediaPlayer()
-    save_load = SaveLoad()
-    parser = Parser()  # Initialize the Parser
-    game_engine = GameEngine('game_files/config.json', media_player, parser)  # Pass the parser to GameEngine
-    media_player.print_with_delay(game_engine.current_scene["description"])
-    game_engine.display_story_text("intro")
+    recorder = SessionRecorder(record, StreamSink()) if record else None
+    with use_sink(recorder) if recorder else nullcontext():
+        media_player = MediaPlayer()
+        save_load = SaveLoad()
+        parser = Parser()  # Initialize the Parser
+        game_engine = GameEngine(config_file, media_player, parser, seed=seed)  # Pass the parser to GameEngine
+        if recorder:
+            recorder.start(game_engine, config_file)
+        media_player.print_with_delay(game_engine.current_scene["description"])
+        game_engine.display_story_text("intro")
+        message_handler.flush()
 
+        try:
+            while True:
+                command = input(game_engine.prompt_text())
+                game_engine.process_command(command)
+
+                if game_engine.quit_requested or game_engine.check_game_over():
+                    break
+        except KeyboardInterrupt:
+            print("\nGame interrupted. Thank you for playing! Goodbye!")
+        finally:
+            if recorder:
+                recorder.close()
+
+def build(config_file, output=None):
+    """Compile the content named in a game config into a binary content pack."""
+    from engine.content_pack import build_pack
+    from engine.world import World
+
+    config = load_data(config_file)
+    output = output or config.get("content_pack", "game_files/world.pack")
+    world = World.from_content(config)
+    build_pack(world, output)
+    print(f"Built {output}: {len(world.scenes)} scenes, {len(world.items)} items, "
+          f"{len(world.characters)} characters")
+
+def content(action, config_file, database=None):
+    """Import the JSON content files into the content database, or export them back."""
+    from engine.content_store import ContentStore
+
+    config = load_data(config_file)
+    database = database or config.get("content_db", "game_files/content.db")
+    store = ContentStore(database)
     try:
-        while True:
-            command = input(">> ").lower()
-            if not command.strip():
-                continue
-            game_engine.process_command(command)
+        if action == "import":
+            store.import_files(config)
+            print(f"Imported content into {database}")
+        else:
+            store.export_files(config)
+            print(f"Exported {database} to the content files")
+    finally:
+        store.close()
+
+def replay(recording, config_file=None):
+    """Replay a recorded session at full speed and report any output that differs."""
+    from engine.recording import replay as replay_recording
 
-            if game_engine.check_game_over():
-                break
+    result = replay_recording(recording, config_file)
+    if not result["content_matches"]:
+        print("Warning: the game content has changed since this session was recorded")
+    for line in result["diff"]:
+        print(line)
+    rate = result["commands"] / result["seconds"] if result["seconds"] else 0
+    status = "differs" if result["diff"] else "matches"
+    print(f"Replayed {result['commands']} commands in {result['seconds']:.3f}s "
+          f"({rate:.0f} commands/s); output {status}")
+    return not result["diff"]
 
-            game_engine.check_conditions()
-    except KeyboardInterrupt:
-        print("\nGame interrupted. Thank you for playing! Goodbye!")
+def parse_args():
+    parser = argparse.ArgumentParser(description="CLIo - Text-Based CLI Game Maker")
+    parser.add_argument("--no-delay", action="store_true", help="Print all text instantly, for automation")
+    parser.add_argument("--seed", type=int, help="Seed for all chance in the game, to reproduce a session")
+    parser.add_argument("--record", metavar="FILE", help="Record the session to FILE for replaying")
+    parser.add_argument("--game-config", default="game_files/config.json", help="Game config file to play")
+    subparsers = parser.add_subparsers(dest="command")
+    serve = subparsers.add_parser("serve", help="Host the game for many players over TCP/telnet")
+    serve.add_argument("--config", default="game_files/config.json", help="Game config file")
+    serve.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    serve.add_argument("--port", type=int, default=4000, help="Port to listen on")
+    build_parser = subparsers.add_parser("build", help="Compile game content into a binary pack")
+    build_parser.add_argument("--config", default="game_files/config.json", help="Game config file")
+    build_parser.add_argument("--output", help="Pack file to write, content_pack from the config by default")
+    content_parser = subparsers.add_parser("content", help="Move game content between the JSON files and the content database")
+    content_parser.add_argument("action", choices=["import", "export"], help="import the JSON files, or export the database to them")
+    content_parser.add_argument("--config", default="game_files/config.json", help="Game config file")
+    content_parser.add_argument("--database", help="Database file, content_db from the config by default")
+    replay_parser = subparsers.add_parser("replay", help="Replay a recorded session headlessly and diff its output")
+    replay_parser.add_argument("recording", help="Recording made with --record")
+    replay_parser.add_argument("--config", help="Game config file, the recorded one by default")
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    if args.no_delay:
+        set_no_delay()
+    if args.command == "serve":
+        from engine.server import run_server
+        run_server(args.config, args.host, args.port)
+    elif args.command == "build":
+        build(args.config, args.output)
+    elif args.command == "content":
+        content(args.action, args.config, args.database)
+    elif args.command == "replay":
+        sys.exit(0 if replay(args.recording, args.config) else 1)
+    else:
+        main(args.seed, args.record, args.game_config)
@@ -0,0 +1,60 @@
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from engine.game_engine import GameEngine  # noqa: E402
+from engine.output import CaptureSink, use_sink  # noqa: E402
+from engine.parser import Parser  # noqa: E402
+from engine.typewriter import set_no_delay  # noqa: E402
+from engine.world import World  # noqa: E402
+
+set_no_delay()
+
+
+@pytest.fixture(autouse=True)
+def repo_root(monkeypatch):
+    # Content and style paths in the game config are relative to the repository
+    monkeypatch.chdir(ROOT)
+
+
+@pytest.fixture
+def config(tmp_path):
+    """The bundled game config, reading the JSON content files and saving under tmp_path."""
+    with open(os.path.join(ROOT, "game_files", "config.json"), "r") as f:
+        config = json.load(f)
+    config.pop("content_pack", None)
+    config.pop("content_db", None)
+    config["save_dir"] = str(tmp_path / "saves")
+    return config
+
+
+@pytest.fixture
+def config_file(config, tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps(config))
+    return str(path)
+
+
+@pytest.fixture
+def world(config):
+    return World.from_files(config)
+
+
+@pytest.fixture
+def output():
+    """Capture everything the engine prints while the test runs."""
+    with use_sink(CaptureSink()) as sink:
+        yield sink
+
+
+@pytest.fixture
+def new_engine(config_file, output):
+    """Start seeded game sessions on the bundled game."""
+    def start(player=None, seed=1):
+        return GameEngine(config_file, None, Parser(), player=player, seed=seed)
+    return start
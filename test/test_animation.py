@@ -0,0 +1,53 @@
+import io
+import threading
+
+import pytest
+
+from engine.animation import AnimationScheduler
+from engine.typewriter import set_no_delay
+
+
+class BlockingStream(io.StringIO):
+    """A stream whose writes wait until the test lets them through."""
+
+    def __init__(self):
+        super().__init__()
+        self.writing = threading.Event()
+        self.release = threading.Event()
+
+    def write(self, text):
+        self.writing.set()
+        self.release.wait(5)
+        return super().write(text)
+
+
+@pytest.fixture
+def scheduler():
+    set_no_delay(False)
+    yield AnimationScheduler()
+    set_no_delay()
+
+
+def test_frames_are_written_without_holding_the_scheduler(scheduler):
+    stream = BlockingStream()
+    scheduler.play([("a", 0), ("b", 0)], stream)
+    assert stream.writing.wait(5)
+    # The render thread is stuck writing a frame; the scheduler stays usable
+    assert scheduler.busy(stream)
+    other = io.StringIO()
+    scheduler.play([("x", 0)], other)
+    stream.release.set()
+    scheduler.wait()
+    assert stream.getvalue() == "ab"
+    assert other.getvalue() == "x"
+
+
+def test_cancel_finishes_the_frame_being_written(scheduler):
+    stream = BlockingStream()
+    animation = scheduler.play([("a", 0), ("b", 60), ("c", 0)], stream)
+    assert stream.writing.wait(5)
+    stream.release.set()
+    scheduler.cancel(stream)
+    assert animation.done
+    assert stream.getvalue() == "abc"
+    assert not scheduler.busy()
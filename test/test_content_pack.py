@@ -0,0 +1,79 @@
+import pytest
+
+from engine.content_pack import ContentPack, build_pack
+from engine.world import World
+
+
+@pytest.fixture
+def pack_file(world, tmp_path):
+    filename = str(tmp_path / "world.pack")
+    build_pack(world, filename)
+    return filename
+
+
+def test_pack_round_trip(world, pack_file):
+    packed = World.from_pack(pack_file)
+    assert list(packed.scenes) == list(world.scenes)
+    assert dict(packed.items) == dict(world.items)
+    assert dict(packed.characters) == dict(world.characters)
+    assert packed.story_texts == world.story_texts
+    assert packed.indexes == world.indexes
+    assert packed.movable_characters == world.movable_characters
+    assert packed.content_hash == world.content_hash
+
+
+def test_packed_name_indexes_match(world, pack_file):
+    packed = World.from_pack(pack_file)
+    queries = set()
+    for item_id, item in world.items.items():
+        name = item.get("name", item_id).lower()
+        queries.update({item_id, name, name.split()[-1], name[:1], name[:2], name[1:5]})
+    for query in sorted(queries):
+        assert packed.item_names.search(query) == world.item_names.search(query), query
+    for char_id, char in world.characters.items():
+        name = char.get("name", char_id).lower()
+        assert packed.character_names.search(name) == world.character_names.search(name)
+
+
+def test_names_added_to_a_packed_index(world, pack_file):
+    packed = World.from_pack(pack_file)
+    for index in (packed.item_names, world.item_names):
+        index.add("glow_wrench", "Glowing Wrench")
+    for query in ("glowing wrench", "wrench", "glow", "g"):
+        assert packed.item_names.search(query) == world.item_names.search(query)
+
+
+def test_entities_are_decoded_when_used(pack_file):
+    packed = World.from_pack(pack_file)
+    packed.item_names.resolve("screwdriver")
+    packed.character_names.resolve("robot")
+    assert not any(kind in ("scenes", "items", "characters") for kind, _ in packed.residency.entries)
+    assert packed.items["screwdriver"]["name"]
+    assert ("items", "screwdriver") in packed.residency.entries
+
+
+def test_rebuilding_leaves_open_packs_intact(world, pack_file):
+    packed = World.from_pack(pack_file)
+    item_id = next(iter(world.items))
+    name = world.items[item_id]["name"]
+    world.items[item_id] = dict(world.items[item_id], name="Rebuilt")
+    build_pack(world, pack_file)
+    assert packed.items[item_id]["name"] == name
+    assert World.from_pack(pack_file, verify=True).items[item_id]["name"] == "Rebuilt"
+
+
+def test_verify_detects_corrupt_content(pack_file):
+    with open(pack_file, "r+b") as f:
+        f.seek(-2, 2)
+        f.write(b"!")
+    World.from_pack(pack_file)
+    with pytest.raises(ValueError, match="corrupt"):
+        World.from_pack(pack_file, verify=True)
+
+
+def test_other_pack_versions_are_refused(pack_file):
+    with open(pack_file, "r+b") as f:
+        f.seek(8)
+        f.write((1).to_bytes(4, "little"))
+    with pytest.raises(ValueError, match="rebuild"):
+        ContentPack(pack_file)
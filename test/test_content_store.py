@@ -0,0 +1,48 @@
+import copy
+import os
+
+import pytest
+
+from engine.content_store import ContentStore
+from engine.world import World
+
+
+@pytest.fixture
+def store(config, tmp_path):
+    store = ContentStore(str(tmp_path / "content.db"))
+    store.import_files(config)
+    yield store
+    store.close()
+
+
+def test_import_round_trip(config, store):
+    assert list(store.load()) == [World.load_data(config[key]) for key in World.CONTENT_FILE_KEYS]
+
+
+def test_sync_rewrites_only_changed_rows(store):
+    items = store.entities("items")
+    assert store.sync("items", items) == 0
+
+    edited = copy.deepcopy(items)
+    item_id = next(iter(edited))
+    edited[item_id]["name"] = "Renamed"
+    del edited[list(edited)[-1]]
+    assert store.sync("items", edited) == 2
+    assert store.entities("items") == edited
+    assert store.find_by_name("items", "renamed") == [item_id]
+
+
+def test_sync_refuses_types_it_does_not_store(store):
+    with pytest.raises(ValueError):
+        store.sync("recipes", [])
+
+
+def test_newer_json_files_win_over_the_database(config, store):
+    config["content_db"] = store.filename
+    os.utime(store.filename, (0, 0))
+    assert World.content_sources(config) == tuple(
+        os.path.abspath(config[key]) for key in World.CONTENT_FILE_KEYS)
+
+    newest = max(os.path.getmtime(config[key]) for key in World.CONTENT_FILE_KEYS)
+    os.utime(store.filename, (newest + 1, newest + 1))
+    assert World.content_sources(config) == (os.path.abspath(store.filename),)
@@ -0,0 +1,78 @@
+import json
+
+from engine.metrics import PHASES, CommandMetrics
+
+MS = 1_000_000
+
+
+def timing(action, parse_ms, handler_ms, post_ms, render_ms, start=0):
+    marks = [start]
+    for duration in (parse_ms, handler_ms, post_ms, render_ms):
+        marks.append(marks[-1] + int(duration * MS))
+    return (action, *marks)
+
+
+def record(metrics, *timings):
+    for entry in timings:
+        metrics.pending.append(entry)
+        metrics.after_record(entry, entry[0])
+
+
+def test_json_export_has_phase_histograms(tmp_path):
+    metrics = CommandMetrics(slow_ms=50, export_file=str(tmp_path / "commands.json"))
+    record(metrics, timing("look", 0.01, 0.02, 0.01, 0.01), timing("look", 0.1, 0.5, 0.2, 0.2),
+           timing("take", 1, 70, 2, 7))
+    metrics.export()
+    with open(metrics.export_file, "r", encoding="utf-8") as f:
+        stats = json.load(f)
+
+    assert list(stats) == ["take", "look"]
+    look = stats["look"]
+    assert look["count"] == 2 and look["slow"] == 0
+    assert look["buckets"]["50"] == 1 and look["buckets"]["1000"] == 1
+    assert sum(look["buckets"].values()) == 2
+    assert look["phases_us"] == {"parse": 55, "handler": 260, "post": 105, "render": 105}
+    take = stats["take"]
+    assert take["slow"] == 1
+    assert take["buckets"]["100000"] == 1
+    assert take["max_us"] == 80000
+    assert list(take["phases_us"]) == list(PHASES)
+
+
+def test_prometheus_export_is_cumulative(tmp_path):
+    metrics = CommandMetrics(export_file=str(tmp_path / "commands.prom"))
+    record(metrics, timing("look", 0.01, 0.02, 0.01, 0.01), timing("look", 0.1, 0.5, 0.2, 0.2))
+    metrics.export()
+    with open(metrics.export_file, "r", encoding="utf-8") as f:
+        lines = dict(line.rsplit(" ", 1) for line in f.read().splitlines() if not line.startswith("#"))
+
+    assert lines['clio_command_seconds_bucket{action="look",le="5e-05"}'] == "1"
+    assert lines['clio_command_seconds_bucket{action="look",le="0.0005"}'] == "1"
+    assert lines['clio_command_seconds_bucket{action="look",le="0.001"}'] == "2"
+    assert lines['clio_command_seconds_bucket{action="look",le="+Inf"}'] == "2"
+    assert lines['clio_command_seconds_count{action="look"}'] == "2"
+    assert float(lines['clio_command_seconds_sum{action="look"}']) == 0.00105
+    assert float(lines['clio_command_phase_seconds_total{action="look",phase="handler"}']) == 0.00052
+    assert lines['clio_slow_commands_total{action="look"}'] == "0"
+
+
+def test_slow_commands_are_logged_with_their_phases(tmp_path):
+    metrics = CommandMetrics(slow_ms=50, slow_log=str(tmp_path / "slow.jsonl"))
+    record(metrics, timing("look", 1, 2, 1, 1), timing("take", 1, 70, 2, 7))
+    metrics.write_slow_log()
+    with open(metrics.slow_log, "r", encoding="utf-8") as f:
+        entries = [json.loads(line) for line in f]
+    assert entries == [{"command": "take", "action": "take", "total_ms": 80.0,
+                        "parse_ms": 1.0, "handler_ms": 70.0, "post_ms": 2.0, "render_ms": 7.0}]
+
+
+def test_engine_times_commands_by_action(new_engine, monkeypatch):
+    metrics = CommandMetrics(slow_ms=10000)
+    monkeypatch.setattr("engine.game_engine.get_metrics", lambda _: metrics)
+    engine = new_engine()
+    for command in ("look", "exit", "cancel", "look"):
+        engine.process_command(command)
+    stats = metrics.snapshot()
+    assert {action: action_stats["count"] for action, action_stats in stats.items()} == {
+        "explore_scene": 2, "exit_room": 1, "answer": 1}
+    assert all(value >= 0 for value in stats["explore_scene"]["phases_us"].values())
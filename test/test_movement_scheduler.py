@@ -0,0 +1,66 @@
+import copy
+
+from engine.movement_scheduler import MovementScheduler
+
+CHARACTERS = {
+    "bot": {"movable": True, "moves_after_commands": 2},
+    "dog": {"movable": True, "follow_player": True},
+    "cat": {"movable": True, "moves_on_scene_change": True, "moves_after_commands": 3},
+}
+
+
+def scheduler_for(characters):
+    scheduler = MovementScheduler()
+    for char_id, character in characters.items():
+        scheduler.add_character(char_id, character)
+    return scheduler
+
+
+def test_characters_move_on_their_own_countdowns():
+    scheduler = scheduler_for(CHARACTERS)
+    assert scheduler.followers == ["dog"]
+    assert scheduler.scene_change_movers == ["cat"]
+    assert [scheduler.advance() for _ in range(6)] == [[], ["bot"], ["cat"], ["bot"], [], ["bot", "cat"]]
+
+
+def test_loading_restores_countdowns():
+    scheduler = scheduler_for(CHARACTERS)
+    scheduler.advance()
+    state = scheduler.get_state()
+
+    loaded = MovementScheduler()
+    loaded.load_state(state, CHARACTERS)
+    assert loaded.get_state() == state
+    assert [loaded.advance() for _ in range(3)] == [["bot"], ["cat"], ["bot"]]
+
+
+def test_loading_reschedules_characters_removed_since():
+    scheduler = scheduler_for(CHARACTERS)
+    state = copy.deepcopy(scheduler.get_state())
+    scheduler.remove_character("bot")
+    scheduler.remove_character("dog")
+
+    scheduler.load_state(state, CHARACTERS)
+    assert scheduler.followers == ["dog"]
+    assert scheduler.get_state() == state
+
+    scheduler.load_state(state, {"cat": CHARACTERS["cat"]})
+    assert scheduler.followers == []
+    assert list(scheduler.due_ticks) == ["cat"]
+
+
+def test_loading_an_older_save_brings_back_removed_characters(new_engine):
+    engine = new_engine()
+    saved = copy.deepcopy(engine.get_game_state())
+    world_entries = copy.deepcopy(engine.world_state.entries())
+
+    engine.remove_character_from_scene("cleaning_microbot")
+    engine.movement_scheduler.remove_character("cleaning_microbot")
+    assert "cleaning_microbot" not in engine.movement_scheduler.due_ticks
+    defeated = copy.deepcopy((engine.get_game_state(), engine.world_state.entries()))
+
+    engine.load_game_state(saved, world_entries)
+    assert "cleaning_microbot" in engine.movement_scheduler.due_ticks
+
+    engine.load_game_state(*defeated)
+    assert "cleaning_microbot" not in engine.movement_scheduler.due_ticks
@@ -0,0 +1,27 @@
+import threading
+
+from engine.name_index import EXACT, LAST_WORD, PREFIX, SUBSTRING, NameIndex
+
+
+def test_ranks_best_tier_first():
+    index = NameIndex({"rusty_key": {"name": "Rusty Key"}, "key_card": {"name": "Key Card"},
+                       "turkey": {"name": "Turkey"}})
+    assert index.search("rusty key") == (EXACT, ["rusty_key"])
+    assert index.search("key") == (LAST_WORD, ["rusty_key"])
+    assert index.search("ca") == (PREFIX, ["key_card"])
+    assert index.search("urk") == (SUBSTRING, ["turkey"])
+    assert index.search("key", scope=["turkey", "key_card"]) == (PREFIX, ["key_card"])
+
+
+def test_searches_wait_for_names_being_added():
+    index = NameIndex({"lamp": {"name": "Lamp"}})
+    results = []
+    searcher = threading.Thread(target=lambda: results.append(index.search("la")))
+    # Stand in for a maze region being indexed on another worker thread
+    with index.lock:
+        searcher.start()
+        searcher.join(0.05)
+        assert searcher.is_alive()
+        index.add("lantern", "Lantern")
+    searcher.join()
+    assert results == [(PREFIX, ["lamp", "lantern"])]
@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+from engine.game_engine import GameEngine
+from engine.parser import Parser
+
+
+def scene(scene_id, *exits, characters=()):
+    return {"id": scene_id, "name": scene_id.title(), "description": f"The {scene_id}.", "items": [],
+            "characters": list(characters), "exits": [
+                {"door_name": f"{target.title()} Door", "scene_id": target, "locked": locked,
+                 "lock_text": "It is locked.", "unlock_text": "It opens.", "required_item": "passcode",
+                 "passcode": "1234"}
+                for target, locked in exits]}
+
+
+def character(name, **movement):
+    return {"name": name, "type": "friendly", "description": f"A {name.lower()}.", "movable": True, **movement}
+
+
+@pytest.fixture
+def route_config_file(config, tmp_path):
+    # The vault can only be entered through locked doors; the way out is open
+    scenes = [
+        scene("hall", ("lab", False), ("vault", True), characters=["dog", "guard"]),
+        scene("lab", ("hall", False), ("vault", True)),
+        scene("vault", ("hall", False)),
+    ]
+    characters = {
+        "dog": character("Dog", follow_player=True),
+        "guard": character("Guard", moves_after_commands=1, patrol=["lab", "vault"]),
+    }
+    files = {"scenes_file": scenes, "items_file": {}, "characters_file": characters, "story_texts_file": {}}
+    for key, content in files.items():
+        path = tmp_path / f"{key}.json"
+        path.write_text(json.dumps(content))
+        config[key] = str(path)
+    config["initial_scene"] = "hall"
+    config["autosave"] = False
+    path = tmp_path / "routes.json"
+    path.write_text(json.dumps(config))
+    return str(path)
+
+
+@pytest.fixture
+def engine(route_config_file, output):
+    return GameEngine(route_config_file, None, Parser(), player="routes", seed=1)
+
+
+def unlock(engine, scene_id, target):
+    for exit in engine.get_scene(scene_id)["exits"]:
+        if exit["scene_id"] == target:
+            exit["locked"] = False
+
+
+def test_followers_wait_behind_locked_doors(engine):
+    # Put the player in the vault without opening a door on the way
+    engine.current_scene = engine.get_scene("vault")
+    engine.check_scene_change_movements()
+    assert engine.character_locations["dog"] == "hall"
+
+    unlock(engine, "hall", "vault")
+    engine.check_scene_change_movements()
+    assert engine.character_locations["dog"] == "vault"
+
+
+def test_patrols_skip_waypoints_behind_locked_doors(engine):
+    visited = set()
+    for _ in range(12):
+        engine.process_command("inventory")
+        visited.add(engine.character_locations["guard"])
+    # The guard reaches the lab and waits there for a way into the vault
+    assert visited == {"lab"}
+
+    unlock(engine, "lab", "vault")
+    for _ in range(12):
+        engine.process_command("inventory")
+        visited.add(engine.character_locations["guard"])
+    assert "vault" in visited
+    # The guard walks out through the open door and back in through the lab
+    assert engine.get_scene("hall")["exits"][1]["locked"]
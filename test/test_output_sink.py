@@ -0,0 +1,62 @@
+import io
+
+from engine.message_handler import message_handler
+from engine.output import CaptureSink, NullSink, StreamSink, use_sink
+
+
+class CountingStream(io.StringIO):
+    """A stream that counts the writes it is sent."""
+
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+def test_capture_sink_keeps_records_in_order():
+    with use_sink(CaptureSink()) as sink:
+        message_handler.print_message("Hello", "system")
+        message_handler.print_plain("World")
+    assert sink.messages() == ["Hello", "World"]
+    assert sink.messages("system") == ["Hello"]
+    assert [record.style for record in sink.records] == ["system", None]
+    sink.clear()
+    assert sink.text() == ""
+
+
+def test_null_sink_discards_records():
+    stream = CountingStream()
+    with use_sink(StreamSink(stream)):
+        with use_sink(NullSink()):
+            message_handler.print_message("Hello", "system")
+            message_handler.print_plain("World")
+    assert stream.writes == 0
+
+
+def test_stream_sink_writes_each_command_at_once(new_engine):
+    engine = new_engine()
+    stream = CountingStream()
+    with use_sink(StreamSink(stream)) as sink:
+        engine.process_command("look")
+        assert stream.writes == 1
+        assert not sink.records
+        first = stream.getvalue()
+        engine.process_command("inventory")
+        assert stream.writes == 2
+    assert first.count("\n") > 1
+    assert stream.getvalue().startswith(first)
+
+
+def test_stream_sink_holds_output_until_flushed():
+    stream = CountingStream()
+    sink = StreamSink(stream)
+    with use_sink(sink):
+        message_handler.print_plain("one")
+        message_handler.print_plain("two")
+        assert stream.writes == 0
+        message_handler.flush()
+        assert stream.writes == 1
+    assert stream.getvalue() == "one\ntwo\n"
@@ -0,0 +1,46 @@
+import pytest
+
+from engine.parser import Parser
+
+
+@pytest.fixture
+def parser():
+    return Parser()
+
+
+def test_longest_verb_wins(parser):
+    assert parser.parse_command("look") == {"action": "explore_scene", "parameters": {}}
+    assert parser.parse_command("look at panel") == {"action": "look_at", "parameters": {"target_name": "panel"}}
+    assert parser.parse_command("look at yourself") == {"action": "examine_self", "parameters": {}}
+    assert parser.parse_command("pick up the wire") == {"action": "take_item", "parameters": {"item_name": "the wire"}}
+
+
+def test_separators_split_parameters(parser):
+    assert parser.parse_command("combine wire with chip") == {
+        "action": "combine_items", "parameters": {"item1_name": "wire", "item2_name": "chip"}}
+    assert parser.parse_command("give chip to robot") == {
+        "action": "give_item_to_character", "parameters": {"item_name": "chip", "character_name": "robot"}}
+    assert parser.parse_command("combine wire")["action"] == "invalid"
+
+
+def test_missing_and_unexpected_parameters(parser):
+    assert parser.parse_command("help") == {"action": "help", "parameters": {"topic": None}}
+    assert parser.parse_command("take") == {
+        "action": "invalid", "message": "The command 'take' needs a target. Try 'take [target]'."}
+    assert parser.parse_command("inventory now")["action"] == "invalid"
+    assert parser.parse_command("dance")["action"] == "invalid"
+
+
+def test_commands_are_normalized_and_cached(parser):
+    parsed = parser.parse_command("  TAKE   Screwdriver ")
+    assert parsed == {"action": "take_item", "parameters": {"item_name": "screwdriver"}}
+    assert parser.parse_command("take screwdriver") is parsed
+
+
+def test_verb_aliases(parser):
+    parser.parse_command("x panel")
+    parser.add_verbs({"x": "examine", "get": "take_item"})
+    assert parser.parse_command("x panel") == {"action": "look_at", "parameters": {"target_name": "panel"}}
+    assert parser.parse_command("get wire") == {"action": "take_item", "parameters": {"item_name": "wire"}}
+    with pytest.raises(ValueError):
+        parser.add_verbs({"y": "juggle"})
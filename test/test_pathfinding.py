@@ -0,0 +1,80 @@
+import pytest
+
+from engine.pathfinding import Pathfinder
+from engine.world import World, WorldState
+
+
+def scene(scene_id, *exits):
+    return {"id": scene_id, "name": f"Room {scene_id.upper()}",
+            "exits": [{"scene_id": exit_id} for exit_id in exits]}
+
+
+@pytest.fixture
+def world_state():
+    # a <-> b <-> c -> d, and e has no way in or out
+    scenes = [scene("a", "b"), scene("b", "a", "c"), scene("c", "b", "d"), scene("d"), scene("e")]
+    return WorldState(World(scenes, {}, {}, {}))
+
+
+def test_next_hop_follows_shortest_route(world_state):
+    pathfinder = Pathfinder(world_state)
+    assert pathfinder.next_hop("a", "d") == "b"
+    assert pathfinder.next_hop("b", "d") == "c"
+    assert pathfinder.next_hop("c", "a") == "b"
+    assert pathfinder.next_hop("d", "d") is None
+
+
+def test_walkers_share_one_search_per_target(world_state):
+    pathfinder = Pathfinder(world_state)
+    pathfinder.next_hop("a", "d")
+    search = pathfinder.searches["d"]
+    pathfinder.next_hop("b", "d")
+    assert pathfinder.searches["d"] is search
+    assert list(pathfinder.searches) == ["d"]
+
+
+def test_unreachable_result_is_kept(world_state):
+    pathfinder = Pathfinder(world_state)
+    assert pathfinder.next_hop("e", "a") is None
+    assert pathfinder.searches["a"].done
+    assert pathfinder.next_hop("d", "a") is None
+
+
+def test_locking_an_exit_drops_routes(world_state):
+    pathfinder = Pathfinder(world_state)
+    assert pathfinder.next_hop("a", "d") == "b"
+    version = world_state.exits_version
+    world_state.get_scene("b")["exits"][1]["locked"] = True
+    assert world_state.exits_version > version
+    assert pathfinder.next_hop("a", "d") is None
+    world_state.get_scene("b")["exits"][1]["locked"] = False
+    assert pathfinder.next_hop("a", "d") == "b"
+
+
+def test_exits_added_by_the_session_are_used(world_state):
+    pathfinder = Pathfinder(world_state)
+    assert pathfinder.next_hop("e", "a") is None
+    world_state.get_scene("e")["exits"].append({"scene_id": "d"})
+    world_state.get_scene("d")["exits"].append({"scene_id": "a"})
+    assert pathfinder.next_hop("e", "a") == "d"
+    assert pathfinder.next_hop("c", "a") == "b"
+
+
+def test_work_budget_is_per_command(world_state):
+    pathfinder = Pathfinder(world_state, max_work=1)
+    pathfinder.start_command()
+    assert pathfinder.next_hop("a", "d") is None
+    hop = None
+    for _ in range(5):
+        pathfinder.start_command()
+        hop = pathfinder.next_hop("a", "d")
+        if hop:
+            break
+    assert hop == "b"
+
+
+def test_find_scene_by_name(world_state):
+    pathfinder = Pathfinder(world_state)
+    assert pathfinder.find_scene("a", "room d") == ["b", "c", "d"]
+    assert pathfinder.find_scene("a", "c") == ["b", "c"]
+    assert pathfinder.find_scene("a", "room e") is None
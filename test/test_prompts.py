@@ -0,0 +1,90 @@
+from engine.prompt import AWAITING_CHOICE
+
+
+def answer(engine, output, line):
+    """Send one line and return what it printed along with the result."""
+    output.clear()
+    return engine.process_command(line), output.text()
+
+
+def test_exit_menu_reasks_until_a_valid_choice(new_engine, output):
+    engine = new_engine()
+    assert answer(engine, output, "exit")[0] == AWAITING_CHOICE
+    assert engine.prompt_text().startswith("Enter the number of your choice")
+
+    result, text = answer(engine, output, "9")
+    assert result == AWAITING_CHOICE
+    assert "between 1 and 2" in text
+    result, text = answer(engine, output, "north")
+    assert result == AWAITING_CHOICE
+    assert "valid number" in text
+
+    result, text = answer(engine, output, "cancel")
+    assert result is None
+    assert "You decide to stay." in text
+    assert engine.pending_prompt is None
+    assert engine.current_scene["id"] == "scene1"
+
+
+def test_prompts_chain_into_new_prompts(new_engine, output):
+    engine = new_engine()
+    answer(engine, output, "exit")
+    # The airlock asks for its passcode in a second prompt
+    assert answer(engine, output, "2")[0] == AWAITING_CHOICE
+    assert engine.prompt_text().startswith("Enter the passcode")
+    result, text = answer(engine, output, "wrong")
+    assert result == AWAITING_CHOICE
+    assert "Incorrect passcode" in text
+
+    assert answer(engine, output, "PASS")[0] is None
+    assert engine.current_scene["id"] == "scene2"
+
+
+def test_prompt_answers_are_not_parsed_as_commands(new_engine, output):
+    engine = new_engine()
+    answer(engine, output, "exit")
+    answer(engine, output, "inventory")
+    assert engine.pending_prompt is not None
+    assert "Inventory:" not in output.text()
+    answer(engine, output, "exit")
+    assert engine.pending_prompt is None
+    assert "Inventory:" in answer(engine, output, "inventory")[1]
+
+
+def test_dialogue_choices(new_engine, output):
+    engine = new_engine()
+    assert answer(engine, output, "talk to friendly robot")[0] == AWAITING_CHOICE
+
+    result, text = answer(engine, output, "7")
+    assert result == AWAITING_CHOICE
+    assert "Please enter a number between 1 and" in text
+    result, text = answer(engine, output, "hello")
+    assert result == AWAITING_CHOICE
+    assert "valid number" in text
+
+    result, text = answer(engine, output, "leave")
+    assert result is None
+    assert "You end the conversation." in text
+
+    answer(engine, output, "talk to friendly robot")
+    assert answer(engine, output, "1")[0] is None
+    assert engine.characters["friendly_robot"]["dialogue_options"]["Ask for help"] in output.messages()
+
+
+def test_fight_asks_each_round_until_the_battle_ends(new_engine, output):
+    engine = new_engine()
+    assert answer(engine, output, "fight bugrat")[0] == AWAITING_CHOICE
+    assert engine.prompt_text() == "Do you want to attack or defend? "
+
+    # An invalid action plays no round and asks again
+    health = engine.player_stats["health"]
+    assert answer(engine, output, "dance")[0] == AWAITING_CHOICE
+    assert engine.player_stats["health"] == health
+
+    for _ in range(50):
+        result, _ = answer(engine, output, "attack")
+        if result is None:
+            break
+    assert engine.pending_prompt is None
+    assert engine.get_story_progress("mutated_bugrat_defeated")
+    assert "mutated_bugrat" not in engine.current_scene["characters"]
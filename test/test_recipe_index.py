@@ -0,0 +1,34 @@
+from engine.recipe_index import RecipeIndex
+
+ITEMS = {
+    "wire": {"name": "Wire"},
+    "chip": {"name": "Chip"},
+    "circuit": {"name": "Circuit", "components": ["wire", "chip"]},
+    "spare_circuit": {"name": "Spare Circuit", "components": ["chip", "wire"]},
+    "broken_tool": {"name": "Broken Tool"},
+    "tool": {"name": "Tool", "components": ["broken_tool"]},
+    "amulet": {"name": "Amulet", "npc_craftable": {"crafter": "smith", "required_items": ["chip", "wire"]}},
+    "ring": {"name": "Ring", "npc_craftable": {"crafter": "smith", "required_items": ["wire"]}},
+}
+
+
+def test_combinations_ignore_order_and_first_recipe_wins():
+    recipes = RecipeIndex(ITEMS)
+    assert recipes.combination_for("wire", "chip") == "circuit"
+    assert recipes.combination_for("chip", "wire") == "circuit"
+    assert recipes.combination_for("wire", "wire") is None
+
+
+def test_single_component_recipes_are_repairs():
+    recipes = RecipeIndex(ITEMS)
+    assert recipes.repaired_version("broken_tool") == "tool"
+    assert recipes.combination_for("broken_tool") == "tool"
+    assert recipes.repaired_version("wire") is None
+
+
+def test_crafter_recipes():
+    recipes = RecipeIndex(ITEMS)
+    assert recipes.recipes_for_crafter("smith") == ["amulet", "ring"]
+    assert recipes.required_items_for_crafter("smith") == {"chip", "wire"}
+    assert recipes.recipes_for_crafter("robot") == []
+    assert recipes.required_items_for_crafter("robot") == set()
@@ -0,0 +1,44 @@
+import json
+
+from engine.output import CaptureSink, use_sink
+from engine.recording import SessionRecorder, read_recording, replay
+
+COMMANDS = ["look", "take screwdriver", "fight bugrat", "defend", "attack", "attack", "attack",
+            "exit", "9", "cancel", "talk to friendly robot", "1", "inventory"]
+
+
+def record_session(new_engine, config_file, filename):
+    recorder = SessionRecorder(filename, CaptureSink())
+    with use_sink(recorder):
+        engine = new_engine(player="tester", seed=7)
+        recorder.start(engine, config_file)
+        for command in COMMANDS:
+            engine.process_command(command)
+    recorder.close()
+
+
+def test_replay_matches_the_recording(new_engine, config_file, tmp_path):
+    filename = str(tmp_path / "session.jsonl")
+    record_session(new_engine, config_file, filename)
+    header, entries = read_recording(filename)
+    assert header["seed"] == 7
+    assert [entry["input"] for entry in entries] == COMMANDS
+    assert any("Critical hit!" in line or "damage" in line for entry in entries for line in entry["output"])
+
+    result = replay(filename)
+    assert result["commands"] == len(COMMANDS)
+    assert result["content_matches"]
+    assert result["diff"] == []
+
+
+def test_replay_reports_output_that_differs(new_engine, config_file, tmp_path):
+    filename = str(tmp_path / "session.jsonl")
+    record_session(new_engine, config_file, filename)
+    with open(filename, "r", encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f]
+    lines[1]["output"].append("Something that never happened.")
+    with open(filename, "w", encoding="utf-8") as f:
+        f.writelines(json.dumps(line) + "\n" for line in lines)
+
+    diff = replay(filename)["diff"]
+    assert "-Something that never happened." in diff
@@ -0,0 +1,73 @@
+from engine.content_pack import build_pack
+from engine.residency import ResidencyManager
+from engine.world import World, WorldState
+
+
+class Owner:
+    """Stands in for a session pinning its neighborhood."""
+
+
+def page_in(residency, key, size=10):
+    return residency.get(key, size, lambda: {"key": key})
+
+
+def test_least_recently_used_entities_are_evicted_first():
+    residency = ResidencyManager(memory_cap=30)
+    for key in "abc":
+        page_in(residency, key)
+    page_in(residency, "a")
+    page_in(residency, "d")
+    assert [key for key in "abcd" if residency.is_resident(key)] == ["a", "c", "d"]
+    assert residency.size == 30
+
+
+def test_pinned_entities_survive_eviction():
+    residency = ResidencyManager(memory_cap=20)
+    owner = Owner()
+    page_in(residency, "a")
+    residency.pin(owner, ["a", "b"])
+    page_in(residency, "b")
+    for key in "cdefg":
+        page_in(residency, key)
+    assert residency.is_resident("a") and residency.is_resident("b")
+    assert list(residency.entries) == []
+
+    # Unpinned entities become the most recently used, then age out
+    residency.pin(owner, ["b"])
+    assert list(residency.entries) == ["a"]
+    page_in(residency, "h")
+    assert not residency.is_resident("a")
+    assert residency.is_resident("b")
+
+
+def test_pins_are_released_with_their_owner():
+    residency = ResidencyManager(memory_cap=0)
+    owner = Owner()
+    residency.pin(owner, ["a"])
+    page_in(residency, "a")
+    assert residency.is_resident("a")
+    del owner
+    assert not residency.is_resident("a")
+    assert residency.size == 0
+
+
+def test_evicted_entities_come_back_with_session_changes(world, tmp_path):
+    pack_file = str(tmp_path / "world.pack")
+    build_pack(world, pack_file)
+    residency = ResidencyManager(memory_cap=1)
+    packed = World.from_pack(pack_file, residency=residency)
+    world_state = WorldState(packed)
+
+    item_id = next(iter(world.items))
+    world_state.items[item_id]["name"] = "Renamed"
+    world_state.get_scene(world.scenes[0]["id"])["items"].append(item_id)
+    # Page in every item so the changed ones are evicted
+    for other_id in world.items:
+        packed.items[other_id]
+    assert not residency.is_resident(("items", item_id))
+    assert not residency.is_resident(("scenes", 0))
+
+    assert world_state.items[item_id]["name"] == "Renamed"
+    assert packed.items[item_id]["name"] == world.items[item_id]["name"]
+    assert list(world_state.get_scene(world.scenes[0]["id"])["items"])[-1] == item_id
+    assert packed.scenes[0]["items"] == world.scenes[0]["items"]
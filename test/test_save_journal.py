@@ -0,0 +1,85 @@
+import json
+import os
+
+from engine.save_journal import SaveJournal
+from engine.world import WorldState
+
+
+def read_files(journal):
+    files = []
+    for filename in (journal.snapshot_file, journal.journal_file):
+        with open(filename, "r", encoding="utf-8") as f:
+            files.append(f.read())
+    return files
+
+
+def journal_lines(journal):
+    with open(journal.journal_file, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_fresh_session_keeps_earlier_autosave(new_engine):
+    engine = new_engine()
+    engine.process_command("take screwdriver")
+    assert "screwdriver" in engine.inventory.items
+    saved = read_files(engine.save_journal)
+
+    fresh = new_engine()
+    fresh.process_command("help")
+    assert read_files(fresh.save_journal) == saved
+
+    fresh.process_command("load autosave")
+    assert "screwdriver" in fresh.inventory.items
+
+
+def test_no_autosave_until_state_changes(new_engine):
+    engine = new_engine()
+    engine.process_command("help")
+    assert not os.path.exists(engine.save_journal.snapshot_file)
+
+
+def test_record_saves_changed_entries_only(tmp_path, world):
+    journal = SaveJournal(str(tmp_path / "autosave"))
+    world_state = WorldState(world)
+    state = {
+        "current_scene_id": "scene1",
+        "character_locations": {"robot": "scene1", "guard": "scene2"},
+        "movement_schedule": {"tick": 0, "due_ticks": {"robot": 5}},
+        "characters_last_move": {"robot": 0},
+    }
+    journal.start(state, world_state)
+
+    # The first change starts the save with a snapshot
+    state["current_scene_id"] = "scene2"
+    assert journal.record(state, world_state)
+    assert journal_lines(journal) == []
+
+    state["character_locations"]["guard"] = "scene3"
+    state["movement_schedule"]["tick"] = 1
+    state["characters_last_move"]["robot"] = 1
+    assert journal.record(state, world_state)
+    record = journal_lines(journal)[-1]
+    assert sorted(map(tuple, (path for path, _ in record["entries"]))) == [
+        ("character_locations", "guard"), ("movement_schedule", "tick")]
+    assert record["deleted"] == []
+
+    # The movement tick alone is not worth a record
+    state["movement_schedule"]["tick"] = 2
+    assert not journal.record(state, world_state)
+
+    del state["character_locations"]["robot"]
+    state["movement_schedule"]["due_ticks"]["robot"] = 9
+    world_state.scenes[0]["description"] = "Dust settles."
+    assert journal.record(state, world_state)
+    record = journal_lines(journal)[-1]
+    assert record["deleted"] == [["character_locations", "robot"]]
+    assert sorted(record["entries"]) == [[["movement_schedule", "due_ticks", "robot"], 9],
+                                         [["movement_schedule", "tick"], 2]]
+    assert [entry[0] for entry in record["world"]] == [["scenes", 0, "description"]]
+
+    saved_state, world_entries = SaveJournal(str(tmp_path / "autosave")).load()
+    # When characters last moved is only kept in snapshots
+    assert saved_state == dict(state, characters_last_move={"robot": 0})
+    restored = WorldState(world)
+    restored.restore(world_entries)
+    assert restored.scenes[0]["description"] == "Dust settles."
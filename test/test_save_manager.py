@@ -0,0 +1,94 @@
+import os
+import subprocess
+import sys
+import threading
+
+from engine.save_manager import SaveManager, SaveWriter
+
+from conftest import ROOT
+
+
+def test_saves_are_written_to_a_temp_file_and_moved_into_place(tmp_path, monkeypatch):
+    replaced = []
+    real_replace = os.replace
+
+    def replace(src, dst):
+        # The old save is still whole until the new one is complete
+        replaced.append((src, dst, os.path.exists(dst)))
+        real_replace(src, dst)
+
+    monkeypatch.setattr(os, "replace", replace)
+    filename = str(tmp_path / "slot.sav")
+    SaveWriter.write(filename, {"slot": "slot"}, "{}")
+    SaveWriter.write(filename, {"slot": "slot"}, "{}")
+    assert replaced == [(filename + ".tmp", filename, False), (filename + ".tmp", filename, True)]
+    assert os.listdir(tmp_path) == ["slot.sav"]
+
+
+def test_queued_saves_of_one_file_are_coalesced(tmp_path):
+    writer = SaveWriter()
+    started, release = threading.Event(), threading.Event()
+    writes = []
+
+    def blocked():
+        started.set()
+        release.wait(5)
+
+    writer.queue(str(tmp_path / "other"), blocked)
+    assert started.wait(5)
+    filename = str(tmp_path / "slot.sav")
+    for i in range(3):
+        writer.queue(filename, lambda i=i: writes.append(i))
+    release.set()
+    writer.flush()
+    assert writes == [2]
+
+
+def test_failed_writes_are_kept_until_taken(tmp_path):
+    writer = SaveWriter()
+    filename = str(tmp_path / "slot.sav")
+
+    def fail():
+        raise OSError("disk full")
+
+    writer.queue(filename, fail)
+    writer.flush()
+    assert writer.take_failures(str(tmp_path / "elsewhere")) == {}
+    assert list(writer.take_failures(str(tmp_path))) == [filename]
+    assert writer.failures == {}
+
+    writer.queue(filename, fail)
+    writer.queue(str(tmp_path / "other.sav"), lambda: None)
+    writer.flush()
+    writer.queue(filename, lambda: None)
+    writer.flush()
+    assert writer.failures == {}
+
+
+def test_queued_saves_are_written_on_exit(tmp_path):
+    filename = str(tmp_path / "saves" / "player" / "slot.sav")
+    script = (
+        "import time\n"
+        "from engine.save_manager import SaveManager, SaveWriter\n"
+        "write = SaveWriter.write\n"
+        "SaveWriter.write = staticmethod(lambda *args: (time.sleep(0.2), write(*args)))\n"
+        f"SaveManager({str(tmp_path / 'saves')!r}, 'player').save('slot', {{'a': 1}}, [])\n"
+    )
+    subprocess.run([sys.executable, "-c", script], cwd=ROOT, check=True)
+    assert SaveManager(str(tmp_path / "saves"), "player").load("slot") == ({"a": 1}, [])
+    assert os.path.exists(filename)
+
+
+def test_failed_saves_are_reported_to_the_player(new_engine, output):
+    engine = new_engine()
+    # A directory where the save file should go makes the rename fail
+    os.makedirs(engine.saves.slot_file("stuck"))
+    engine.process_command("save stuck")
+    assert "Saving the game to 'stuck'..." in output.messages()
+    # The failure is told with the save, or after the next command if the write was still queued
+    engine.saves.exists("stuck")
+    engine.process_command("look")
+    assert len([text for text in output.messages("error") if "could not be saved to 'stuck'" in text]) == 1
+    output.clear()
+    engine.process_command("look")
+    assert not output.messages("error")
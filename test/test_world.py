@@ -0,0 +1,83 @@
+import copy
+
+import pytest
+
+from engine.world import World, WorldState
+
+
+@pytest.fixture
+def world():
+    scenes = [
+        {"id": "hall", "name": "Hall", "items": ["key", "lamp"],
+         "exits": [{"scene_id": "vault", "locked": True}]},
+        {"id": "vault", "name": "Vault", "items": [], "exits": [{"scene_id": "hall"}]},
+    ]
+    items = {
+        "key": {"name": "Key"},
+        "lamp": {"name": "Lamp"},
+        "chest": {"name": "Chest", "current_state": "locked",
+                  "states": {"locked": {}, "open": {}}},
+    }
+    return World(scenes, items, {}, {})
+
+
+def snapshot(world):
+    return copy.deepcopy((list(world.scenes), dict(world.items), dict(world.characters)))
+
+
+def test_sessions_do_not_see_each_others_changes(world):
+    before = snapshot(world)
+    first, second = WorldState(world), WorldState(world)
+
+    first.get_scene("hall")["items"].remove("key")
+    first.get_scene("hall")["exits"][0]["locked"] = False
+    first.items["chest"]["current_state"] = "open"
+
+    assert list(first.get_scene("hall")["items"]) == ["lamp"]
+    assert first.get_scene("hall")["exits"][0]["locked"] is False
+    assert first.items["chest"]["current_state"] == "open"
+
+    assert list(second.get_scene("hall")["items"]) == ["key", "lamp"]
+    assert second.get_scene("hall")["exits"][0]["locked"] is True
+    assert second.items["chest"]["current_state"] == "locked"
+
+    assert snapshot(world) == before
+
+
+def test_added_and_deleted_keys_stay_in_the_session(world):
+    before = snapshot(world)
+    first, second = WorldState(world), WorldState(world)
+
+    first.items["torch"] = {"name": "Torch"}
+    first.items["torch"]["current_state"] = "lit"
+    del first.items["lamp"]
+    first.get_scene("vault")["items"].append("torch")
+
+    assert "torch" in first.items and "lamp" not in first.items
+    assert first.items["torch"] == {"name": "Torch", "current_state": "lit"}
+    assert "torch" not in second.items and "lamp" in second.items
+    assert list(second.get_scene("vault")["items"]) == []
+    assert snapshot(world) == before
+
+
+def test_changes_are_restored_into_a_new_session(world):
+    first = WorldState(world)
+    first.get_scene("hall")["items"].remove("key")
+    first.get_scene("hall")["exits"][0]["locked"] = False
+    first.items["chest"]["current_state"] = "open"
+
+    restored = WorldState(world)
+    restored.restore(first.entries())
+    assert list(restored.get_scene("hall")["items"]) == ["lamp"]
+    assert restored.get_scene("hall")["exits"][0]["locked"] is False
+    assert restored.items["chest"]["current_state"] == "open"
+    assert world.items["chest"]["current_state"] == "locked"
+
+
+def test_exit_state_changes_bump_the_exits_version(world):
+    world_state = WorldState(world)
+    version = world_state.exits_version
+    world_state.items["chest"]["current_state"] = "open"
+    assert world_state.exits_version == version
+    world_state.get_scene("hall")["exits"][0]["locked"] = False
+    assert world_state.exits_version > version
@@ -0,0 +1,60 @@
+import json
+import os
+from collections import deque
+
+import pytest
+
+from utils.world_generator import WorldGenerator
+
+CONTENT_FILES = ("scenes.json", "items.json", "characters.json", "story_texts.json")
+
+
+def read_files(directory):
+    contents = {}
+    for name in CONTENT_FILES:
+        with open(os.path.join(directory, name), "rb") as f:
+            contents[name] = f.read()
+    return contents
+
+
+def test_same_seed_writes_identical_files(tmp_path):
+    WorldGenerator(23, 120, 30, seed=5).write(str(tmp_path / "first"))
+    WorldGenerator(23, 120, 30, seed=5).write(str(tmp_path / "second"))
+    WorldGenerator(23, 120, 30, seed=6).write(str(tmp_path / "other"))
+    first = read_files(tmp_path / "first")
+    assert read_files(tmp_path / "second") == first
+    assert read_files(tmp_path / "other")["scenes.json"] != first["scenes.json"]
+
+
+@pytest.mark.parametrize("scene_count", [1, 23, 100])
+def test_every_scene_is_reachable_without_keys(tmp_path, scene_count):
+    generator = WorldGenerator(scene_count, 10 * scene_count, scene_count, seed=3, lock_chance=1)
+    config_file = generator.write(str(tmp_path))
+    with open(config_file, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    with open(config["scenes_file"], "r", encoding="utf-8") as f:
+        scenes = {scene["id"]: scene for scene in json.load(f)}
+    assert len(scenes) == scene_count
+
+    reached = {config["initial_scene"]}
+    queue = deque(reached)
+    while queue:
+        for exit in scenes[queue.popleft()]["exits"]:
+            assert exit["scene_id"] in scenes
+            if not exit["locked"] and exit["scene_id"] not in reached:
+                reached.add(exit["scene_id"])
+                queue.append(exit["scene_id"])
+    assert reached == set(scenes)
+
+
+def test_scenes_only_reference_generated_entities():
+    generator = WorldGenerator(23, 120, 30, seed=5)
+    items = dict(generator.items())
+    characters = dict(generator.characters())
+    for scene in generator.scenes():
+        assert set(scene["items"]) <= set(items)
+        assert set(scene.get("passive_items", [])) <= set(items)
+        assert set(scene["characters"]) <= set(characters)
+        for exit in scene["exits"]:
+            if exit["locked"] and exit["required_item"] != "passcode":
+                assert exit["required_item"] in items
@@ -19,6 +19,12 @@ from pygments.lexers import get_lexer_by_name
 from pygments.formatters import HtmlFormatter
 from tkhtmlview import HTMLScrolledText
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from engine.content_store import ContentStore, DATA_TYPES
+
+# A content database in the game path takes the place of the JSON files
+CONTENT_DB = 'content.db'
+
 # Decorator definition
 def safe_operation(func):
     @functools.wraps(func)
@@ -623,6 +629,7 @@ class GameDataEditor:
         self.story_texts_data = {}
         self.dialogue_data = {}
         self.recipes_data = []
+        self.content_store = None
 
         # Font settings
         self.font_settings = {
@@ -1490,15 +1497,52 @@ class GameDataEditor:
             if not paths_checked:
                 return
 
-            self.load_scenes()
-            self.load_items()
-            self.load_characters()
-            self.load_story_texts()
+            self.open_content_store()
+            if self.content_store:
+                (self.scenes_data, self.items_data,
+                 self.characters_data, self.story_texts_data) = self.content_store.load()
+            else:
+                self.load_scenes()
+                self.load_items()
+                self.load_characters()
+                self.load_story_texts()
             self.load_dialogue_data()
             self.refresh_all_lists()
         except Exception as e:
             self.show_error_dialog(f"Error loading data: {str(e)}")
 
+    def open_content_store(self):
+        """Use the content database of the game path, if it has one"""
+        if self.content_store:
+            self.content_store.close()
+            self.content_store = None
+        db_path = os.path.join(self.game_path, CONTENT_DB)
+        if os.path.exists(db_path):
+            self.content_store = ContentStore(db_path)
+            if self.content_files_newer(db_path):
+                # The JSON files were edited after the database; rebuild it from them
+                data = []
+                for data_type in DATA_TYPES:
+                    with open(self.get_file_path(data_type), 'r', encoding='utf-8') as f:
+                        data.append(json.load(f))
+                self.content_store.import_data(*data)
+
+    def content_files_newer(self, db_path):
+        """Whether all JSON content files exist and any was changed after the database"""
+        paths = [self.get_file_path(data_type) for data_type in DATA_TYPES]
+        if not all(os.path.exists(path) for path in paths):
+            return False
+        written = os.path.getmtime(db_path)
+        return any(os.path.getmtime(path) > written for path in paths)
+
+    def stored_references(self, kind, entity_id):
+        """Look up references with an indexed query, or None if there are unsaved edits"""
+        if not self.content_store or self.modified:
+            return None
+        kind_labels = {'scenes': 'Scene', 'items': 'Item', 'characters': 'Character'}
+        return [f"{kind_labels[source_kind]}: {name} ({relation})"
+                for source_kind, _, name, relation in self.content_store.references_to(kind, entity_id)]
+
     def verify_game_paths(self):
         """Verify game paths exist or prompt for creation"""
         required_paths = {
@@ -1644,6 +1688,13 @@ class GameDataEditor:
 
     def save_data_type(self, data_type):
         """Save specific data type"""
+        if self.content_store:
+            # Only the rows that changed are rewritten; like the JSON files,
+            # the database holds no recipes list of its own
+            if data_type in DATA_TYPES:
+                self.content_store.sync(data_type, getattr(self, f"{data_type}_data"))
+            return
+
         file_path = self.get_file_path(data_type)
         if not file_path:
             return
@@ -1663,6 +1714,10 @@ class GameDataEditor:
         backup_dir = os.path.join(self.game_path, 'backups', timestamp)
         os.makedirs(backup_dir, exist_ok=True)
 
+        if self.content_store:
+            self.content_store.backup(os.path.join(backup_dir, CONTENT_DB))
+            return
+
         for data_type in self.modified:
             file_path = self.get_file_path(data_type)
             if file_path and os.path.exists(file_path):
@@ -2372,6 +2427,11 @@ class GameDataEditor:
 
     def show_item_references(self, item_id):
         """Show all references to a specific item"""
+        references = self.stored_references('items', item_id)
+        if references is not None:
+            self.show_references_window("Item References", item_id, references)
+            return
+
         references = []
         
         # Check scenes
@@ -2390,6 +2450,11 @@ class GameDataEditor:
 
     def show_character_references(self, char_id):
         """Show all references to a specific character"""
+        references = self.stored_references('characters', char_id)
+        if references is not None:
+            self.show_references_window("Character References", char_id, references)
+            return
+
         references = []
         
         # Check scenes
@@ -2623,19 +2688,21 @@ class GameDataEditor:
 
     def find_item_references(self, item_id):
         """Find all references to an item"""
-        references = []
-        
-        # Check scenes
-        for scene in self.scenes_data:
-            if item_id in scene.get('items', []):
-                references.append(f"Scene: {scene['name']}")
-
-        # Check characters
-        for char_id, char in self.characters_data.items():
-            if item_id in char.get('inventory', []):
-                references.append(f"Character: {char['name']} (inventory)")
-            if item_id in char.get('crafting_requirements', []):
-                references.append(f"Character: {char['name']} (crafting)")
+        references = self.stored_references('items', item_id)
+        if references is None:
+            references = []
+
+            # Check scenes
+            for scene in self.scenes_data:
+                if item_id in scene.get('items', []):
+                    references.append(f"Scene: {scene['name']}")
+
+            # Check characters
+            for char_id, char in self.characters_data.items():
+                if item_id in char.get('inventory', []):
+                    references.append(f"Character: {char['name']} (inventory)")
+                if item_id in char.get('crafting_requirements', []):
+                    references.append(f"Character: {char['name']} (crafting)")
 
         # Check recipes
         for i, recipe in enumerate(self.recipes_data):
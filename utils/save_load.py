@@ -1,11 +1,14 @@
 import json
+import os
 
 class SaveLoad:
     def save_game(self, game_state, filename):
         """Save game state to a file."""
         try:
-            with open(filename, 'w') as f:
+            # Replace the old save only once the new one is complete
+            with open(filename + '.tmp', 'w') as f:
                 json.dump(game_state, f, indent=2)
+            os.replace(filename + '.tmp', filename)
             return True
         except Exception as e:
             print(f"Error saving game: {str(e)}")
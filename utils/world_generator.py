@@ -0,0 +1,411 @@
+"""Generate synthetic game content at any scale.
+
+Writes scenes, items, characters and story texts in the same JSON schema as
+`game_files`, plus a game config that points at them:
+
+    python utils/world_generator.py generated --scenes 10000 --items 100000 --characters 20000
+    python main.py --game-config generated/config.json
+
+Every entity is derived from the seed and its own index, so entities are
+written one at a time and a million-entity world never has to fit in
+memory. The same seed and sizes always produce the same files.
+
+Scenes form a grid. Every scene connects to its neighbours in the same row
+and the first column connects every row, so the whole map is reachable with
+no key; other exits between rows are optional and may be locked behind a key
+placed next to them or a passcode. Items come in kits of ten placed in one
+scene: a repair tool, a broken item and what it repairs into, two parts and
+what they combine into, a key, a container and its contents, and a weapon or
+a readable log. Characters wander, follow the player, fight, trade items or
+analyze them.
+"""
+import argparse
+import json
+import math
+import os
+import random
+
+KIT_SIZE = 10
+TOOL, BROKEN, REPAIRED, PART_A, PART_B, CRAFTED, KEY, CONTAINER, CONTENTS, EXTRA = range(KIT_SIZE)
+# Kit members that start hidden: made by repairing, combining or opening a container
+HIDDEN = (REPAIRED, CRAFTED, CONTENTS)
+
+ADJECTIVES = ["Rusty", "Humming", "Cracked", "Polished", "Dented", "Glowing", "Ancient", "Sleek", "Frosted",
+              "Scorched", "Tiny", "Heavy", "Crimson", "Azure", "Silent", "Flickering"]
+ITEM_NOUNS = {
+    TOOL: ["Wrench", "Screwdriver", "Soldering Iron", "Spanner"],
+    BROKEN: ["Radio", "Scanner", "Lantern", "Compass"],
+    PART_A: ["Wire Coil", "Lens", "Battery", "Gear"],
+    PART_B: ["Circuit Board", "Casing", "Spring", "Fuse"],
+    CRAFTED: ["Gadget", "Contraption", "Device", "Gizmo"],
+    KEY: ["Keycard", "Key", "Passcard", "Token"],
+    CONTAINER: ["Locker", "Crate", "Cabinet", "Chest"],
+    CONTENTS: ["Ration Pack", "Apple", "Medkit", "Stim Pack"],
+    EXTRA: ["Blaster", "Logbook", "Baton", "Datapad"],
+}
+PLACES = ["Corridor", "Storage Bay", "Lab", "Hangar", "Mess Hall", "Reactor Room", "Observation Deck",
+          "Cargo Hold", "Greenhouse", "Workshop", "Infirmary", "Archive"]
+DOORS = ["Door", "Hatch", "Airlock", "Bulkhead", "Gate"]
+CHARACTER_NOUNS = ["Robot", "Droid", "Technician", "Scavenger", "Drone", "Android", "Engineer", "Mechanic"]
+WANDERER, FOLLOWER, HOSTILE, TRADER, ANALYST = range(5)
+CHARACTER_TYPES = {WANDERER: "neutral", FOLLOWER: "friendly", HOSTILE: "hostile", TRADER: "neutral",
+                   ANALYST: "neutral"}
+# Relative share of each role; a ship full of followers would trail after the player in a crowd
+ROLE_WEIGHTS = {WANDERER: 15, FOLLOWER: 1, HOSTILE: 20, TRADER: 32, ANALYST: 32}
+
+
+class WorldGenerator:
+    """Derives every scene, item and character of a synthetic world from a seed.
+
+    Args:
+        scenes (int): Number of scenes
+        items (int): Number of items
+        characters (int): Number of characters
+        seed (int): Seed everything is derived from
+        lock_chance (float): Chance that an optional exit is locked
+    """
+
+    def __init__(self, scenes, items, characters, seed=0, lock_chance=0.3):
+        if scenes < 1:
+            raise ValueError("A world needs at least one scene")
+        self.scene_count = scenes
+        self.item_count = items
+        self.character_count = characters
+        self.seed = seed
+        self.lock_chance = lock_chance
+        self.width = math.ceil(math.sqrt(scenes))
+        self.kit_count = math.ceil(items / KIT_SIZE)
+
+    def rng(self, *key):
+        """A generator for one entity or exit, independent of every other."""
+        return random.Random(":".join(str(part) for part in (self.seed,) + key))
+
+    @staticmethod
+    def scene_id(index):
+        return f"scene_{index}"
+
+    @staticmethod
+    def item_id(index):
+        return f"item_{index}"
+
+    @staticmethod
+    def character_id(index):
+        return f"character_{index}"
+
+    def item_exists(self, index):
+        return 0 <= index < self.item_count
+
+    def kits_in_scene(self, scene):
+        """Kits are dealt to scenes in turn."""
+        return range(scene, self.kit_count, self.scene_count)
+
+    def characters_in_scene(self, scene):
+        return range(scene, self.character_count, self.scene_count)
+
+    def item_name(self, index):
+        rng = self.rng("item_name", index)
+        nouns = ITEM_NOUNS.get(index % KIT_SIZE, ITEM_NOUNS[EXTRA])
+        # The index keeps names unique, so every item can be named in a command
+        return f"{rng.choice(ADJECTIVES)} {rng.choice(nouns)} {index}"
+
+    # Scenes
+
+    def neighbours(self, scene):
+        """(direction, scene index) of the scenes next to one in the grid."""
+        row, column = divmod(scene, self.width)
+        if row > 0:
+            yield "North", scene - self.width
+        if scene + self.width < self.scene_count:
+            yield "South", scene + self.width
+        if column > 0:
+            yield "West", scene - 1
+        if column + 1 < self.width and scene + 1 < self.scene_count:
+            yield "East", scene + 1
+
+    def exit_between(self, scene, other, direction):
+        """The exit from one scene to another, or None if they are not connected.
+
+        Exits are derived from the pair of scenes, so both sides agree on
+        whether the passage exists and how it is locked.
+        """
+        low, high = min(scene, other), max(scene, other)
+        rng = self.rng("exit", low, high)
+        door = f"{direction} {rng.choice(DOORS)}"
+        exit = {"door_name": door, "locked": False, "lock_text": "", "unlock_text": "", "required_item": "",
+                "scene_id": self.scene_id(other)}
+        # Rows are joined at the first column, and every scene reaches its row neighbours
+        if high - low == 1 or low % self.width == 0:
+            return exit
+        if rng.random() < 0.5:
+            return None
+        if rng.random() >= self.lock_chance:
+            return exit
+
+        exit["locked"] = True
+        keys = [kit * KIT_SIZE + KEY for kit in self.kits_in_scene(low) if self.item_exists(kit * KIT_SIZE + KEY)]
+        if keys and rng.random() < 0.8:
+            key = rng.choice(keys)
+            exit["lock_text"] = f"The {door.lower()} is locked. You need the {self.item_name(key)} to open it."
+            exit["unlock_text"] = f"You unlock the {door.lower()} with the {self.item_name(key)}."
+            exit["required_item"] = self.item_id(key)
+        else:
+            exit["lock_text"] = f"The {door.lower()} is locked with a keypad."
+            exit["unlock_text"] = "The keypad beeps and the lock releases."
+            exit["required_item"] = "passcode"
+            exit["passcode"] = str(rng.randrange(1000, 10000))
+        return exit
+
+    def scene(self, index):
+        rng = self.rng("scene", index)
+        place = rng.choice(PLACES)
+        items, passive_items = [], []
+        for kit in self.kits_in_scene(index):
+            for member in range(KIT_SIZE):
+                item = kit * KIT_SIZE + member
+                if not self.item_exists(item) or member in HIDDEN:
+                    continue
+                (passive_items if member == CONTAINER else items).append(self.item_id(item))
+        exits = [exit for direction, other in self.neighbours(index)
+                 if (exit := self.exit_between(index, other, direction)) is not None]
+        scene = {
+            "id": self.scene_id(index),
+            "name": f"{rng.choice(ADJECTIVES)} {place} {index}",
+            "description": f"{with_article(rng.choice(ADJECTIVES).lower())} {place.lower()} somewhere deep in the ship.",
+            "items": items,
+            "passive_items": passive_items,
+            "characters": [self.character_id(character) for character in self.characters_in_scene(index)],
+            "exits": exits,
+            "random_events": [f"Something clanks in the {place.lower()}.",
+                              f"The lights in the {place.lower()} flicker."],
+            "hint": "Look around; every kit of parts in a room fits together somehow.",
+        }
+        if not passive_items:
+            del scene["passive_items"]
+        return scene
+
+    # Items
+
+    def item(self, index):
+        rng = self.rng("item", index)
+        member = index % KIT_SIZE
+        name = self.item_name(index)
+        item = {"name": name, "description": f"{with_article(name.lower())}.", "usable": False}
+
+        # A kit cut short by the item count leaves its last members as plain items
+        if member == TOOL:
+            item.update(equippable=True, effect={"repair": rng.randint(5, 20)})
+        elif member == BROKEN and self.item_exists(index + 1):
+            item.update(description=f"{with_article(name.lower())} that needs repair.", repairable=True,
+                        repair_item=self.item_id(index - 1))
+        elif member == REPAIRED:
+            item.update(description=f"{with_article(name.lower())}, repaired and working.", usable=True,
+                        components=[self.item_id(index - 1)])
+        elif member in (PART_A, PART_B):
+            item["equippable"] = False
+        elif member == CRAFTED:
+            item.update(description=f"{with_article(name.lower())} put together from parts.", usable=True, equippable=True,
+                        effect={"attack": rng.randint(1, 10)},
+                        components=[self.item_id(index - 2), self.item_id(index - 1)])
+        elif member == KEY:
+            # Keys open both sides of a door, so they are kept after use
+            item.update(key=True, consumable=False)
+        elif member == CONTAINER and self.item_exists(index + 1):
+            item.update(self.container(rng, name, index + 1))
+        elif member == CONTENTS:
+            item.update(usable=True, effect={"health": rng.randint(5, 30)})
+        elif member == EXTRA and index % (2 * KIT_SIZE) == EXTRA:
+            item.update(equippable=True, effect={"attack": rng.randint(5, 25)})
+        elif member == EXTRA:
+            item.update(readable_item=f"The {name.lower()} lists maintenance entries, the last one "
+                                      f"dated {rng.randint(2100, 2300)}.", read_speed=0.01)
+        return item
+
+    def container(self, rng, name, contents):
+        noun = name.split()[1].lower()
+        states = {
+            "closed": {"description": f"The {noun} is closed.", "action": "open", "next_state": "open"},
+            "open": {"description": f"The {noun} is open, revealing {with_article(self.item_name(contents), False)}.",
+                     "action": "take", "next_state": "empty"},
+            "empty": {"description": f"The {noun} is empty.", "action": None, "next_state": None},
+        }
+        container = {"interactive": True, "current_state": "closed", "contents": [self.item_id(contents)]}
+        if rng.random() < 0.3:
+            states = {"locked": {"description": f"The {noun} is locked.", "action": "unlock",
+                                 "next_state": "closed"}, **states}
+            container.update(current_state="locked", unlock_required_item="passcode",
+                             passcode=str(rng.randrange(100, 1000)))
+        container["states"] = states
+        return container
+
+    # Characters
+
+    def character(self, index):
+        rng = self.rng("character", index)
+        role = rng.choices(list(ROLE_WEIGHTS), list(ROLE_WEIGHTS.values()))[0]
+        scene = index % self.scene_count
+        name = f"{rng.choice(ADJECTIVES)} {rng.choice(CHARACTER_NOUNS)} {index}"
+        character = {
+            "id": self.character_id(index),
+            "name": name,
+            "description": f"{with_article(name.lower())} going about its business.",
+            "type": CHARACTER_TYPES[role],
+            "greeting": f"The {name.lower()} notices you.",
+            "dialogue": {"greet": "Hello there."},
+            "dialogue_options": {
+                "Ask about the ship": "It has seen better days, like all of us.",
+                "Ask for directions": f"Try the exits of {self.scene_id(rng.randrange(self.scene_count))}.",
+                "Say goodbye": "Safe travels.",
+            },
+            "stats": {"health": rng.randint(20, 150), "attack": rng.randint(1, 20), "defense": rng.randint(1, 10)},
+        }
+
+        if role in (WANDERER, FOLLOWER):
+            character.update(movable=True, initial_scene=self.scene_id(scene),
+                             moves_after_commands=rng.randint(2, 6), moves_on_scene_change=role == FOLLOWER,
+                             follow_player=role == FOLLOWER,
+                             random_events=[f"The {name.lower()} shuffles about."])
+        elif role == HOSTILE:
+            character["dialogue_options"]["Calm down"] = "It only growls at you."
+        else:
+            interactions = self.item_interactions(rng, role, scene)
+            if interactions:
+                character["item_interactions"] = interactions
+        return character
+
+    def item_interactions(self, rng, role, scene):
+        """Interactions with items found in the character's own scene."""
+        interactions = {}
+        for kit in self.kits_in_scene(scene):
+            base = kit * KIT_SIZE
+            if role == TRADER and self.item_exists(base + CONTENTS):
+                interactions[self.item_id(base + CONTENTS)] = {
+                    "type": "trade",
+                    "response": f"A fair trade. Take this {self.item_name(base + CRAFTED)}.",
+                    "consume_item": True,
+                    "reward_item": self.item_id(base + CRAFTED),
+                }
+            elif role == ANALYST and self.item_exists(base + EXTRA) and base % (2 * KIT_SIZE):
+                interactions[self.item_id(base + EXTRA)] = {
+                    "type": "information",
+                    "response": f"Analyzing the {self.item_name(base + EXTRA).lower()}... Data stored.",
+                    "consume_item": True,
+                    "story_flag": f"{self.item_id(base + EXTRA)}_analyzed",
+                }
+            if len(interactions) >= rng.randint(1, 3):
+                break
+        return interactions
+
+    # Story texts
+
+    def story_texts(self):
+        conditions = {"item_acquired": {}, "flag_set": {}}
+        for kit in range(0, self.kit_count, max(1, self.kit_count // 100)):
+            crafted = kit * KIT_SIZE + CRAFTED
+            if self.item_exists(crafted):
+                conditions["item_acquired"][self.item_name(crafted)] = {
+                    "text": f"You got hold of the {self.item_name(crafted)}.", "show_once": True}
+        return {
+            "intro": {"text": f"You wake up in a ship of {self.scene_count} rooms. Somewhere in it is a way home.",
+                      "show_once": True},
+            "outro_win": {"text": "You made it home.", "show_once": True},
+            "outro_lose": {"text": "Your journey ends here.", "show_once": True},
+            "conditions": conditions,
+        }
+
+    # Output
+
+    def scenes(self):
+        return (self.scene(index) for index in range(self.scene_count))
+
+    def items(self):
+        """Yield (item id, item) pairs."""
+        return ((self.item_id(index), self.item(index)) for index in range(self.item_count))
+
+    def characters(self):
+        """Yield (character id, character) pairs."""
+        return ((self.character_id(index), self.character(index)) for index in range(self.character_count))
+
+    def write(self, directory, base_config=None):
+        """Write the content files and a game config using them into a directory.
+
+        Args:
+            directory (str): Directory to write into, created if needed
+            base_config (dict): Config to take player stats, style and the like from
+
+        Returns:
+            str: Path of the written game config
+        """
+        os.makedirs(directory, exist_ok=True)
+        files = {
+            "scenes_file": os.path.join(directory, "scenes.json"),
+            "items_file": os.path.join(directory, "items.json"),
+            "characters_file": os.path.join(directory, "characters.json"),
+            "story_texts_file": os.path.join(directory, "story_texts.json"),
+        }
+        write_list(files["scenes_file"], self.scenes())
+        write_dict(files["items_file"], self.items())
+        write_dict(files["characters_file"], self.characters())
+        with open(files["story_texts_file"], "w", encoding="utf-8") as f:
+            json.dump(self.story_texts(), f, indent=2)
+
+        config = {key: value for key, value in (base_config or {}).items() if key not in ("content_db", "seed")}
+        config.update(files)
+        config["content_pack"] = os.path.join(directory, "world.pack")
+        config["initial_scene"] = self.scene_id(0)
+        config_file = os.path.join(directory, "config.json")
+        with open(config_file, "w", encoding="utf-8") as f:
+            json.dump(config, f, indent=2)
+        return config_file
+
+
+def with_article(phrase, capitalize=True):
+    article = "an" if phrase[0].lower() in "aeiou" else "a"
+    return f"{article.capitalize() if capitalize else article} {phrase}"
+
+
+def write_list(filename, values):
+    """Stream a JSON list to a file, one value per line."""
+    with open(filename, "w", encoding="utf-8") as f:
+        f.write("[")
+        separator = "\n"
+        for value in values:
+            f.write(separator + json.dumps(value, ensure_ascii=False))
+            separator = ",\n"
+        f.write("\n]\n")
+
+
+def write_dict(filename, pairs):
+    """Stream a JSON object to a file from (key, value) pairs, one per line."""
+    with open(filename, "w", encoding="utf-8") as f:
+        f.write("{")
+        separator = "\n"
+        for key, value in pairs:
+            f.write(f"{separator}{json.dumps(key)}: {json.dumps(value, ensure_ascii=False)}")
+            separator = ",\n"
+        f.write("\n}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic CLIo world")
+    parser.add_argument("directory", help="Directory to write the content and its config into")
+    parser.add_argument("--scenes", type=int, default=100, help="Number of scenes")
+    parser.add_argument("--items", type=int, default=1000, help="Number of items")
+    parser.add_argument("--characters", type=int, default=200, help="Number of characters")
+    parser.add_argument("--seed", type=int, default=0, help="Seed to generate from")
+    parser.add_argument("--lock-chance", type=float, default=0.3, help="Chance that an optional exit is locked")
+    parser.add_argument("--config", default="game_files/config.json",
+                        help="Game config to take player stats and style from")
+    args = parser.parse_args()
+
+    base_config = {}
+    if os.path.exists(args.config):
+        with open(args.config, "r") as f:
+            base_config = json.load(f)
+    generator = WorldGenerator(args.scenes, args.items, args.characters, args.seed, args.lock_chance)
+    config_file = generator.write(args.directory, base_config)
+    print(f"Wrote {args.scenes} scenes, {args.items} items and {args.characters} characters; "
+          f"play with: python main.py --game-config {config_file}")
+
+
+if __name__ == "__main__":
+    main()